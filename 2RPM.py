@@ -8,8 +8,9 @@ import asyncio
 import logging
 
 from modules.config import load_config
-from modules.logger import setup_default_logging, setup_logging
-from modules.monitor import monitor_processes
+from modules.logger import setup_default_logging, setup_logging, stop_log_queue
+from modules.monitor import monitor_processes, monitor_profiles
+from modules.supervisor import supervise
 from modules.utils import get_program_directory
 
 # 默认配置文件名
@@ -35,24 +36,77 @@ def print_info():
     print("\n")
 
 
-def parse_args():
+def parse_args(argv=None):
     """解析命令行参数。
 
+    -- 之后的参数作为 supervisor 模式要启动的命令，例如 2RPM -c config -- app.exe --arg。
+
+    Args:
+        argv (list, optional): 命令行参数，默认为 sys.argv[1:]。
+
     Returns:
-        argparse.Namespace: 命令行参数命名空间。
+        argparse.Namespace: 命令行参数命名空间，command 为要启动的命令，未指定时为 None。
     """
     LOGGER.debug("解析命令行参数")
-    parser = argparse.ArgumentParser(description='2RPM V3')
+    if argv is None:
+        argv = sys.argv[1:]
+    command = None
+    if '--' in argv:
+        separator = argv.index('--')
+        argv, command = argv[:separator], argv[separator + 1:]
+    parser = argparse.ArgumentParser(
+        description='2RPM V3', usage='%(prog)s [-c CONFIG] [-- COMMAND [ARGS ...]]')
     parser.add_argument(
         '-c', '-C', '-config', '-Config', '--config', '--Config',
-        default=DEFAULT_CONFIG_FILE,
-        help="指定配置文件路径，示例 -c C:\\path\\config.yaml"
+        action='append',
+        help=(
+            "指定配置文件路径，示例 -c C:\\path\\config.yaml；"
+            "可重复指定多个配置，或指定一个目录以运行其中所有配置"
+        )
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if command is not None and not command:
+        parser.error("-- 之后需要指定要启动的命令")
+    args.command = command
+    if not args.config:
+        args.config = [DEFAULT_CONFIG_FILE]
     LOGGER.info(f"命令行参数解析结果: {args}")
     return args
 
 
+def resolve_config_files(program_dir, config_names):
+    """将命令行中的配置参数解析为配置文件路径列表。
+
+    目录会展开为其中所有的 .yaml/.yml 文件；未提供扩展名的配置名称
+    自动添加 .yaml 扩展名。
+
+    Args:
+        program_dir (str): 程序根目录。
+        config_names (list): 命令行中指定的配置名称或目录。
+
+    Returns:
+        list: 配置文件路径列表。
+    """
+    config_files = []
+    for config_name in config_names:
+        config_path = os.path.join(program_dir, config_name)
+        if os.path.isdir(config_path):
+            found_files = sorted(
+                os.path.join(config_path, name) for name in os.listdir(config_path)
+                if name.endswith('.yaml') or name.endswith('.yml')
+            )
+            if not found_files:
+                LOGGER.warning(f"配置目录中没有配置文件: {config_path}")
+            config_files.extend(found_files)
+            continue
+
+        # 处理配置文件路径，自动添加 .yaml 扩展名（如果没有提供）
+        if not config_name.endswith('.yaml') and not config_name.endswith('.yml'):
+            config_path += '.yaml'
+        config_files.append(config_path)
+    return config_files
+
+
 def main():
     """主函数。
 
@@ -71,33 +125,44 @@ def main():
     args = parse_args()
     # 计算程序根目录（使用当前工作目录）
     program_dir = get_program_directory()
-    
-    # 处理配置文件路径，自动添加 .yaml 扩展名（如果没有提供）
-    config_name = args.config
-    if not config_name.endswith('.yaml') and not config_name.endswith('.yml'):
-        config_name += '.yaml'
-    
-    config_file = os.path.join(program_dir, config_name)
-
-    try:
-        # 加载配置
-        CONFIG = load_config(config_file)
-        LOGGER.debug("配置已加载")
-    except SystemExit:
-        LOGGER.critical("程序因缺少关键配置终止运行")
+    config_files = resolve_config_files(program_dir, args.config)
+    if not config_files:
+        LOGGER.critical("未找到任何配置文件")
         sys.exit(1)
-    except Exception as e:
-        LOGGER.critical(f"加载配置失败: {e}")
+
+    profiles = []
+    for config_file in config_files:
+        try:
+            # 加载配置
+            profiles.append((
+                os.path.splitext(os.path.basename(config_file))[0],
+                load_config(config_file)
+            ))
+            LOGGER.debug("配置已加载")
+        except SystemExit:
+            LOGGER.critical("程序因缺少关键配置终止运行")
+            sys.exit(1)
+        except Exception as e:
+            LOGGER.critical(f"加载配置失败: {e}")
+            sys.exit(1)
+    CONFIG = profiles[0][1]
+    if args.command and len(profiles) > 1:
+        LOGGER.critical("supervisor 模式只支持一个配置文件")
         sys.exit(1)
 
-    # 设置日志
+    # 设置日志，多配置运行时使用第一个配置的日志设置
     setup_logging(CONFIG)
     LOGGER.info("已完成日志配置")
 
     try:
         # 运行主监视器
         LOGGER.info("初始化结束，正在运行主程序")
-        asyncio.run(monitor_processes(CONFIG))
+        if args.command:
+            asyncio.run(supervise(CONFIG, args.command))
+        elif len(profiles) == 1:
+            asyncio.run(monitor_processes(CONFIG))
+        else:
+            asyncio.run(monitor_profiles(profiles))
         LOGGER.info("主程序已结束运行")
     except KeyboardInterrupt:
         LOGGER.critical("捕捉到 Ctrl+C，程序被手动终止")
@@ -107,6 +172,8 @@ def main():
         sys.exit(1)
     finally:
         LOGGER.info("程序运行结束")
+        # os._exit 不会执行清理，退出前写完日志队列中的全部日志
+        stop_log_queue()
         print_info()
         os._exit(0)
 
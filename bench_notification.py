@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知流水线吞吐量测试
+
+使用本地推送桩服务器代替真实的推送服务，sc_send 与 get_notifier 被替换为
+向桩服务器发送请求的实现，Webhook 通道直接发往桩服务器。
+分批通过 send_notification 发送合成的进程结束事件，统计：
+- 吞吐量: 从首条事件到全部通知送达的每秒通知数
+- 端到端延迟: 事件发生到推送成功的 p50/p99（来自 modules.metrics）
+- 事件循环停顿: 心跳任务每 1 ms 唤醒一次，记录实际唤醒比预期晚的时间
+
+用法: python bench_notification.py [--channel webhook] [--events 1000] [--bursts 5]
+                                   [--latency 0.01] [--fail-rate 0] [--workers 2]
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import asyncio
+import argparse
+import urllib.request
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_push_server import StubPushServer
+from modules import channels
+from modules.config import get_default_config
+from modules.metrics import LATENCY_METRICS, get_latency_metrics
+from modules.notification import send_notification, close_notifications
+
+HEARTBEAT_INTERVAL = 0.001
+
+
+def post_to_stub(url, title, content):
+    """与推送 SDK 一样每次新建连接发送一条通知。"""
+    request = urllib.request.Request(
+        url, data=json.dumps({'title': title, 'content': content}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(request, timeout=10) as response:
+        if response.status >= 400:
+            raise ConnectionError(f"HTTP {response.status}")
+        return json.loads(response.read())
+
+
+class StubNotifier:
+    """代替 OnePush 通知器，发往桩服务器。"""
+
+    def __init__(self, url):
+        self.url = url
+
+    def notify(self, title, content, key):
+        return post_to_stub(self.url, title, content)
+
+
+def build_config(channel, url, workers):
+    """生成基准测试使用的配置：关闭限流、去重与发件箱，缩短重试间隔。"""
+    config = get_default_config()
+    push_settings = config['push_settings']
+    push_settings['push_outbox']['enable'] = False
+    push_settings['push_rate_limit'].update({
+        'channel_burst': 0, 'template_burst': 0, 'dedup_window': '0s',
+    })
+    push_settings['push_error_retry'].update({
+        'retry_interval': '20', 'max_retry_interval': '200', 'max_retry_count': 5,
+    })
+    push_settings['push_circuit_breaker']['failure_threshold'] = 0
+    push_settings['push_dispatch'].update({'worker_count': workers, 'queue_size': 100000})
+    channel_settings = push_settings['push_channel_settings']
+    if channel == 'serverchan':
+        channel_settings.update({'choose': 'ServerChan', 'serverchan_key': 'bench'})
+    elif channel == 'onepush':
+        channel_settings.update({
+            'choose': 'OnePush', 'push_channel': 'bench', 'push_channel_key': 'bench',
+        })
+    else:
+        channel_settings.update({
+            'choose': 'Webhook', 'webhook_url': url, 'webhook_max_connections': workers,
+        })
+    config['log_settings']['latency_log_interval'] = '0'
+    return config
+
+
+def percentile(sorted_values, percent):
+    """取已排序列表的分位数。"""
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * percent / 100), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def heartbeat(stalls, stop):
+    """记录事件循环的停顿时间。"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT_INTERVAL
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        stalls.append(max(loop.time() - expected, 0))
+
+
+async def run_benchmark(config, events, bursts):
+    """分批发送事件并等待全部送达。
+
+    Returns:
+        tuple: (总耗时秒, 发送事件耗时秒, 停顿列表)。
+    """
+    stalls = []
+    stop = asyncio.Event()
+    heartbeat_task = asyncio.create_task(heartbeat(stalls, stop))
+    per_burst = max(events // bursts, 1)
+    started = time.perf_counter()
+    submit_time = 0.0
+    pid = 0
+    for _ in range(bursts):
+        burst_started = time.perf_counter()
+        for _ in range(per_burst):
+            pid += 1
+            await send_notification(
+                config, 'process_end_notification',
+                process_name='worker', process_pid=pid, process_run_time='00:00:01')
+        submit_time += time.perf_counter() - burst_started
+        # 批次之间让出事件循环，模拟监视循环的下一次迭代
+        await asyncio.sleep(0)
+    await close_notifications()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await heartbeat_task
+    return elapsed, submit_time, stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description='通知流水线吞吐量测试')
+    parser.add_argument('--channel', choices=('webhook', 'serverchan', 'onepush'), default='webhook',
+                        help="推送通道")
+    parser.add_argument('--events', type=int, default=1000, help="事件总数")
+    parser.add_argument('--bursts', type=int, default=5, help="分几批发送")
+    parser.add_argument('--latency', type=float, default=0.01, help="桩服务器响应延迟（秒）")
+    parser.add_argument('--fail-rate', type=float, default=0, help="桩服务器返回错误的概率")
+    parser.add_argument('--workers', type=int, default=2, help="每个通道的工作任务数")
+    parser.add_argument('--verbose', action='store_true', help="输出推送日志")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    with StubPushServer(delay=args.latency, fail_rate=args.fail_rate) as server:
+        config = build_config(args.channel, server.url, args.workers)
+        LATENCY_METRICS.reset()
+        channels._get_notifier.cache_clear()
+        with patch.object(channels, 'sc_send',
+                          lambda key, title, content, options: post_to_stub(server.url, title, content)), \
+                patch.object(channels, 'get_notifier', lambda name: StubNotifier(server.url)):
+            elapsed, submit_time, stalls = asyncio.run(
+                run_benchmark(config, args.events, args.bursts))
+        request_count = len(server.requests)
+        connections = server.connections
+
+    metrics = get_latency_metrics()
+    total = metrics['total']
+    stalls_ms = sorted(stall * 1000 for stall in stalls)
+    print(
+        f"通道: {args.channel}，事件: {args.events}（{args.bursts} 批），"
+        f"桩服务器延迟: {args.latency * 1000:.0f} ms，失败率: {args.fail_rate:.0%}，"
+        f"工作任务: {args.workers}"
+    )
+    print(f"请求数: {request_count}，送达: {total['count']}，连接数: {connections}")
+    print(f"吞吐量: {total['count'] / elapsed:.0f} 条/秒（总耗时 {elapsed:.2f} 秒）")
+    print(f"send_notification 平均耗时: {submit_time / max(args.events, 1) * 1e6:.1f} us")
+    print(
+        f"端到端延迟: p50 {total['p50'] * 1000:.0f} ms，p99 {total['p99'] * 1000:.0f} ms，"
+        f"最大 {total['max'] * 1000:.0f} ms"
+    )
+    print(
+        f"事件循环停顿: p50 {percentile(stalls_ms, 50):.2f} ms，"
+        f"p99 {percentile(stalls_ms, 99):.2f} ms，"
+        f"最大 {percentile(stalls_ms, 100):.2f} ms"
+    )
+    if metrics['retries']['count']:
+        print(f"重试后送达: {metrics['retries']['count']} 条，重试耗时 p99 {metrics['retries']['p99'] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程扫描器性能对比
+
+对比 psutil 与 procfs 两种扫描器在真实 /proc 与合成进程表上的开销：
+- process_iter: 原有实现，每次循环用 psutil.process_iter 重建完整进程字典
+- full_scan: 列出所有 PID 并读取每个进程的名称与创建时间
+- refresh: 增量进程表在进程集合不变时的单次刷新
+
+用法: python bench_scanner.py [--processes 5000] [--rounds 20]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import psutil
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.monitor import (
+    ProcessTable,
+    PsutilProcessScanner,
+    ProcfsProcessScanner,
+)
+
+
+def build_synthetic_proc(root, count):
+    """生成包含指定数量进程的合成 procfs 目录。
+
+    Args:
+        root (str): 目录路径。
+        count (int): 进程数量。
+    """
+    with open(os.path.join(root, 'stat'), 'w') as f:
+        f.write("cpu  0 0 0 0 0 0 0 0 0 0\nbtime 1700000000\n")
+    os.makedirs(os.path.join(root, 'self'))
+    for pid in range(1, count + 1):
+        pid_dir = os.path.join(root, str(pid))
+        os.makedirs(pid_dir)
+        name = f"worker-{pid % 97}"
+        # 52 个字段，与内核格式一致
+        fields = ['S', '1', str(pid), str(pid)] + ['0'] * 17 + [str(pid * 10)] + ['0'] * 30
+        with open(os.path.join(pid_dir, 'stat'), 'w') as f:
+            f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+        with open(os.path.join(pid_dir, 'status'), 'w') as f:
+            f.write(f"Name:\t{name}\nState:\tS (sleeping)\nTgid:\t{pid}\nPid:\t{pid}\n")
+        with open(os.path.join(pid_dir, 'cmdline'), 'wb') as f:
+            f.write(f"/usr/bin/{name}\0".encode())
+
+
+def measure(func, rounds):
+    """多次执行并返回每次耗时的中位数（毫秒）。
+
+    Args:
+        func (callable): 被测函数。
+        rounds (int): 执行次数。
+
+    Returns:
+        float: 耗时中位数。
+    """
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def process_iter_snapshot():
+    """原有实现：每次循环重建完整的进程字典。"""
+    return {
+        p.pid: p.info for p in psutil.process_iter(['pid', 'name', 'create_time'])
+    }
+
+
+def full_scan(scanner):
+    """列出所有 PID 并读取全部进程属性。"""
+    return [scanner.read(pid) for pid in scanner.pids()]
+
+
+def run_suite(label, scanners, rounds):
+    """对一组扫描器执行全部测试项并打印结果。
+
+    Args:
+        label (str): 进程表名称。
+        scanners (list): 扫描器列表。
+        rounds (int): 每项执行次数。
+    """
+    process_count = len(scanners[0].pids())
+    print(f"\n[{label}] 进程数: {process_count}，每项执行 {rounds} 次，单位 ms（中位数）")
+    print(f"{'scanner':<10}{'process_iter':>14}{'full_scan':>12}{'refresh':>10}")
+    baseline = measure(process_iter_snapshot, rounds)
+    for scanner in scanners:
+        table = ProcessTable(scanner, name_recheck_interval=0)
+        table.refresh()
+        print(
+            f"{scanner.name:<10}{baseline:>14.2f}"
+            f"{measure(lambda: full_scan(scanner), rounds):>12.2f}"
+            f"{measure(table.refresh, rounds):>10.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='进程扫描器性能对比')
+    parser.add_argument('--processes', type=int, default=5000, help="合成进程表的进程数量")
+    parser.add_argument('--rounds', type=int, default=20, help="每项测试的执行次数")
+    args = parser.parse_args()
+
+    if not ProcfsProcessScanner.is_supported():
+        print("当前系统不支持 procfs，仅 Linux 可运行此对比")
+        return
+
+    run_suite('真实 /proc', [PsutilProcessScanner(), ProcfsProcessScanner()], args.rounds)
+
+    root = tempfile.mkdtemp(prefix='2rpm-proc-')
+    original_procfs_path = psutil.PROCFS_PATH
+    try:
+        build_synthetic_proc(root, args.processes)
+        psutil.PROCFS_PATH = root
+        run_suite(
+            '合成进程表',
+            [PsutilProcessScanner(), ProcfsProcessScanner(root)],
+            args.rounds
+        )
+    finally:
+        psutil.PROCFS_PATH = original_procfs_path
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
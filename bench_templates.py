@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知模板渲染性能对比
+
+对比每条通知的渲染开销：
+- legacy: 原有实现，每次查找模板字典、调用 gethostname 与两次 datetime.now().strftime，再用 str.format 渲染
+- compiled: 加载配置时预编译的模板，主机名只获取一次，时间字符串按秒缓存
+
+用法: python bench_templates.py [--events 20000] [--rounds 5]
+"""
+
+import os
+import sys
+import time
+import socket
+import datetime
+import argparse
+import statistics
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.config import get_default_config, get_resolved_config
+from modules.templates import get_host_fields
+
+TEMPLATE_KEY = 'process_timeout_warning'
+EVENT_VALUES = {
+    'process_name': 'worker.exe',
+    'process_pid': 4321,
+    'process_run_time': '01:02:03',
+}
+
+
+def legacy_render(config, values):
+    """原有实现：每条通知重新获取主机与时间字段并渲染。"""
+    template = config['push_settings']['push_templates'].get(TEMPLATE_KEY, {})
+    if not template.get('enable', True):
+        return None
+    values = dict(values)
+    values.update({
+        'host_name': socket.gethostname(),
+        'current_time': datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S'),
+        'short_current_time': datetime.datetime.now().strftime('%H:%M:%S'),
+    })
+    return (
+        template.get('title', '').format(**values),
+        template.get('content', '').format(**values),
+    )
+
+
+def compiled_render(config, values):
+    """预编译实现。"""
+    template = get_resolved_config(config)['templates'][TEMPLATE_KEY]
+    if not template.enable:
+        return None
+    values = dict(values)
+    values.update(get_host_fields())
+    return template.render(values)
+
+
+def measure(render, config, events, rounds):
+    """多次渲染并返回每秒渲染数的中位数。
+
+    Args:
+        render (callable): 渲染函数。
+        config (dict): 配置信息。
+        events (int): 每轮渲染次数。
+        rounds (int): 执行轮数。
+
+    Returns:
+        float: 每秒渲染数。
+    """
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(events):
+            render(config, EVENT_VALUES)
+        samples.append(events / (time.perf_counter() - started))
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='通知模板渲染性能对比')
+    parser.add_argument('--events', type=int, default=20000, help="每轮渲染的通知数")
+    parser.add_argument('--rounds', type=int, default=5, help="执行轮数")
+    args = parser.parse_args()
+
+    config = get_default_config()
+    if legacy_render(config, EVENT_VALUES) != compiled_render(config, EVENT_VALUES):
+        print("两种实现的渲染结果不一致")
+        return
+
+    print(f"每轮渲染 {args.events} 条通知，执行 {args.rounds} 轮，单位 条/秒（中位数）")
+    legacy = measure(legacy_render, config, args.events, args.rounds)
+    compiled = measure(compiled_render, config, args.events, args.rounds)
+    print(f"{'legacy':<10}{legacy:>12.0f}")
+    print(f"{'compiled':<10}{compiled:>12.0f}{compiled / legacy:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
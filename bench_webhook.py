@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Webhook 推送连接复用性能对比
+
+使用本地推送桩服务器，对比逐条推送的耗时：
+- per_request: 每次推送新建连接（与 SDK 推送方式相同），urllib 在线程池中执行
+- pooled: WebhookChannel 在事件循环中发送，复用连接池中的长连接
+
+用法: python bench_webhook.py [--pushes 500] [--concurrency 4]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_push_server import StubPushServer
+from modules.webhook import WebhookChannel
+
+
+def urllib_push(url, title, content):
+    """每次推送新建一条连接。"""
+    request = urllib.request.Request(
+        url, data=json.dumps({'title': title, 'content': content}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(request, timeout=10) as response:
+        response.read()
+
+
+async def run_per_request(url, pushes, concurrency):
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, urllib_push, url, f"title {index}", 'content')
+            for index in range(pushes)
+        ))
+
+
+async def run_pooled(url, pushes, concurrency):
+    channel = WebhookChannel({'webhook_url': url, 'webhook_max_connections': concurrency})
+    await channel.warm()
+    await asyncio.gather(*(
+        channel.push(f"title {index}", 'content') for index in range(pushes)
+    ))
+    await channel.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Webhook 推送连接复用性能对比')
+    parser.add_argument('--pushes', type=int, default=500, help="推送次数")
+    parser.add_argument('--concurrency', type=int, default=4, help="并发连接数")
+    args = parser.parse_args()
+
+    print(f"推送 {args.pushes} 条通知，并发 {args.concurrency}")
+    print(f"{'mode':<14}{'seconds':>10}{'pushes/s':>12}{'connections':>14}")
+    for label, runner in (('per_request', run_per_request), ('pooled', run_pooled)):
+        with StubPushServer() as server:
+            started = time.perf_counter()
+            asyncio.run(runner(server.url, args.pushes, args.concurrency))
+            elapsed = time.perf_counter() - started
+            print(f"{label:<14}{elapsed:>10.2f}{args.pushes / elapsed:>12.0f}{server.connections:>14}")
+
+
+if __name__ == '__main__':
+    main()
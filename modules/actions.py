@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+from modules.utils import parse_time_string
+from modules.runner import get_external_programs, resolve_external_program
+
+LOGGER = logging.getLogger(__name__)
+
+# 可以触发动作的进程事件
+ACTION_EVENTS = {
+    'wait_timeout': '等待进程启动超时',
+    'start': '进程启动',
+    'end': '进程结束',
+    'warning': '进程超时运行警告',
+    'threshold': '超时次数达到阈值',
+}
+ACTION_MODES = ('parallel', 'sequential')
+
+# 旧的单程序配置项对应的事件与运行方式，排在 actions 中同一事件的动作之前
+LEGACY_ACTIONS = (
+    ('external_program_on_wait_timeout_path', 'wait_timeout', 'parallel'),
+    ('external_program_path', 'end', 'parallel'),
+    ('another_external_program_path', 'threshold', 'sequential'),
+)
+
+EXECUTION_TEMPLATE_KEY = 'external_program_execution_notification'
+# 执行通知中事件没有提供的变量的默认值
+NOTIFICATION_DEFAULTS = {
+    'process_name': '',
+    'process_pid': '',
+    'process_run_time': '',
+    'process_wait_time': '',
+    'process_exit_code': '未知',
+    'other_running_processes': '',
+    'process_list': [],
+}
+
+
+class Action:
+    """一个事件触发的外部程序动作。"""
+
+    __slots__ = ('event', 'program', 'mode', 'timeout')
+
+    def __init__(self, event, program, mode='parallel', timeout=None):
+        """初始化动作。
+
+        Args:
+            event (str): 触发事件，见 ACTION_EVENTS。
+            program (ProgramSpec): 已解析的外部程序。
+            mode (str): 'parallel' 与后面的动作同时运行，'sequential' 结束后才运行后面的动作。
+            timeout (float, optional): 最长运行时间，单位为秒。默认为 None，
+                使用 program_timeout。
+        """
+        self.event = event
+        self.program = program
+        self.mode = mode
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"Action({self.event!r}, {self.program!r}, {self.mode!r})"
+
+
+def parse_action(entry):
+    """解析 actions 中的一项。
+
+    Args:
+        entry (dict): 动作配置，包含 event、path 与可选的 mode、timeout。
+
+    Returns:
+        Action: 动作。
+
+    Raises:
+        ValueError: 配置项无效或程序不存在。
+    """
+    if not isinstance(entry, dict):
+        raise ValueError(f"动作必须是字典: {entry}")
+    event = entry.get('event')
+    if event not in ACTION_EVENTS:
+        raise ValueError(f"未知的动作事件: {event}，可选: {', '.join(ACTION_EVENTS)}")
+    mode = entry.get('mode') or 'parallel'
+    if mode not in ACTION_MODES:
+        raise ValueError(f"未知的动作运行方式: {mode}，可选: {', '.join(ACTION_MODES)}")
+    path = entry.get('path')
+    if not isinstance(path, str) or not path:
+        raise ValueError(f"动作缺少 path: {entry}")
+    timeout_ms = parse_time_string(str(entry.get('timeout') or 0))
+    return Action(event, resolve_external_program(path), mode,
+                  timeout_ms / 1000 if timeout_ms else None)
+
+
+class ActionPipeline:
+    """按事件组织的外部程序动作列表。
+
+    同一事件的动作按配置顺序启动：parallel 动作启动后立即启动下一个动作，
+    sequential 动作结束后才启动下一个动作；全部动作结束后该事件的处理才算完成。
+    每个动作结束后发送外部程序执行通知。
+    """
+
+    def __init__(self, actions=()):
+        """初始化流水线。
+
+        Args:
+            actions (list): Action 列表。
+        """
+        self.actions = {}
+        for action in actions:
+            self.actions.setdefault(action.event, []).append(action)
+
+    def has(self, event):
+        """检查事件是否配置了动作。
+
+        Args:
+            event (str): 事件名称。
+
+        Returns:
+            bool: 配置了动作时返回 True。
+        """
+        return bool(self.actions.get(event))
+
+    async def _run_action(self, action, runner, notify, context):
+        """运行一个动作并发送执行通知。"""
+        exit_code = await runner.run(action.program, action.timeout)
+        if exit_code is not None and notify is not None:
+            values = dict(NOTIFICATION_DEFAULTS)
+            values.update(context)
+            try:
+                await notify(
+                    EXECUTION_TEMPLATE_KEY,
+                    external_program_name=action.program.name,
+                    external_program_path=action.program.path,
+                    external_program_exit_code=exit_code,
+                    **values
+                )
+            except Exception as e:
+                LOGGER.error(f"发送外部程序执行通知失败: {e}", exc_info=True)
+        return exit_code
+
+    async def run(self, event, runner, notify=None, **context):
+        """运行事件的全部动作并等待其结束。
+
+        Args:
+            event (str): 事件名称。
+            runner (ExternalProgramRunner): 外部程序运行器。
+            notify (callable, optional): 发送通知的协程函数，参数为模板键与模板参数。
+            **context: 事件的模板参数，例如 process_name、process_pid。
+
+        Returns:
+            list: 各动作的退出码，按配置顺序排列；启动失败的动作为 None。
+        """
+        actions = self.actions.get(event, ())
+        if not actions:
+            return []
+        LOGGER.info(f"{ACTION_EVENTS[event]}，正在执行 {len(actions)} 个动作")
+        tasks = []
+        try:
+            for action in actions:
+                task = asyncio.ensure_future(self._run_action(action, runner, notify, context))
+                tasks.append(task)
+                if action.mode == 'sequential':
+                    await task
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def trigger(self, event, runner, notify=None, **context):
+        """在后台运行事件的全部动作，不阻塞监视循环。
+
+        Args:
+            event (str): 事件名称。
+            runner (ExternalProgramRunner): 外部程序运行器，关闭时等待这些动作结束。
+            notify (callable, optional): 发送通知的协程函数。
+            **context: 事件的模板参数。
+
+        Returns:
+            asyncio.Task: 运行任务；事件没有动作时返回 None。
+        """
+        if not self.has(event):
+            return None
+        return runner.track(self.run(event, runner, notify, **context))
+
+
+def build_action_pipeline(external_settings):
+    """解析外部程序设置，创建对应的动作流水线。
+
+    旧的 external_program_path 等配置项转换为对应事件的动作，与 actions 合并。
+    无效的动作会记录错误并被跳过，不影响监视。
+
+    Args:
+        external_settings (dict): external_program_settings 配置节。
+
+    Returns:
+        ActionPipeline: 动作流水线。
+    """
+    programs = get_external_programs(external_settings)
+    actions = [
+        Action(event, programs[key], mode)
+        for key, event, mode in LEGACY_ACTIONS
+        if programs[key] is not None
+    ]
+    for entry in external_settings.get('actions') or []:
+        try:
+            actions.append(parse_action(entry))
+        except ValueError as e:
+            LOGGER.error(f"无效的动作配置，已跳过: {e}")
+    return ActionPipeline(actions)
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import random
+import asyncio
+import logging
+from functools import lru_cache
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+from serverchan_sdk import sc_send
+from onepush import get_notifier
+from modules.config import DEFAULT_VALUES
+from modules.utils import parse_time_string
+from modules.metrics import record_latency
+from modules.webhook import WebhookChannel
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_push_channels(push_settings):
+    """获取配置的全部推送通道。
+
+    push_channel_settings 本身是主通道，additional_channels 中的每一项是一个附加通道，
+    附加通道使用与主通道相同的键。
+
+    Args:
+        push_settings (dict): push_settings 配置节。
+
+    Returns:
+        list: 推送通道设置列表。
+    """
+    push_channel_settings = push_settings.get('push_channel_settings', {})
+    channels = [{
+        key: value for key, value in push_channel_settings.items()
+        if key != 'additional_channels'
+    }]
+    for channel in push_channel_settings.get('additional_channels') or []:
+        if isinstance(channel, dict):
+            channels.append(dict(channel))
+        else:
+            LOGGER.error(f"无效的附加推送通道配置: {channel}")
+    return channels
+
+
+def get_channel_key(channel_settings):
+    """获取推送通道的标识，标识相同的通道共享发送队列、熔断器与限流配额。
+
+    Args:
+        channel_settings (dict): 推送通道设置。
+
+    Returns:
+        tuple: 推送通道标识。
+    """
+    push_channel = channel_settings.get('choose', 'ServerChan')
+    if push_channel == 'ServerChan':
+        return (push_channel, channel_settings.get('serverchan_key', ''))
+    if push_channel == 'Webhook':
+        return (push_channel, channel_settings.get('webhook_url', ''))
+    return (
+        push_channel,
+        channel_settings.get('push_channel', ''),
+        channel_settings.get('push_channel_key', ''),
+    )
+
+
+def get_channel_name(channel_settings):
+    """获取用于日志的推送通道名称。
+
+    Args:
+        channel_settings (dict): 推送通道设置。
+
+    Returns:
+        str: 推送通道名称。
+    """
+    push_channel = channel_settings.get('choose', 'ServerChan')
+    if push_channel == 'OnePush':
+        return f"OnePush/{channel_settings.get('push_channel', '')}"
+    if push_channel == 'Webhook':
+        return f"Webhook/{urlsplit(channel_settings.get('webhook_url', '')).netloc}"
+    return push_channel
+
+
+@lru_cache(maxsize=None)
+def _get_notifier(push_channel_name):
+    """获取 OnePush 通知器，同一通道只创建一次，重试时不再重复创建。"""
+    return get_notifier(push_channel_name)
+
+
+def push_message(channel_settings, title, content):
+    """通过一个推送通道同步发送一条消息。
+
+    该函数会阻塞直到推送服务返回，只应在线程池中调用。
+    Webhook 通道由 WebhookChannel 异步发送，不经过该函数。
+
+    Args:
+        channel_settings (dict): 推送通道设置。
+        title (str): 通知标题。
+        content (str): 通知内容。
+
+    Returns:
+        bool: 推送通道未正确配置时返回 False，无需重试。
+
+    Raises:
+        Exception: 推送服务返回错误。
+    """
+    push_channel = channel_settings.get('choose', 'ServerChan')
+    serverchan_key = channel_settings.get('serverchan_key', '')
+    push_channel_name = channel_settings.get('push_channel', '')
+    push_channel_key = channel_settings.get('push_channel_key', '')
+
+    LOGGER.info(f"推送通道: {push_channel}")
+    if push_channel == 'ServerChan':
+        if not serverchan_key:
+            LOGGER.error("ServerChan 密钥未配置，无法发送通知")
+            return False
+        options = {}  # 可根据需要添加额外的选项
+        response = sc_send(serverchan_key, title, content, options)
+        LOGGER.info(f"推送成功: {response}")
+    elif push_channel == 'OnePush':
+        if not push_channel_key:
+            LOGGER.error("OnePush 密钥未配置，无法发送通知")
+            return False
+        notifier = _get_notifier(push_channel_name)
+        notifier.notify(
+            title=title,
+            content=content,
+            key=push_channel_key
+        )
+        LOGGER.info(f"通知发送成功: {title}")
+    else:
+        LOGGER.critical(f"推送通道未配置: {push_channel}")
+        return False
+    return True
+
+
+class CircuitBreaker:
+    """推送通道熔断器。
+
+    连续失败 failure_threshold 次后熔断，熔断期间不再尝试发送；
+    经过 reset_timeout 秒后放行一次试探，成功则恢复，失败则继续熔断。
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=300, clock=time.monotonic, name=''):
+        """初始化熔断器。
+
+        Args:
+            failure_threshold (int): 触发熔断的连续失败次数，0 表示不熔断。
+            reset_timeout (float): 熔断持续时间，单位为秒。
+            clock (callable): 返回当前时间（秒）的函数。
+            name (str): 用于日志的推送通道名称。
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        """熔断器状态: closed（正常）/ open（熔断）/ half_open（试探）。"""
+        if self._opened_at is None:
+            return 'closed'
+        if self._probing or self._clock() - self._opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """判断当前是否可以尝试发送。
+
+        Returns:
+            bool: 是否可以发送。半开状态下只放行一次试探。
+        """
+        state = self.state
+        if state == 'closed':
+            return True
+        if state == 'half_open' and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        """记录一次发送成功。"""
+        if self._opened_at is not None:
+            LOGGER.info(f"推送通道 {self.name} 已恢复，熔断结束")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        """记录一次发送失败。"""
+        self._failures += 1
+        if self._probing or (
+                self.failure_threshold and self._failures >= self.failure_threshold):
+            if self._opened_at is None or self._probing:
+                LOGGER.error(f"推送通道 {self.name} 连续失败 {self._failures} 次，熔断 {self.reset_timeout:.0f} 秒")
+            self._opened_at = self._clock()
+            self._probing = False
+
+
+def get_retry_delay(retry_settings, attempt):
+    """计算第 attempt 次发送失败后的重试间隔。
+
+    间隔从 retry_interval 开始每次翻倍，不超过 max_retry_interval，
+    再按 retry_jitter 随机抖动。
+
+    Args:
+        retry_settings (dict): push_error_retry 配置节。
+        attempt (int): 已失败的次数，从 1 开始。
+
+    Returns:
+        float: 重试间隔，单位为秒。
+    """
+    defaults = DEFAULT_VALUES['push_settings']['push_error_retry']
+    retry_interval = parse_time_string(str(
+        retry_settings.get('retry_interval', defaults['retry_interval']))) / 1000
+    max_retry_interval = parse_time_string(str(
+        retry_settings.get('max_retry_interval', defaults['max_retry_interval']))) / 1000
+    jitter = min(max(float(retry_settings.get('retry_jitter', defaults['retry_jitter'])), 0), 1)
+    delay = min(retry_interval * 2 ** (attempt - 1), max(max_retry_interval, retry_interval))
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+class PushJob:
+    """推送通道队列中的一条通知。"""
+
+    __slots__ = (
+        'push_settings', 'template_key', 'title', 'content',
+        'event_time', 'enqueued_at', 'first_attempt_at', 'failures', 'deadline',
+    )
+
+    def __init__(self, push_settings, template_key, title, content, event_time=None):
+        """初始化通知。
+
+        Args:
+            push_settings (dict): push_settings 配置节，用于读取重试设置。
+            template_key (str): 模板键。
+            title (str): 通知标题。
+            content (str): 通知内容。
+            event_time (float, optional): 事件发生的时间（perf_counter 秒），
+                用于统计端到端延迟。默认为 None，此时使用提交时间。
+        """
+        self.push_settings = push_settings
+        self.template_key = template_key
+        self.title = title
+        self.content = content
+        self.enqueued_at = time.perf_counter()
+        self.event_time = self.enqueued_at if event_time is None else event_time
+        self.first_attempt_at = None
+        self.failures = 0
+        # 重试截止时间（monotonic 秒），首次发送时确定
+        self.deadline = None
+
+
+class ChannelSender:
+    """单个推送通道的发送器。
+
+    每个通道有独立的队列、工作任务、线程池、重试次数与熔断器，
+    某个通道缓慢或失效不会延迟其他通道的通知。
+
+    发送失败的通知不在工作任务中等待重试，而是登记一个定时器，
+    到期后重新放回队列，工作任务在等待期间继续发送其他通知。
+    """
+
+    def __init__(self, channel_settings, worker_count, queue_size, breaker, on_exhausted):
+        """初始化发送器。
+
+        Args:
+            channel_settings (dict): 推送通道设置。
+            worker_count (int): 工作任务数，同时也是线程池大小。
+            queue_size (int): 队列容量。
+            breaker (CircuitBreaker): 熔断器。
+            on_exhausted (callable): 重试耗尽或熔断时调用，
+                参数为 (通道设置, 模板键, 标题, 内容)。
+        """
+        self.channel_settings = channel_settings
+        self.name = get_channel_name(channel_settings)
+        self.breaker = breaker
+        self._on_exhausted = on_exhausted
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=max(int(queue_size), 1))
+        # 等待重试的通知，按登记顺序排列
+        self._retries = {}
+        # 工作任务正在发送的通知
+        self._active = set()
+        # 已接受但尚未送达或放弃的通知数，包括队列中与等待重试的通知
+        self._unfinished = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        worker_count = max(int(worker_count), 1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=worker_count, thread_name_prefix='2rpm-push')
+        # Webhook 通道在事件循环中直接发送，连接池在通道的整个生命周期内复用
+        self._webhook = None
+        if channel_settings.get('choose') == 'Webhook':
+            self._webhook = WebhookChannel(channel_settings)
+        self._warm_task = None
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(worker_count)
+        ]
+
+    def submit(self, push_settings, template_key, title, content, event_time=None):
+        """提交一条通知，立即返回。
+
+        Args:
+            push_settings (dict): push_settings 配置节，用于读取重试设置。
+            template_key (str): 模板键。
+            title (str): 通知标题。
+            content (str): 通知内容。
+            event_time (float, optional): 事件发生的时间（perf_counter 秒）。
+
+        Returns:
+            bool: 是否已放入队列。
+        """
+        try:
+            self._queue.put_nowait(PushJob(push_settings, template_key, title, content, event_time))
+        except asyncio.QueueFull:
+            LOGGER.error(f"推送通道 {self.name} 队列已满，丢弃通知: {template_key}")
+            return False
+        self._unfinished += 1
+        self._idle.clear()
+        return True
+
+    def _finish(self):
+        """记录一条通知已送达或已放弃。"""
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._idle.set()
+
+    def _exhaust(self, job):
+        """放弃发送，把通知交给 on_exhausted 处理。
+
+        Args:
+            job (PushJob): 通知。
+        """
+        self._on_exhausted(self.channel_settings, job.template_key, job.title, job.content)
+
+    def _requeue(self, job):
+        """重试定时器到期，把通知放回队列。
+
+        Args:
+            job (PushJob): 等待重试的通知。
+        """
+        if self._retries.pop(job, None) is None:
+            return
+        job.enqueued_at = time.perf_counter()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            LOGGER.error(f"推送通道 {self.name} 队列已满，无法重试通知: {job.template_key}")
+            self._exhaust(job)
+            self._finish()
+
+    def warm(self):
+        """在后台预先建立推送连接，目前只有 Webhook 通道需要。"""
+        if self._webhook is not None and self._warm_task is None:
+            self._warm_task = asyncio.create_task(self._webhook.warm())
+
+    async def send(self, title, content):
+        """发送一次，并记录到熔断器与延迟统计。
+
+        SDK 推送在线程池中执行，Webhook 推送在事件循环中异步执行。
+        推送通道未正确配置时没有实际发送，不记录到熔断器与延迟统计。
+
+        Args:
+            title (str): 通知标题。
+            content (str): 通知内容。
+
+        Returns:
+            bool: 是否已发送，推送通道未正确配置时返回 False。
+
+        Raises:
+            Exception: 推送服务返回错误。
+        """
+        started = time.perf_counter()
+        try:
+            if self._webhook is not None:
+                if self._warm_task is not None:
+                    # 等待预热中的连接，而不是再建立一条
+                    await self._warm_task
+                sent = await self._webhook.push(title, content)
+            else:
+                sent = await self._loop.run_in_executor(
+                    self._executor, push_message, self.channel_settings, title, content)
+        except Exception:
+            record_latency('send', time.perf_counter() - started)
+            self.breaker.record_failure()
+            raise
+        if sent is False:
+            return False
+        record_latency('send', time.perf_counter() - started)
+        self.breaker.record_success()
+        return True
+
+    async def _worker(self):
+        """从队列中取出通知并发送。"""
+        while True:
+            job = await self._queue.get()
+            record_latency('queue', time.perf_counter() - job.enqueued_at)
+            self._active.add(job)
+            try:
+                finished = await self._deliver(job)
+            except Exception as e:
+                LOGGER.error(f"推送通道 {self.name} 发送通知 {job.template_key} 时出现异常: {e}", exc_info=True)
+                finished = True
+            finally:
+                self._queue.task_done()
+            # 被取消时通知仍留在 _active 中，由 close 交给 on_exhausted 处理
+            self._active.discard(job)
+            if finished:
+                self._finish()
+
+    async def _deliver(self, job):
+        """发送一次通知，失败时登记重试定时器。
+
+        重试间隔按指数退避并随机抖动，重试次数用尽或超过重试总时限后放弃。
+
+        Args:
+            job (PushJob): 通知。
+
+        Returns:
+            bool: 通知是否已送达或已放弃，登记了重试时返回 False。
+        """
+        retry_settings = job.push_settings.get('push_error_retry', {})
+        defaults = DEFAULT_VALUES['push_settings']['push_error_retry']
+        max_retry_count = self.channel_settings.get(
+            'max_retry_count', retry_settings.get('max_retry_count', defaults['max_retry_count']))
+        if job.deadline is None:
+            job.first_attempt_at = time.perf_counter()
+            job.deadline = time.monotonic() + parse_time_string(str(
+                retry_settings.get('retry_deadline', defaults['retry_deadline']))) / 1000
+
+        if not self.breaker.allow():
+            LOGGER.warning(f"推送通道 {self.name} 已熔断，跳过发送: {job.template_key}")
+            self._exhaust(job)
+            return True
+        attempt = job.failures + 1
+        try:
+            sent = await self.send(job.title, job.content)
+        except Exception as e:
+            LOGGER.error(
+                f"推送通道 {self.name} 通知发送失败 "
+                f"(尝试 {attempt}/{max_retry_count}): {e}"
+            )
+        else:
+            if not sent:
+                # 推送通道未正确配置，重试也无法发送
+                LOGGER.error(f"推送通道 {self.name} 未正确配置，通知已丢弃: {job.template_key}")
+                return True
+            now = time.perf_counter()
+            if job.failures:
+                record_latency('retries', now - job.first_attempt_at)
+            record_latency('total', now - job.event_time)
+            return True
+
+        job.failures = attempt
+        if attempt >= max_retry_count:
+            self._exhaust(job)
+            return True
+        delay = get_retry_delay(retry_settings, attempt)
+        if time.monotonic() + delay > job.deadline:
+            LOGGER.error(f"推送通道 {self.name} 通知 {job.template_key} 已超过重试总时限，不再重试")
+            self._exhaust(job)
+            return True
+        self._retries[job] = True
+        self._loop.call_later(delay, self._requeue, job)
+        LOGGER.debug(f"推送通道 {self.name} 将在 {delay:.1f} 秒后重试: {job.template_key}")
+        return False
+
+    async def join(self):
+        """等待队列中与等待重试的通知全部处理完毕。"""
+        await self._idle.wait()
+
+    def qsize(self):
+        """队列中、正在发送与等待重试的通知数。"""
+        return self._queue.qsize() + len(self._active) + len(self._retries)
+
+    async def close(self):
+        """停止工作任务并关闭线程池。
+
+        正在发送、仍在队列中与等待重试的通知交给 on_exhausted 处理。
+        正在发送的通知可能已经送达，因此转入发件箱后可能重复发送一次。
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+        if self._warm_task is not None:
+            self._warm_task.cancel()
+            await asyncio.gather(self._warm_task, return_exceptions=True)
+        if self._webhook is not None:
+            await self._webhook.close()
+        jobs = list(self._active)
+        while not self._queue.empty():
+            jobs.append(self._queue.get_nowait())
+        jobs.extend(self._retries)
+        self._active, self._retries = set(), {}
+        for job in jobs:
+            self._exhaust(job)
+        self._unfinished = 0
+        self._idle.set()
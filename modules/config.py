@@ -7,6 +7,10 @@ import logging
 from ruamel.yaml import YAML
 from ruamel.yaml.comments import CommentedMap, CommentedSeq
 
+from modules.templates import TemplateError, compile_templates
+from modules.runner import DEFAULT_MAX_CONCURRENT_PROGRAMS, DEFAULT_PROGRAM_TIMEOUT
+from modules.actions import build_action_pipeline
+
 # 全局变量
 CONFIG = {}
 LOGGER = logging.getLogger(__name__)
@@ -14,6 +18,9 @@ LOGGER = logging.getLogger(__name__)
 # 默认配置文件名
 DEFAULT_CONFIG_FILE = 'config.yaml'
 
+# 加载配置时编译的模板与解析的动作保存在配置中的该键下，不写入配置文件
+RESOLVED_CONFIG_KEY = '_resolved'
+
 # 关键参数列表
 CRITICAL_KEYS = [
     'monitor_settings.process_name',
@@ -30,15 +37,29 @@ DEFAULT_VALUES = {
         'process_name': 'notepad.exe',
         'timeout_warning_interval': '15m',
         'monitor_loop_interval': '1s',
+        'liveness_check_mode': 'auto',
+        'process_scanner': 'auto',
+        'timeout_escalation_thresholds': [],
     },
     'wait_process_settings': {
         'max_wait_time': '30s',
         'wait_process_check_interval': '1s',
+        'spawn_event_source': 'auto',
+    },
+    'telemetry_settings': {
+        'enable': False,
+        'sample_interval': '5s',
+        'buffer_size': 720,
+        'threshold_samples': 3,
+        'cpu_percent_threshold': 0,
+        'memory_rss_threshold_mb': 0,
+        'num_threads_threshold': 0,
     },
     'push_settings': {
         'push_templates': {
             'process_end_notification': {
                 'enable': True,
+                'coalesce_window': '0s',
                 'title': '进程结束通报',
                 'content': (
                     '主机: {host_name}\n\n'
@@ -50,6 +71,7 @@ DEFAULT_VALUES = {
             },
             'process_timeout_warning': {
                 'enable': True,
+                'coalesce_window': '0s',
                 'title': '进程超时运行警告',
                 'content': (
                     '主机: {host_name}\n\n'
@@ -59,8 +81,46 @@ DEFAULT_VALUES = {
                     '{process_run_time}\n\n'
                 ),
             },
+            'process_timeout_escalation': {
+                'enable': True,
+                'coalesce_window': '0s',
+                'title': '进程超时运行升级警告',
+                'content': (
+                    '主机: {host_name}\n\n'
+                    '当前时间: {current_time}\n\n'
+                    '进程: {process_name} (PID: {process_pid}) '
+                    '已运行 {process_run_time}，'
+                    '超过第 {escalation_level} 级阈值 {escalation_threshold}\n\n'
+                ),
+            },
+            'process_resource_warning': {
+                'enable': True,
+                'coalesce_window': '0s',
+                'title': '进程资源占用警告',
+                'content': (
+                    '主机: {host_name}\n\n'
+                    '当前时间: {current_time}\n\n'
+                    '进程: {process_name} (PID: {process_pid}) '
+                    '{resource_name} 为 {resource_value}，'
+                    '已持续超过阈值 {resource_threshold}\n\n'
+                    '运行时间: {process_run_time}\n\n'
+                ),
+            },
+            'process_resource_recovered': {
+                'enable': True,
+                'coalesce_window': '0s',
+                'title': '进程资源占用恢复',
+                'content': (
+                    '主机: {host_name}\n\n'
+                    '当前时间: {current_time}\n\n'
+                    '进程: {process_name} (PID: {process_pid}) '
+                    '{resource_name} 已回落至 {resource_value}，'
+                    '低于阈值 {resource_threshold}\n\n'
+                ),
+            },
             'process_wait_timeout_warning': {
                 'enable': True,
+                'coalesce_window': '0s',
                 'title': '等待超时未运行报告',
                 'content': (
                     '主机: {host_name}\n\n'
@@ -69,8 +129,33 @@ DEFAULT_VALUES = {
                     '已等待时间: {process_wait_time}\n\n'
                 ),
             },
+            'process_restart_notification': {
+                'enable': True,
+                'coalesce_window': '0s',
+                'title': '进程重启通报',
+                'content': (
+                    '主机: {host_name}\n\n'
+                    '当前时间: {current_time}\n\n'
+                    '进程: {process_name} (PID: {process_pid}) '
+                    '以退出码 {process_exit_code} 结束，运行时间: {process_run_time}\n\n'
+                    '将在 {restart_delay} 后第 {restart_count} 次重启\n\n'
+                ),
+            },
+            'process_crash_loop_notification': {
+                'enable': True,
+                'coalesce_window': '0s',
+                'title': '进程崩溃循环报告',
+                'content': (
+                    '主机: {host_name}\n\n'
+                    '当前时间: {current_time}\n\n'
+                    '进程: {process_name} 已重启 {restart_count} 次仍反复退出，'
+                    '已停止重启\n\n'
+                    '最后一次退出码: {process_exit_code}\n\n'
+                ),
+            },
             'external_program_execution_notification': {
                 'enable': False,
+                'coalesce_window': '0s',
                 'title': '外部程序执行通知',
                 'content': (
                     '主机: {host_name}\n\n'
@@ -78,6 +163,20 @@ DEFAULT_VALUES = {
                     '外部程序已执行:\n\n'
                     '程序名: {external_program_name}\n\n'
                     '程序路径: {external_program_path}\n\n'
+                    '退出码: {external_program_exit_code}\n\n'
+                ),
+            },
+            'notification_digest': {
+                'enable': True,
+                'title': '{digest_title}（共 {digest_count} 条）',
+                'content': (
+                    '主机: {host_name}\n\n'
+                    '当前时间: {current_time}\n\n'
+                    '{digest_items}\n\n'
+                ),
+                'item': (
+                    '{short_current_time} {process_name} (PID: {process_pid}) '
+                    '运行时间: {process_run_time}'
                 ),
             },
         },
@@ -86,10 +185,42 @@ DEFAULT_VALUES = {
             'serverchan_key': '',
             'push_channel': '',
             'push_channel_key': '',
+            'webhook_url': '',
+            'webhook_method': 'POST',
+            'webhook_headers': [],
+            'webhook_body': '{"title": "{title}", "content": "{content}"}',
+            'webhook_timeout': '10s',
+            'webhook_max_connections': 4,
+            'additional_channels': [],
         },
         'push_error_retry': {
             'retry_interval': '3s',
             'max_retry_count': 3,
+            'max_retry_interval': '1m',
+            'retry_jitter': 0.2,
+            'retry_deadline': '2m',
+        },
+        'push_dispatch': {
+            'worker_count': 2,
+            'queue_size': 1000,
+        },
+        'push_circuit_breaker': {
+            'failure_threshold': 3,
+            'reset_timeout': '5m',
+        },
+        'push_outbox': {
+            'enable': True,
+            'path': 'outbox.jsonl',
+            'retry_interval': '30s',
+            'max_retry_interval': '10m',
+            'compact_threshold': 50,
+        },
+        'push_rate_limit': {
+            'channel_burst': 20,
+            'channel_refill_interval': '30s',
+            'template_burst': 10,
+            'template_refill_interval': '1m',
+            'dedup_window': '5m',
         },
     },
     'external_program_settings': {
@@ -97,6 +228,19 @@ DEFAULT_VALUES = {
         'another_external_program_path': 'C:\\path\\to\\another_script.bat',
         'timeout_count_threshold': 3,
         'external_program_on_wait_timeout_path': 'C:\\path\\to\\wait_timeout_script.bat',
+        'max_concurrent_programs': DEFAULT_MAX_CONCURRENT_PROGRAMS,
+        'program_timeout': DEFAULT_PROGRAM_TIMEOUT,
+        'exit_on_threshold': False,
+        'actions': [],
+    },
+    'supervisor_settings': {
+        'restart_policy': 'never',
+        'restart_delay': '1s',
+        'max_restart_delay': '5m',
+        'reset_after': '10m',
+        'crash_loop_threshold': 5,
+        'crash_loop_window': '10m',
+        'stop_timeout': '10s',
     },
     'log_settings': {
         'enable_log_file': True,
@@ -105,6 +249,9 @@ DEFAULT_VALUES = {
         'max_log_files': 15,
         'log_retention_days': 3,
         'log_filename': '2RPM',
+        'latency_log_interval': '10m',
+        'log_queue_size': 10000,
+        'log_overflow_policy': 'drop_new',
     },
 }
 
@@ -116,7 +263,12 @@ COMMENTS = {
             "- 监视程序相关配置\n"
         ),
         'process_name': (
-            "\n要监视的进程名称"
+            "\n要监视的进程名称，可以是单个名称或列表\n"
+            "- 普通名称精确匹配，例如: notepad.exe\n"
+            "- 包含 * ? [ 时按通配符匹配，例如: worker-*.exe\n"
+            "- 以 re: 开头时按正则表达式完整匹配，例如: re:job_\\d+\\.exe\n"
+            "- 列表项也可以写为 {name: 进程名称, max_wait_time: 10m, timeout_escalation_thresholds: [1h]}，\n"
+            "  单独设置该目标的最长等待时间与超时升级阈值"
         ),
         'timeout_warning_interval': (
                     "\n超时警告间隔，默认值15分钟，支持 H/M/S 格式\n"
@@ -124,6 +276,23 @@ COMMENTS = {
                 'monitor_loop_interval': (
                     "\n监视循环间隔，默认值1秒，支持 H/M/S 格式\n"
                 ),
+                'liveness_check_mode': (
+                    "\n进程存活检查方式，默认值: auto\n"
+                    "- auto: Linux 上优先使用 pidfd，其他平台使用 handle\n"
+                    "- pidfd: 进程结束时立即收到通知，无需轮询（仅 Linux 5.3+）\n"
+                    "- handle: 仅检查被监视进程的句柄，开销与系统进程总数无关\n"
+                    "- scan: 每次循环扫描整个进程表\n"
+                ),
+                'process_scanner': (
+                    "\n进程扫描器，默认值: auto\n"
+                    "- auto: Linux 上使用 procfs，其他平台使用 psutil\n"
+                    "- procfs: 直接读取 /proc，开销更低（仅 Linux）\n"
+                    "- psutil: 使用 psutil 获取进程信息\n"
+                ),
+                'timeout_escalation_thresholds': (
+                    "\n超时升级阈值列表，默认值为空，支持 H/M/S 格式，例如: [1h, 4h]\n"
+                    "- 进程运行时间每超过一个阈值，发送一次 process_timeout_escalation 通知\n"
+                ),
     },
     'wait_process_settings': {
         '_comment': (
@@ -136,6 +305,41 @@ COMMENTS = {
             'wait_process_check_interval': (
                 "\n等待进程检查间隔，默认值1秒，支持 H/M/S 格式\n"
             ),
+            'spawn_event_source': (
+                "\n进程启动检测方式，默认值: auto\n"
+                "- auto: Linux 上有权限时使用 netlink，否则使用 scan\n"
+                "- netlink: 由内核推送进程启动事件，毫秒级发现（仅 Linux，需要 root 或 CAP_NET_ADMIN）\n"
+                "- scan: 每个检查间隔增量扫描一次进程表\n"
+            ),
+    },
+    'telemetry_settings': {
+        '_comment': (
+            "资源采样设置\n"
+            "- 定期采样被监视进程的 CPU 使用率、内存、线程数与 IO 计数\n"
+        ),
+        'enable': (
+            "\n是否启用资源采样，默认值: False\n"
+        ),
+        'sample_interval': (
+            "\n采样间隔，默认值5秒，支持 H/M/S 格式\n"
+        ),
+        'buffer_size': (
+            "\n每个指标保留的采样数，默认值: 720（按5秒间隔约为1小时）\n"
+            "- 超出后覆盖最旧的采样，内存占用固定\n"
+        ),
+        'threshold_samples': (
+            "\n连续多少次采样超过阈值后发送 process_resource_warning 通知，默认值: 3\n"
+            "- 回落到阈值以下时发送 process_resource_recovered 通知\n"
+        ),
+        'cpu_percent_threshold': (
+            "\nCPU 使用率阈值（百分比，多核可超过100），0 表示不检查\n"
+        ),
+        'memory_rss_threshold_mb': (
+            "\n内存占用（RSS）阈值，单位 MB，0 表示不检查\n"
+        ),
+        'num_threads_threshold': (
+            "\n线程数阈值，0 表示不检查\n"
+        ),
     },
     'push_settings': {
         '_comment': (
@@ -154,42 +358,104 @@ COMMENTS = {
                 "进程PID: {process_pid}\n"
                 "进程运行时间: {process_run_time}\n"
                 "进程积累等待时间: {process_wait_time}\n"
+                "进程退出码（仅 supervisor 模式，其余情况为 未知）: {process_exit_code}\n"
                 "正在运行的进程状态列表: {other_running_processes}\n"
                 "进程列表: {process_list}\n"
                 "调用的程序名: {external_program_name}\n"
                 "调用的程序路径: {external_program_path}\n"
+                "调用的程序退出码: {external_program_exit_code}\n"
+                "超时升级级别: {escalation_level}\n"
+                "超时升级阈值: {escalation_threshold}\n"
+                "资源指标名称: {resource_name}\n"
+                "资源指标当前值: {resource_value}\n"
+                "资源指标阈值: {resource_threshold}\n"
+                "重启次数: {restart_count}\n"
+                "距下次重启的等待时间: {restart_delay}\n"
+                "每个模板只能使用发送该通知时提供的变量，例如 {process_wait_time} 只用于\n"
+                "process_wait_timeout_warning，{restart_delay} 只用于 process_restart_notification\n"
+                "模板在启动时校验，使用未列出或该通知不提供的变量会导致程序拒绝启动\n\n"
+                "合并窗口: 模板设置 coalesce_window 后，窗口内的同类通知会合并为一条摘要，\n"
+                "同一进程的重复通知只保留最新一条并计数；\n"
+                "为 process_timeout_warning 设置较长的窗口（例如 1h）即可定期推送超时摘要\n"
             ),
             'process_end_notification': (
                 "\n进程结束通知模板\n"
                 "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
                 "- title: 通知标题\n"
                 "- content: 通知内容\n"
             ),
             'process_timeout_warning': (
                 "\n进程超时运行警告模板\n"
                 "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
+                "- title: 通知标题\n"
+                "- content: 通知内容\n"
+            ),
+            'process_timeout_escalation': (
+                "\n进程超时运行升级警告模板\n"
+                "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
+                "- title: 通知标题\n"
+                "- content: 通知内容\n"
+            ),
+            'process_resource_warning': (
+                "\n进程资源占用警告模板\n"
+                "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
+                "- title: 通知标题\n"
+                "- content: 通知内容\n"
+            ),
+            'process_resource_recovered': (
+                "\n进程资源占用恢复模板\n"
+                "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
                 "- title: 通知标题\n"
                 "- content: 通知内容\n"
             ),
             'process_wait_timeout_warning': (
                 "\n等待超时未运行报告模板\n"
                 "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
+                "- title: 通知标题\n"
+                "- content: 通知内容\n"
+            ),
+            'process_restart_notification': (
+                "\nsupervisor 模式下进程退出后重启的通知模板\n"
+                "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
+                "- title: 通知标题\n"
+                "- content: 通知内容\n"
+            ),
+            'process_crash_loop_notification': (
+                "\nsupervisor 模式下检测到崩溃循环、停止重启的通知模板\n"
+                "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
                 "- title: 通知标题\n"
                 "- content: 通知内容\n"
             ),
             'external_program_execution_notification': (
                 "\n外部程序执行通知模板\n"
                 "- enable: 是否启用该通知\n"
+                "- coalesce_window: 合并窗口，默认值0秒（不合并），支持 H/M/S 格式\n"
                 "- title: 通知标题\n"
                 "- content: 通知内容\n"
             ),
+            'notification_digest': (
+                "\n合并摘要模板\n"
+                "- enable: 是否启用摘要，禁用时窗口内的通知逐条发送\n"
+                "- title: 摘要标题，可使用 {digest_title}（原通知标题）与 {digest_count}（通知条数）\n"
+                "- content: 摘要内容，{digest_items} 为逐条渲染 item 后的列表\n"
+                "- item: 摘要中每条通知的格式，可使用原通知的全部变量，\n"
+                "  以及 {digest_repeat}（同一进程的重复次数）\n"
+            ),
         },
         'push_channel_settings': {
             '_comment': (
                 "推送通道设置\n"
             ),
             'choose': (
-                "\n请选择 'ServerChan' 或者 'OnePush' 进行推送，默认为 'ServerChan'"
+                "\n请选择 'ServerChan'、'OnePush' 或者 'Webhook' 进行推送，默认为 'ServerChan'"
             ),
             'serverchan_key': "\nServerChan密钥",
             'push_channel': (
@@ -197,18 +463,108 @@ COMMENTS = {
                 "来获得如何使用帮助）"
             ),
             'push_channel_key': "\nOnePush推送通道密钥",
+            'webhook_url': "\nWebhook 地址，支持 http 与 https，例如: https://example.com/notify",
+            'webhook_method': "\nWebhook 请求方法，默认为 POST",
+            'webhook_headers': (
+                "\nWebhook 额外请求头列表，每项格式为 '名称: 值'，默认为空\n"
+                "- 例如: ['Authorization: Bearer xxx']\n"
+            ),
+            'webhook_body': (
+                "\nWebhook 请求体（JSON），字符串中的 {title} 与 {content} 会被替换为通知标题与内容\n"
+                "- 其他花括号原样保留，无需转义\n"
+            ),
+            'webhook_timeout': "\nWebhook 请求超时时间，默认值: 10秒，支持 H/M/S 格式",
+            'webhook_max_connections': (
+                "\nWebhook 保持的最大连接数，默认值: 4\n"
+                "- 连接在推送之间复用，启动时预先建立\n"
+            ),
+            'additional_channels': (
+                "\n附加推送通道列表，通知会同时发往上面的主通道与全部附加通道，默认为空\n"
+                "- 每项使用与主通道相同的键，例如: {choose: OnePush, push_channel: bark, push_channel_key: xxx}\n"
+                "- 每项可单独设置 max_retry_count，覆盖 push_error_retry 中的最大重试次数\n"
+            ),
         },
         'push_error_retry': {
             '_comment': "推送错误重试设置\n",
             'retry_interval': (
-                "\n重试间隔，默认值: 3000毫秒（3秒），支持 H/M/S 格式\n"
+                "\n首次重试间隔，默认值: 3000毫秒（3秒），支持 H/M/S 格式\n"
             ),
             'max_retry_count': "\n最大重试次数，默认值: 3次",
+            'max_retry_interval': (
+                "\n最长重试间隔，默认值: 1分钟，支持 H/M/S 格式\n"
+                "- 重试间隔从 retry_interval 开始每次翻倍，不超过该值\n"
+            ),
+            'retry_jitter': (
+                "\n重试间隔随机抖动比例，默认值: 0.2\n"
+                "- 实际间隔在计算值的 ±20% 范围内随机，避免多条通知同时重试\n"
+            ),
+            'retry_deadline': (
+                "\n重试总时限，默认值: 2分钟，支持 H/M/S 格式\n"
+                "- 从首次发送开始计算，超过时限后不再重试，通知转入发件箱\n"
+            ),
+        },
+        'push_dispatch': {
+            '_comment': (
+                "推送分发设置\n"
+                "- 通知先放入队列，由后台任务在线程池中发送，监视循环不会因推送缓慢而阻塞\n"
+                "- 多个配置同时运行时共用推送分发器，只使用第一个配置的设置\n"
+            ),
+            'worker_count': "\n同时发送通知的工作线程数，默认值: 2",
+            'queue_size': "\n待发送通知队列容量，队列已满时丢弃新的通知，默认值: 1000",
+        },
+        'push_circuit_breaker': {
+            '_comment': (
+                "推送通道熔断设置\n"
+                "- 每个推送通道独立熔断，熔断期间该通道的通知直接转入发件箱，不影响其他通道\n"
+                "- 多个配置同时运行时共用推送分发器，只使用第一个配置的设置\n"
+            ),
+            'failure_threshold': "\n连续失败多少次后熔断，0 表示不熔断，默认值: 3",
+            'reset_timeout': (
+                "\n熔断持续时间，之后放行一次试探，成功则恢复，默认值: 5分钟，支持 H/M/S 格式\n"
+            ),
+        },
+        'push_outbox': {
+            '_comment': (
+                "发件箱设置\n"
+                "- 重试耗尽仍未送达的通知保存到发件箱文件，后台继续重试，监视不会中断\n"
+                "- 程序退出时仍未送达的通知会在下次启动时重新发送\n"
+                "- 多个配置同时运行时共用推送分发器，只使用第一个配置的设置\n"
+            ),
+            'enable': "\n是否启用发件箱，禁用时重试耗尽的通知会被丢弃，默认值: True",
+            'path': "\n发件箱文件路径，相对路径基于程序所在目录，默认值: outbox.jsonl",
+            'retry_interval': (
+                "\n发件箱首次重试间隔，之后每次失败间隔加倍，默认值: 30秒，支持 H/M/S 格式\n"
+            ),
+            'max_retry_interval': (
+                "\n发件箱最长重试间隔，默认值: 10分钟，支持 H/M/S 格式\n"
+            ),
+            'compact_threshold': "\n已送达记录达到该数量时压缩发件箱文件，默认值: 50",
+        },
+        'push_rate_limit': {
+            '_comment': (
+                "推送限流设置\n"
+                "- 每个推送通道与每个模板各有一个令牌桶，桶空时通知被抑制\n"
+                "- 被抑制的通知数会附加在下一条成功发送的通知中\n"
+                "- 多个配置同时运行时，推送通道的配额只使用第一个配置的设置，模板配额与去重窗口按配置分别生效\n"
+            ),
+            'channel_burst': "\n每个推送通道允许的突发通知数，0 表示不限制，默认值: 20",
+            'channel_refill_interval': (
+                "\n推送通道每恢复一条配额所需的时间，默认值: 30秒，支持 H/M/S 格式\n"
+            ),
+            'template_burst': "\n每个模板允许的突发通知数，0 表示不限制，默认值: 10",
+            'template_refill_interval': (
+                "\n模板每恢复一条配额所需的时间，默认值: 1分钟，支持 H/M/S 格式\n"
+            ),
+            'dedup_window': (
+                "\n去重窗口，窗口内标题与内容完全相同的通知只发送一次，0 表示不去重，默认值: 5分钟\n"
+            ),
         },
     },
     'external_program_settings': {
             '_comment': (
                 "外部程序调用设置\n"
+                "- Windows 上 .exe 直接启动，.ps1 经 PowerShell 执行，\n"
+                "  .bat、.py 等其他文件经 cmd.exe /c 按文件关联打开\n"
             ),
             'external_program_path': (
                 "\n进程结束时触发的外部程序/BAT脚本的详细路径，例如: "
@@ -225,7 +581,64 @@ COMMENTS = {
                 "\n等待进程启动超时后触发的外部程序/BAT脚本的详细路径，例如: "
                 "- 例如: C:\\path\\wait_timeout\\wait_timeout_script.bat"
             ),
+            'max_concurrent_programs': (
+                "\n同时运行的外部程序数量上限，超出时排队等待，默认值: 2"
+            ),
+            'program_timeout': (
+                "\n单个外部程序的最长运行时间，超时后结束该程序，0 表示不限制，默认值: 10分钟，"
+                "支持 H/M/S 格式\n"
+                "- 外部程序的输出会写入日志，结束后记录其退出码"
+            ),
+            'exit_on_threshold': (
+                "\n超时次数达到阈值、启动 threshold 事件的动作后是否结束 2RPM，默认值: False\n"
+                "- 默认继续监视，动作在后台运行；开启时等待动作执行完成后结束运行"
+            ),
+            'actions': (
+                "\n按事件执行的外部程序动作列表，默认为空\n"
+                "- 每项包含 event、path 与可选的 mode、timeout，例如:\n"
+                "  {event: end, path: C:\\path\\backup.bat, mode: sequential, timeout: 30m}\n"
+                "- event: wait_timeout（等待进程启动超时）、start（进程启动）、end（进程结束）、\n"
+                "  warning（进程超时运行警告）、threshold（超时次数达到阈值）\n"
+                "- mode: parallel（默认，启动后立即运行下一个动作）或 sequential\n"
+                "  （结束后才运行同一事件中的下一个动作）\n"
+                "- timeout: 最长运行时间，留空时使用 program_timeout\n"
+                "- 上面的三个程序路径分别作为 wait_timeout、end、threshold 事件的第一个动作\n"
+                "- 每个动作结束后发送 external_program_execution_notification 通知\n"
+            ),
         },
+    'supervisor_settings': {
+        '_comment': (
+            "supervisor 模式设置\n"
+            "- 使用 2RPM -c 配置 -- 命令 参数... 启动时，由 2RPM 启动并监视该命令，\n"
+            "  忽略 monitor_settings.process_name，进程结束时可取得退出码\n"
+            "- 超时警告与 timeout_count_threshold 外部程序调用照常生效\n"
+        ),
+        'restart_policy': (
+            "\n进程退出后是否重启，默认值: never\n"
+            "- never: 不重启，进程退出后 2RPM 结束运行\n"
+            "- on-failure: 退出码不为 0 时重启\n"
+            "- always: 总是重启"
+        ),
+        'restart_delay': (
+            "\n首次重启前的等待时间，之后每次重启翻倍，默认值: 1秒，支持 H/M/S 格式"
+        ),
+        'max_restart_delay': (
+            "\n重启等待时间的上限，默认值: 5分钟，支持 H/M/S 格式"
+        ),
+        'reset_after': (
+            "\n进程持续运行超过该时间后，重启等待时间恢复为 restart_delay，默认值: 10分钟"
+        ),
+        'crash_loop_threshold': (
+            "\n崩溃循环阈值，crash_loop_window 内重启次数达到该值后进程再次退出时停止重启，\n"
+            "- 0 表示不检测，默认值: 5"
+        ),
+        'crash_loop_window': (
+            "\n崩溃循环检测窗口，默认值: 10分钟，支持 H/M/S 格式"
+        ),
+        'stop_timeout': (
+            "\n2RPM 退出时结束子进程的等待时间，超时后强制结束，默认值: 10秒\n"
+        ),
+    },
     'log_settings': {
         '_comment': (
             "日志设置\n"
@@ -248,6 +661,19 @@ COMMENTS = {
         'max_log_files': "\n日志最大保存数量，默认值: 15个",
         'log_retention_days': "\n日志保存天数，单位为天，默认值: 3天",
         'log_filename': "\n日志文件名，时间戳不可修改，默认值: 2RPM",
+        'latency_log_interval': (
+            "\n事件延迟统计的输出间隔，默认值: 10分钟，支持 H/M/S 格式，0 表示只在退出时输出\n"
+            "- 统计检测、渲染、排队、发送、重试与端到端延迟的 p50/p99/最大值\n"
+        ),
+        'log_queue_size': (
+            "\n日志队列容量，文件与控制台输出在后台线程中进行，默认值: 10000条"
+        ),
+        'log_overflow_policy': (
+            "\n日志队列已满（磁盘或控制台输出过慢）时的处理方式，默认值: drop_new\n"
+            "- drop_new: 丢弃新日志，drop_oldest: 丢弃队列中最旧的日志，\n"
+            "  block: 等待队列有空位（会阻塞监视循环）\n"
+            "- 丢弃的条数会在队列恢复后写入日志\n"
+        ),
     },
 }
 
@@ -412,7 +838,10 @@ def migrate_old_config(old_config):
         if 'process_name_list' in monitor_settings:
             process_list = monitor_settings['process_name_list']
             if isinstance(process_list, list) and process_list:
-                migrated_config['monitor_settings']['process_name'] = process_list[0]
+                # process_name 支持多个监视目标，完整保留旧版本的进程列表
+                migrated_config['monitor_settings']['process_name'] = (
+                    process_list[0] if len(process_list) == 1 else list(process_list)
+                )
                 LOGGER.info(f"已迁移 process_name_list 到 process_name: {migrated_config['monitor_settings']['process_name']}")
         elif 'process_name' not in monitor_settings:
             default_process_name = DEFAULT_VALUES['monitor_settings']['process_name']
@@ -711,6 +1140,57 @@ def load_config(config_file):
                 LOGGER.error(f"无法写回配置文件 {os.path.abspath(config_file)}: {e}")
 
     LOGGER.debug("配置参数版本差异检查完成")
+
+    # 预编译通知模板并解析外部程序动作，模板中有未知变量时在启动阶段报错，
+    # 而不是在发送通知时；无效的程序与动作在启动阶段报错并禁用
+    try:
+        resolve_config(merged_config)
+    except TemplateError as e:
+        LOGGER.critical(f"通知模板无效: {e}")
+        raise
+    LOGGER.debug("通知模板已编译")
     return merged_config
 
 
+def resolve_config(config):
+    """编译通知模板并解析外部程序动作，结果保存在配置中。
+
+    Args:
+        config (dict): 配置信息。
+
+    Returns:
+        dict: {'templates': {模板键: CompiledTemplate}, 'actions': ActionPipeline}。
+
+    Raises:
+        TemplateError: 任一模板无效。
+    """
+    resolved = {
+        'templates': compile_templates(
+            config.get('push_settings', {}).get('push_templates', {})),
+        'actions': build_action_pipeline(config.get('external_program_settings', {})),
+    }
+    config[RESOLVED_CONFIG_KEY] = resolved
+    return resolved
+
+
+def get_resolved_config(config):
+    """获取加载配置时编译的模板与解析的动作。
+
+    未经 load_config 加载的配置（例如 get_default_config 的结果）在首次调用时解析，
+    之后修改配置中的模板与动作不会生效。
+
+    Args:
+        config (dict): 配置信息。
+
+    Returns:
+        dict: {'templates': {模板键: CompiledTemplate}, 'actions': ActionPipeline}。
+
+    Raises:
+        TemplateError: 任一模板无效。
+    """
+    resolved = config.get(RESOLVED_CONFIG_KEY)
+    if resolved is None:
+        resolved = resolve_config(config)
+    return resolved
+
+
@@ -3,16 +3,211 @@
 
 import os
 import time
+import queue
+import shutil
 import logging
-from logging.handlers import RotatingFileHandler
+import contextvars
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 import colorama
 
-from ruamel.yaml import YAML
 from modules.utils import get_program_directory
 
 LOGGER = logging.getLogger(__name__)
 
+# 当前任务所属的配置名称，多配置并发运行时用于区分日志来源
+PROFILE_CONTEXT = contextvars.ContextVar('profile', default='')
+
+# 日志队列已满时的处理方式
+LOG_OVERFLOW_POLICIES = ('drop_new', 'drop_oldest', 'block')
+
+# 无法重命名而需要复制日志文件时每次读写的字节数
+LOG_COPY_BUFFER_SIZE = 1024 * 1024
+
+# 当前的日志队列处理器与后台写日志的监听器
+_QUEUE_HANDLER = None
+_LISTENER = None
+
+
+class ProfileLogFilter(logging.Filter):
+    """在日志消息前添加配置名称。
+
+    未设置配置名称（单配置运行）时不修改日志。
+    """
+
+    def filter(self, record):
+        """为日志记录添加配置名称前缀。
+
+        Args:
+            record (LogRecord): 日志记录对象。
+
+        Returns:
+            bool: 始终返回 True。
+        """
+        profile = PROFILE_CONTEXT.get()
+        if profile and not getattr(record, 'profile', None):
+            record.profile = profile
+            record.msg = f"[{profile}] {record.msg}"
+        return True
+
+
+class BoundedQueueHandler(QueueHandler):
+    """把日志记录放入有界队列的处理器。
+
+    队列已满时按溢出策略处理：drop_new 丢弃新记录，drop_oldest 丢弃队列中最旧的记录，
+    block 等待队列有空位。丢弃的条数在队列恢复后以一条警告写入日志。
+    """
+
+    def __init__(self, log_queue, overflow_policy='drop_new'):
+        """初始化处理器。
+
+        Args:
+            log_queue (queue.Queue): 有界日志队列。
+            overflow_policy (str): 溢出策略，见 LOG_OVERFLOW_POLICIES。
+        """
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._unreported = 0
+
+    def enqueue(self, record):
+        """放入一条日志记录，队列已满时按溢出策略处理。
+
+        Args:
+            record (LogRecord): 已预处理的日志记录。
+        """
+        if self.overflow_policy == 'block':
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                break
+            except queue.Full:
+                if self.overflow_policy == 'drop_oldest':
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                self.dropped += 1
+                self._unreported += 1
+                if self.overflow_policy != 'drop_oldest':
+                    return
+        if self._unreported:
+            self._report_dropped()
+
+    def _report_dropped(self):
+        """队列恢复后写入一条丢弃统计。"""
+        record = logging.LogRecord(
+            LOGGER.name, logging.WARNING, __file__, 0,
+            f"日志队列已满，丢弃了 {self._unreported} 条日志", None, None)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            return
+        self._unreported = 0
+
+
+class DrainingQueueListener(QueueListener):
+    """停止时写完队列中全部记录的监听器。"""
+
+    def enqueue_sentinel(self):
+        # 队列已满时等待监听线程腾出空位，保证结束标记排在所有记录之后
+        self.queue.put(self._sentinel)
+
+
+def start_log_queue(handlers, queue_size=10000, overflow_policy='drop_new'):
+    """把处理器移到后台线程，根 logger 只把日志记录放入有界队列。
+
+    文件写入、日志轮转与控制台输出都在监听线程中进行，不阻塞事件循环。
+
+    Args:
+        handlers (list): 由监听线程调用的处理器。
+        queue_size (int): 队列容量，小于 1 时按 1 处理。
+        overflow_policy (str): 溢出策略，见 LOG_OVERFLOW_POLICIES。
+
+    Returns:
+        BoundedQueueHandler: 挂在根 logger 上的队列处理器。
+    """
+    global _QUEUE_HANDLER, _LISTENER
+    stop_log_queue()
+    if overflow_policy not in LOG_OVERFLOW_POLICIES:
+        LOGGER.warning(f"未知的日志队列溢出策略: {overflow_policy}，使用 drop_new")
+        overflow_policy = 'drop_new'
+    log_queue = queue.Queue(max(int(queue_size), 1))
+    queue_handler = BoundedQueueHandler(log_queue, overflow_policy)
+    # 配置名称保存在当前任务的上下文中，需要在记录日志的线程中添加
+    queue_handler.addFilter(ProfileLogFilter())
+    listener = DrainingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logging.getLogger().addHandler(queue_handler)
+    _QUEUE_HANDLER, _LISTENER = queue_handler, listener
+    return queue_handler
+
+
+def stop_log_queue():
+    """写完队列中的日志并停止监听线程。
+
+    监听线程的处理器重新挂到根 logger 上，之后的日志直接写出。
+    """
+    global _QUEUE_HANDLER, _LISTENER
+    if _LISTENER is None:
+        return
+    queue_handler, listener = _QUEUE_HANDLER, _LISTENER
+    _QUEUE_HANDLER = _LISTENER = None
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(queue_handler)
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
+        root_logger.addHandler(handler)
+    if queue_handler.dropped:
+        LOGGER.warning(f"运行期间日志队列共丢弃 {queue_handler.dropped} 条日志")
+
+
+def move_log_file(source, destination):
+    """把日志文件移动到新位置，内存占用与耗时不随文件大小增长。
+
+    同一文件系统中直接重命名；跨文件系统或文件被占用而无法重命名时，
+    分块流式复制后删除源文件，删除失败时最多重试 3 次。
+
+    Args:
+        source (str): 源日志文件路径。
+        destination (str): 目标路径，已存在时内容追加到其末尾。
+
+    Returns:
+        bool: 移动了非空的日志时返回 True，源文件为空时只删除源文件并返回 False。
+
+    Raises:
+        OSError: 读取或写入日志文件失败。
+    """
+    if os.path.getsize(source) == 0:
+        os.remove(source)
+        return False
+    if not os.path.exists(destination):
+        try:
+            os.replace(source, destination)
+            return True
+        except OSError as e:
+            LOGGER.debug(f"无法重命名日志文件 {source}，改为复制: {e}")
+    with open(source, 'rb') as src, open(destination, 'ab') as dst:
+        shutil.copyfileobj(src, dst, LOG_COPY_BUFFER_SIZE)
+
+    # 尝试删除源文件，最多尝试3次
+    max_attempts = 3
+    for attempt in range(max_attempts):
+        try:
+            os.remove(source)
+            LOGGER.debug(f"已删除临时日志文件: {source}")
+            break
+        except OSError as e:
+            if attempt < max_attempts - 1:
+                LOGGER.warning(f"删除临时日志文件失败，{max_attempts - attempt - 1} 次尝试后重试: {e}")
+                time.sleep(0.5)
+            else:
+                LOGGER.warning(f"处理临时日志文件时出错: {e}")
+    return True
+
 
 def setup_default_logging():
     """设置默认日志配置"""
@@ -55,70 +250,25 @@ def setup_default_logging():
     # 控制台处理器
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(color_formatter)
+    console_handler.addFilter(ProfileLogFilter())
     logger.addHandler(console_handler)
 
-    # 处理上次未合并的 default.log 文件
+    # 上次运行未合并的 default.log 先改名保留，加载配置后由 setup_logging 移入日志目录；
+    # 这里只做一次重命名，不读取文件内容，也不为查找日志目录再解析一次配置文件
     program_dir = get_program_directory()
     default_log_file = os.path.join(program_dir, 'default.log')
-    
-    # 检查是否存在上次未合并的 default.log
     if os.path.exists(default_log_file):
+        timestamp = time.strftime('%Y-%m-%d_%H-%M-%S')
         try:
-            # 尝试读取配置文件以获取日志目录设置
-            config_file = os.path.join(program_dir, 'config.yaml')
-            if os.path.exists(config_file):
-                yaml = YAML()
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = yaml.load(f)
-                log_config = config.get('log_settings', {})
-                log_dir = log_config.get('log_directory', 'logs')
-                log_dir = os.path.join(program_dir, log_dir)
-                
-                # 创建日志目录
-                os.makedirs(log_dir, exist_ok=True)
-                
-                # 生成转储日志文件名
-                log_filename = log_config.get('log_filename', '2RPM')
-                timestamp = time.strftime('%Y-%m-%d_%H-%M-%S')
-                dump_log_file = os.path.join(log_dir, f"{log_filename}_dump_{timestamp}.log")
-                
-                # 转储 default.log 内容
-                with open(default_log_file, 'r', encoding='utf-8') as f:
-                    default_log_content = f.read()
-                if default_log_content:
-                    with open(dump_log_file, 'w', encoding='utf-8') as f:
-                        f.write(default_log_content)
-                    # 使用根 logger 记录转储信息
-                    root_logger = logging.getLogger()
-                    root_logger.info(f"已将上次未合并的日志转储到: {dump_log_file}")
-                
-                # 清理转储的日志文件，确保符合配置限制
-                max_days = log_config.get('log_retention_days', 3)
-                max_files = log_config.get('max_log_files', 15)
-                files = sorted(Path(log_dir).glob('*.log'), key=os.path.getmtime)
-                now = time.time()
-                
-                # 按天数清理
-                for file_path in files:
-                    if now - file_path.stat().st_mtime > max_days * 86400:
-                        try:
-                            file_path.unlink()
-                        except Exception:
-                            pass
-                
-                # 按数量清理
-                if len(files) > max_files:
-                    for file_path in files[:len(files) - max_files]:
-                        try:
-                            file_path.unlink()
-                        except Exception:
-                            pass
-            # 删除 default.log 文件
-            os.remove(default_log_file)
-        except Exception:
-            # 如果处理失败，继续执行，不影响程序启动
+            # 同一秒内已有未合并的日志时不覆盖它
+            pending_log_file = f"{default_log_file}.{timestamp}"
+            if os.path.exists(pending_log_file):
+                raise FileExistsError(pending_log_file)
+            os.rename(default_log_file, pending_log_file)
+        except OSError:
+            # 如果处理失败，继续执行，新日志追加到原文件末尾，不影响程序启动
             pass
-    
+
     # 确保目录存在
     os.makedirs(os.path.dirname(default_log_file) or '.', exist_ok=True)
     
@@ -130,6 +280,7 @@ def setup_default_logging():
         default_log_file, encoding='utf-8'
     )
     file_handler.setFormatter(file_formatter)
+    file_handler.addFilter(ProfileLogFilter())
     logger.addHandler(file_handler)
 
 
@@ -163,7 +314,8 @@ def setup_logging(config):
     root_logger.setLevel(log_level)
     LOGGER.info(f"日志级别设置: {log_level_str.upper()}")
 
-    # 清除之前的处理器
+    # 清除之前的处理器，先写完上一次设置的日志队列
+    stop_log_queue()
     default_log_file = os.path.join(program_dir, 'default.log')
     
     for handler in root_logger.handlers[:]:
@@ -214,6 +366,7 @@ def setup_logging(config):
         datefmt='%H:%M:%S'
     )
     console_handler.setFormatter(color_formatter)
+    console_handler.addFilter(ProfileLogFilter())
     root_logger.addHandler(console_handler)
     LOGGER.info("控制台日志处理器已就绪")
 
@@ -227,32 +380,24 @@ def setup_logging(config):
         log_file = os.path.join(log_dir, f"{log_filename}_{timestamp}.log")
         LOGGER.info(f"日志文件输出: {log_file}")
 
-        # 合并默认日志文件内容
+        # 合并默认日志文件内容：重命名为新的日志文件，内容不经过内存
         if os.path.exists(default_log_file):
             try:
-                with open(default_log_file, 'r', encoding='utf-8') as f:
-                    default_log_content = f.read()
-                if default_log_content:
-                    # 将默认日志内容写入新的日志文件开头
-                    with open(log_file, 'w', encoding='utf-8') as f:
-                        f.write(default_log_content)
+                if move_log_file(default_log_file, log_file):
                     LOGGER.info("已将初始化日志合并")
-                # 尝试删除默认日志文件，最多尝试3次
-                max_attempts = 3
-                for attempt in range(max_attempts):
-                    try:
-                        os.remove(default_log_file)
-                        LOGGER.debug("已删除临时日志文件")
-                        break
-                    except Exception as e:
-                        if attempt < max_attempts - 1:
-                            LOGGER.warning(f"删除临时日志文件失败，{max_attempts - attempt - 1} 次尝试后重试: {e}")
-                            time.sleep(0.5)
-                        else:
-                            LOGGER.warning(f"处理临时日志文件时出错: {e}")
-            except Exception as e:
+            except OSError as e:
                 LOGGER.warning(f"处理临时日志文件时出错: {e}")
 
+        # 上次运行未合并的日志转储到日志目录
+        for stale_log_file in sorted(Path(program_dir).glob('default.log.*')):
+            timestamp = stale_log_file.name[len('default.log.'):]
+            dump_log_file = os.path.join(log_dir, f"{log_filename}_dump_{timestamp}.log")
+            try:
+                if move_log_file(str(stale_log_file), dump_log_file):
+                    LOGGER.info(f"已将上次未合并的日志转储到: {dump_log_file}")
+            except OSError as e:
+                LOGGER.warning(f"转储上次未合并的日志时出错: {e}")
+
         # 创建文件处理器
         file_handler = RotatingFileHandler(
             log_file,
@@ -262,21 +407,35 @@ def setup_logging(config):
         )
         file_handler.setFormatter(file_formatter)
         file_handler.setLevel(log_level)
+        file_handler.addFilter(ProfileLogFilter())
         root_logger.addHandler(file_handler)
         LOGGER.info("日志文件处理器已就绪")
 
         # 日志自清洁
         clean_logs(log_dir, config)
     else:
-        # 即使禁用日志文件，也清理默认日志文件
-        if os.path.exists(default_log_file):
-            try:
-                os.remove(default_log_file)
-                LOGGER.info("已删除临时日志文件")
-            except Exception as e:
-                LOGGER.warning(f"删除临时日志文件时出错: {e}")
+        # 即使禁用日志文件，也清理默认日志文件与上次未合并的日志
+        stale_log_files = [str(path) for path in Path(program_dir).glob('default.log.*')]
+        for temp_log_file in [default_log_file] + stale_log_files:
+            if os.path.exists(temp_log_file):
+                try:
+                    os.remove(temp_log_file)
+                    LOGGER.info(f"已删除临时日志文件: {temp_log_file}")
+                except Exception as e:
+                    LOGGER.warning(f"删除临时日志文件时出错: {e}")
         LOGGER.info("日志文件输出已禁用")
 
+    # 文件与控制台输出移到后台线程，记录日志时只把记录放入队列
+    handlers = [console_handler]
+    if enable_log_file:
+        handlers.append(file_handler)
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    queue_size = log_config.get('log_queue_size', 10000)
+    overflow_policy = log_config.get('log_overflow_policy', 'drop_new')
+    start_log_queue(handlers, queue_size, overflow_policy)
+    LOGGER.info(f"日志队列已启用，容量: {queue_size}，队列已满时: {overflow_policy}")
+
 
 def clean_logs(log_dir, config):
     """清理过期日志文件。
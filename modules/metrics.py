@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import bisect
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+# 事件处理各阶段
+STAGES = ('detect', 'render', 'queue', 'send', 'retries', 'total')
+STAGE_LABELS = {
+    'detect': '检测延迟',
+    'render': '渲染耗时',
+    'queue': '排队等待',
+    'send': '单次发送',
+    'retries': '重试耗时',
+    'total': '端到端',
+}
+
+# 直方图桶上界，单位为秒，从 1 ms 开始按 2 倍递增，最后一个桶约 2.3 小时
+BUCKET_BOUNDS = tuple(0.001 * 2 ** index for index in range(24))
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图。
+
+    只保存各桶计数、总和与最大值，内存占用固定；分位数以所在桶的上界近似。
+    """
+
+    def __init__(self, bounds=BUCKET_BOUNDS):
+        """初始化直方图。
+
+        Args:
+            bounds (tuple): 升序排列的桶上界，单位为秒，超过最后一个上界的值计入溢出桶。
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """记录一次延迟。
+
+        Args:
+            seconds (float): 延迟，单位为秒，负值按 0 记录。
+        """
+        seconds = max(seconds, 0.0)
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent):
+        """计算近似分位数。
+
+        Args:
+            percent (float): 百分位，取值 0 到 100。
+
+        Returns:
+            float: 分位数，单位为秒；没有记录时返回 0。
+        """
+        if not self.count:
+            return 0.0
+        rank = max(self.count * percent / 100, 1)
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                if index >= len(self.bounds):
+                    return self.max
+                return min(self.bounds[index], self.max)
+        return self.max
+
+    def snapshot(self):
+        """获取直方图的统计值。
+
+        Returns:
+            dict: count、mean、p50、p90、p99 与 max，时间单位为秒。
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class LatencyMetrics:
+    """事件处理各阶段的延迟直方图集合。"""
+
+    def __init__(self):
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+    def record(self, stage, seconds):
+        """记录一个阶段的延迟。
+
+        Args:
+            stage (str): 阶段名称，见 STAGES。
+            seconds (float): 延迟，单位为秒。
+        """
+        self.histograms[stage].record(seconds)
+
+    def snapshot(self):
+        """获取各阶段的统计值。
+
+        Returns:
+            dict: {阶段: 统计值}，没有记录的阶段也会包含在内。
+        """
+        return {stage: histogram.snapshot() for stage, histogram in self.histograms.items()}
+
+    def format_summary(self):
+        """格式化有记录的阶段的统计值，用于日志。
+
+        Returns:
+            str: 统计摘要；没有任何记录时返回空字符串。
+        """
+        parts = []
+        for stage, stats in self.snapshot().items():
+            if not stats['count']:
+                continue
+            parts.append(
+                f"{STAGE_LABELS[stage]} n={stats['count']} "
+                f"p50={stats['p50'] * 1000:.0f}ms p99={stats['p99'] * 1000:.0f}ms "
+                f"max={stats['max'] * 1000:.0f}ms"
+            )
+        return '; '.join(parts)
+
+    def reset(self):
+        """清空所有记录。"""
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+
+# 进程内共享的延迟统计
+LATENCY_METRICS = LatencyMetrics()
+
+
+def record_latency(stage, seconds):
+    """记录一个阶段的延迟到进程内共享的统计中。
+
+    Args:
+        stage (str): 阶段名称，见 STAGES。
+        seconds (float): 延迟，单位为秒。
+    """
+    LATENCY_METRICS.record(stage, seconds)
+
+
+def get_latency_metrics():
+    """获取进程内共享的各阶段延迟统计。
+
+    Returns:
+        dict: {阶段: {'count', 'mean', 'p50', 'p90', 'p99', 'max'}}，时间单位为秒。
+    """
+    return LATENCY_METRICS.snapshot()
+
+
+def log_latency_metrics():
+    """把各阶段延迟统计写入日志。"""
+    summary = LATENCY_METRICS.format_summary()
+    if summary:
+        LOGGER.info(f"事件延迟统计: {summary}")
@@ -1,182 +1,1732 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
+import re
 import time
+import fnmatch
+import socket
+import struct
 import asyncio
 import logging
 import sys
+import functools
 import psutil
 
 from modules.utils import (
     format_time_ms,
-    run_external_program,
     get_other_running_processes,
     parse_time_string
 )
-from modules.notification import send_notification
-from modules.config import DEFAULT_VALUES
+from modules.notification import (
+    send_notification,
+    start_notifications,
+    flush_notifications,
+    close_notifications,
+)
+from modules.config import DEFAULT_VALUES, get_resolved_config
+from modules.logger import PROFILE_CONTEXT
+from modules.scheduler import DeadlineScheduler
+from modules.metrics import record_latency
+from modules.runner import get_program_runner, close_program_runner
+from modules.telemetry import (
+    TelemetrySampler,
+    METRIC_LABELS,
+    format_metric_value,
+    parse_telemetry_thresholds,
+)
 
 LOGGER = logging.getLogger(__name__)
 
+# 没有任何待处理截止时间时的最长休眠时间（毫秒）
+IDLE_WAKEUP_INTERVAL_MS = 60000
+# 退出前等待剩余通知发送的最长时间（秒）
+NOTIFICATION_FLUSH_TIMEOUT = 30
+# 退出前等待后台外部程序结束的最长时间（秒）
+PROGRAM_SHUTDOWN_TIMEOUT = 30
+# 无法取得退出码时 {process_exit_code} 的值
+UNKNOWN_EXIT_CODE = '未知'
+
+
+class PsutilProcessScanner:
+    """基于 psutil 的进程扫描器，适用于所有平台。"""
+
+    name = 'psutil'
+
+    def pids(self):
+        """列出当前所有进程的 PID。
+
+        Returns:
+            list: PID 列表。
+        """
+        return psutil.pids()
+
+    def read(self, pid):
+        """读取进程的名称与创建时间。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 进程信息，进程已退出时返回 None。
+        """
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                create_time = process.create_time()
+                try:
+                    name = process.name()
+                except psutil.AccessDenied:
+                    name = None
+        except psutil.NoSuchProcess:
+            return None
+        except psutil.AccessDenied:
+            # 无权限读取创建时间的进程仍记录在表中，避免每次刷新重复读取
+            return {'pid': pid, 'name': None, 'create_time': None}
+        return {'pid': pid, 'name': name, 'create_time': create_time}
+
+    def read_name(self, pid):
+        """重新读取进程名称。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            str: 进程名称，无法读取时返回 None。
+        """
+        try:
+            return psutil.Process(pid).name()
+        except psutil.Error:
+            return None
+
+    def read_create_time(self, pid):
+        """重新读取进程的创建时间，用于识别 PID 复用。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            float: 创建时间，进程已退出或无法读取时返回 None。
+        """
+        try:
+            return psutil.Process(pid).create_time()
+        except psutil.Error:
+            return None
+
+
+class ProcfsProcessScanner:
+    """直接读取 /proc 的进程扫描器（仅 Linux）。
+
+    使用 os.scandir 列出 PID，每个进程只读取 /proc/[pid]/stat，
+    不创建 psutil.Process 对象。名称与创建时间的计算方式与 psutil 一致，
+    因此两种扫描器得到的进程身份可以互相比对。
+
+    Args:
+        proc_root (str): procfs 挂载路径，默认为 /proc。
+    """
+
+    name = 'procfs'
+
+    # comm 最多保留 15 个字符
+    COMM_MAX_LENGTH = 15
+
+    def __init__(self, proc_root='/proc'):
+        self._proc_root = proc_root
+        self._clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._boot_time = self._read_boot_time()
+
+    @staticmethod
+    def is_supported(proc_root='/proc'):
+        """检查当前系统是否可以直接读取 procfs。
+
+        Args:
+            proc_root (str): procfs 挂载路径。
+
+        Returns:
+            bool: 可用时返回 True。
+        """
+        return (sys.platform.startswith('linux') and
+                os.path.exists(os.path.join(proc_root, 'self', 'stat')))
+
+    def pids(self):
+        """列出当前所有进程的 PID。
+
+        Returns:
+            list: PID 列表。
+        """
+        with os.scandir(self._proc_root) as entries:
+            return [int(entry.name) for entry in entries if entry.name.isdigit()]
+
+    def read(self, pid):
+        """读取进程的名称与创建时间。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 进程信息，进程已退出时返回 None。
+        """
+        try:
+            name, start_ticks = self._read_stat(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            return None
+        except PermissionError:
+            return {'pid': pid, 'name': None, 'create_time': None}
+        create_time = float(start_ticks) / self._clock_ticks + self._boot_time
+        return {'pid': pid, 'name': name, 'create_time': create_time}
+
+    def read_name(self, pid):
+        """重新读取进程名称。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            str: 进程名称，无法读取时返回 None。
+        """
+        try:
+            return self._read_stat(pid)[0]
+        except OSError:
+            return None
+
+    def read_create_time(self, pid):
+        """重新读取进程的创建时间，只解析 /proc/[pid]/stat，不补全名称。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            float: 创建时间，进程已退出或无法读取时返回 None。
+        """
+        try:
+            with open(f"{self._proc_root}/{pid}/stat", 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        start_ticks = self._parse_start_ticks(data, data.rfind(b')'))
+        return float(start_ticks) / self._clock_ticks + self._boot_time
+
+    @staticmethod
+    def _parse_start_ticks(data, name_end):
+        """解析 stat 中的启动时间。
+
+        Args:
+            data (bytes): /proc/[pid]/stat 的内容。
+            name_end (int): 名称结尾右括号的位置。
+
+        Returns:
+            int: 自系统启动起的时钟节拍数。
+        """
+        # 第 22 个字段 starttime，右括号之后从第 3 个字段开始计数
+        return int(data[name_end + 2:].split()[19])
+
+    def _read_stat(self, pid):
+        """解析 /proc/[pid]/stat 中的名称与启动时间。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            tuple: (名称, 自系统启动起的时钟节拍数)。
+        """
+        with open(f"{self._proc_root}/{pid}/stat", 'rb') as f:
+            data = f.read()
+        # 名称可能包含空格和括号，以最后一个右括号为界
+        name_end = data.rfind(b')')
+        name = os.fsdecode(data[data.find(b'(') + 1:name_end])
+        start_ticks = self._parse_start_ticks(data, name_end)
+        if len(name) >= self.COMM_MAX_LENGTH:
+            name = self._extend_name(pid, name)
+        return name, start_ticks
+
+    def _extend_name(self, pid, name):
+        """名称被截断时，与 psutil 一样尝试用命令行的首个参数补全。
+
+        Args:
+            pid (int): 进程 PID。
+            name (str): 截断后的名称。
+
+        Returns:
+            str: 补全后的名称。
+        """
+        try:
+            with open(f"{self._proc_root}/{pid}/cmdline", 'rb') as f:
+                data = f.read()
+        except OSError:
+            return name
+        if not data:
+            return name
+        separator = b'\0' if b'\0' in data else b' '
+        extended_name = os.path.basename(os.fsdecode(data.split(separator)[0]))
+        return extended_name if extended_name.startswith(name) else name
+
+    def _read_boot_time(self):
+        """读取系统启动时间。
+
+        Returns:
+            float: 自纪元起的秒数。
+        """
+        with open(f"{self._proc_root}/stat", 'rb') as f:
+            for line in f:
+                if line.startswith(b'btime'):
+                    return float(line.split()[1])
+        raise RuntimeError(f"无法从 {self._proc_root}/stat 读取系统启动时间")
+
+
+def create_process_scanner(mode):
+    """根据配置创建进程扫描器。
+
+    Args:
+        mode (str): 扫描器类型，'auto'、'procfs' 或 'psutil'。
+
+    Returns:
+        ProcfsProcessScanner | PsutilProcessScanner: 进程扫描器。
+    """
+    if mode in ('auto', 'procfs'):
+        if ProcfsProcessScanner.is_supported():
+            LOGGER.info("进程扫描器: procfs")
+            return ProcfsProcessScanner()
+        if mode == 'procfs':
+            LOGGER.warning("当前系统不支持直接读取 /proc，回退到 psutil")
+    elif mode != 'psutil':
+        LOGGER.warning(f"未知的进程扫描器: {mode}，使用 psutil")
+    LOGGER.info("进程扫描器: psutil")
+    return PsutilProcessScanner()
+
+
+class ProcessTable:
+    """增量维护的进程表。
+
+    以 (pid, create_time) 作为进程身份，仅在 PID 首次出现时读取进程属性，
+    每次刷新只返回与上一次快照相比新增和消失的进程。通过 watch() 登记的 PID
+    （被监视的进程）每次刷新会重新读取创建时间，创建时间变化说明 PID 已被复用，
+    原进程按结束、新进程按新增报告；其余进程不再读取，刷新开销只与新增进程数有关。
+
+    新进程在 fork 之后、exec 之前被读取时，名称仍是父进程的名称，
+    因此上一次刷新中新增的进程会在下一次刷新时再核对一次名称，
+    名称发生变化的进程会再次出现在新增列表中。已知进程在较晚时候 exec
+    的情况由每 name_recheck_interval 次刷新一次的全量名称核对兜底。
+
+    Args:
+        scanner (PsutilProcessScanner | ProcfsProcessScanner): 进程扫描器，
+            默认使用 psutil。
+        name_recheck_interval (int): 全量核对进程名称的刷新间隔次数，
+            0 表示不做全量核对。
+    """
+
+    def __init__(self, scanner=None, name_recheck_interval=30):
+        self._scanner = scanner or PsutilProcessScanner()
+        self._entries = {}
+        self._index = {}
+        self._recent_pids = set()
+        self._watched_pids = set()
+        self._name_recheck_interval = name_recheck_interval
+        self._refresh_count = 0
+
+    def watch(self, pid):
+        """登记需要在每次刷新时识别 PID 复用的进程。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._watched_pids.add(pid)
+
+    def unwatch(self, pid):
+        """取消登记。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._watched_pids.discard(pid)
+
+    def refresh(self):
+        """刷新进程表并返回差异。
+
+        Returns:
+            tuple: (added, removed)，均为 {pid: info} 字典，
+                info 包含 'pid'、'name'、'create_time'。
+        """
+        current_pids = set(self._scanner.pids())
+        known_pids = set(self._index)
+
+        removed = {}
+        for pid in known_pids - current_pids:
+            removed[pid] = self._entries.pop(self._index.pop(pid))
+
+        new_pids = current_pids - known_pids
+        for pid in self._watched_pids & known_pids & current_pids:
+            create_time = self._scanner.read_create_time(pid)
+            old_create_time = self._entries[self._index[pid]]['create_time']
+            if (create_time is not None and old_create_time is not None and
+                    create_time != old_create_time):
+                # PID 在两次刷新之间被复用，原进程已结束，新进程作为新增读取
+                removed[pid] = self._entries.pop(self._index.pop(pid))
+                new_pids.add(pid)
+
+        self._refresh_count += 1
+        if (self._name_recheck_interval and
+                self._refresh_count % self._name_recheck_interval == 0):
+            recheck_pids = known_pids & current_pids
+        else:
+            recheck_pids = self._recent_pids & current_pids
+
+        added = {}
+        for pid in recheck_pids - new_pids:
+            info = self._entries[self._index[pid]]
+            name = self._scanner.read_name(pid)
+            if name is not None and name != info['name']:
+                info['name'] = name
+                added[pid] = info
+
+        self._recent_pids = set()
+        for pid in new_pids:
+            info = self._scanner.read(pid)
+            if info is None:
+                continue
+            key = (pid, info['create_time'])
+            self._entries[key] = info
+            self._index[pid] = key
+            added[pid] = info
+            self._recent_pids.add(pid)
+
+        LOGGER.debug(
+            f"进程表已刷新: 共 {len(self._entries)} 个进程，"
+            f"新增 {len(added)} 个，结束 {len(removed)} 个"
+        )
+        return added, removed
+
+    def get(self, pid):
+        """获取进程表中指定 PID 的信息。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 进程信息，不存在时返回 None。
+        """
+        key = self._index.get(pid)
+        return self._entries.get(key) if key is not None else None
+
+    def update(self, pid):
+        """重新读取指定 PID 的属性并更新进程表。
+
+        用于事件源报告了进程 exec 或改名的情况。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 最新的进程信息，进程已退出时返回 None。
+        """
+        old_key = self._index.pop(pid, None)
+        if old_key is not None:
+            del self._entries[old_key]
+        info = self._scanner.read(pid)
+        if info is None:
+            return None
+        key = (pid, info['create_time'])
+        self._entries[key] = info
+        self._index[pid] = key
+        return info
+
+    def items(self):
+        """遍历进程表中的所有进程。
+
+        Returns:
+            iterator: (pid, info) 迭代器。
+        """
+        return ((info['pid'], info) for info in self._entries.values())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedProcessTable:
+    """多个配置共享的进程表。
+
+    各配置通过 view() 获得独立的视图，视图记录各自尚未取走的差异。
+    在 max_age 内的多次刷新只扫描一次进程表，同一时刻醒来的多个配置
+    因此共享同一份快照。
+
+    Args:
+        scanner (PsutilProcessScanner | ProcfsProcessScanner): 进程扫描器。
+        max_age (float): 快照的最长复用时间，单位为秒。
+    """
+
+    def __init__(self, scanner=None, max_age=0.2):
+        self._table = ProcessTable(scanner)
+        self._max_age = max_age
+        self._views = []
+        # 各视图登记的 PID 数: {pid: 登记次数}
+        self._watch_counts = {}
+        self._last_refresh_time = None
+
+    def view(self):
+        """创建一个新的进程表视图。
+
+        Returns:
+            ProcessTableView: 进程表视图，首次刷新时报告当前所有进程。
+        """
+        view = ProcessTableView(self, dict(self._table.items()))
+        self._views.append(view)
+        return view
+
+    def remove_view(self, view):
+        """移除不再使用的视图。
+
+        Args:
+            view (ProcessTableView): 进程表视图。
+        """
+        if view in self._views:
+            self._views.remove(view)
+
+    def watch(self, pid):
+        """登记需要识别 PID 复用的进程，多个视图可以登记同一个 PID。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._watch_counts[pid] = self._watch_counts.get(pid, 0) + 1
+        self._table.watch(pid)
+
+    def unwatch(self, pid):
+        """取消一次登记，所有视图都取消后不再识别该 PID 的复用。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        count = self._watch_counts.pop(pid, 0) - 1
+        if count > 0:
+            self._watch_counts[pid] = count
+        else:
+            self._table.unwatch(pid)
+
+    def refresh(self):
+        """快照过期时扫描进程表，并把差异分发给所有视图。"""
+        now = time.perf_counter()
+        if (self._last_refresh_time is not None and
+                now - self._last_refresh_time < self._max_age):
+            return
+        self._last_refresh_time = now
+        added, removed = self._table.refresh()
+        for view in self._views:
+            view.push(added, removed)
+
+    def update(self, pid):
+        """重新读取指定 PID 的属性并通知所有视图。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 最新的进程信息，进程已退出时返回 None。
+        """
+        info = self._table.update(pid)
+        if info is not None:
+            for view in self._views:
+                view.push({pid: info}, {})
+        return info
+
+    def get(self, pid):
+        """获取进程表中指定 PID 的信息。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 进程信息，不存在时返回 None。
+        """
+        return self._table.get(pid)
+
+
+class ProcessTableView:
+    """共享进程表的单个配置视图，接口与 ProcessTable 相同。
+
+    Args:
+        shared_table (SharedProcessTable): 共享进程表。
+        initial (dict): 创建视图时已存在的进程 {pid: info}。
+    """
+
+    def __init__(self, shared_table, initial):
+        self._shared_table = shared_table
+        self._added = initial
+        self._removed = {}
+        self._watched_pids = set()
+
+    def watch(self, pid):
+        """登记需要识别 PID 复用的进程。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        if pid not in self._watched_pids:
+            self._watched_pids.add(pid)
+            self._shared_table.watch(pid)
+
+    def unwatch(self, pid):
+        """取消登记。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        if pid in self._watched_pids:
+            self._watched_pids.discard(pid)
+            self._shared_table.unwatch(pid)
+
+    def push(self, added, removed):
+        """累积共享进程表分发的差异。
+
+        Args:
+            added (dict): 新增的进程 {pid: info}。
+            removed (dict): 消失的进程 {pid: info}。
+        """
+        for pid, info in removed.items():
+            pending = self._added.get(pid)
+            if pending is not None and pending['create_time'] == info['create_time']:
+                # 尚未取走就已结束的进程，对该视图而言从未出现过
+                del self._added[pid]
+            else:
+                self._removed[pid] = info
+        self._added.update(added)
+
+    def refresh(self):
+        """刷新共享进程表并取走累积的差异。
+
+        Returns:
+            tuple: (added, removed)，均为 {pid: info} 字典。
+        """
+        self._shared_table.refresh()
+        added, self._added = self._added, {}
+        removed, self._removed = self._removed, {}
+        return added, removed
+
+    def update(self, pid):
+        """重新读取指定 PID 的属性。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 最新的进程信息，进程已退出时返回 None。
+        """
+        info = self._shared_table.update(pid)
+        self._added.pop(pid, None)
+        return info
+
+    def get(self, pid):
+        """获取进程表中指定 PID 的信息。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 进程信息，不存在时返回 None。
+        """
+        return self._shared_table.get(pid)
+
+    def close(self):
+        """从共享进程表上解除视图，之后的扫描不再累积差异。"""
+        for pid in list(self._watched_pids):
+            self.unwatch(pid)
+        self._shared_table.remove_view(self)
+
+
+class HandleLivenessChecker:
+    """基于进程句柄的存活检查。
+
+    为每个被监视的 PID 保留一个 psutil.Process 句柄，每次检查只访问这些进程，
+    开销与系统中的进程总数无关。通过比对创建时间识别 PID 复用。
+    """
+
+    # 需要监视循环定期调用 poll() 才能发现进程结束
+    requires_polling = True
+
+    def __init__(self):
+        self._handles = {}
+        self._last_poll_time = None
+        self._previous_poll_time = None
+
+    def add(self, pid, create_time):
+        """添加需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+            create_time (float): 检测到进程时记录的创建时间。
+        """
+        try:
+            handle = psutil.Process(pid)
+            if create_time is not None and handle.create_time() != create_time:
+                LOGGER.warning(f"进程 PID {pid} 已被复用，原进程已结束")
+                handle = None
+        except psutil.NoSuchProcess:
+            handle = None
+        except psutil.AccessDenied:
+            LOGGER.debug(f"无权限读取进程 PID {pid} 的创建时间，跳过身份核对")
+        self._handles[pid] = handle
+
+    def remove(self, pid):
+        """移除不再需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._handles.pop(pid, None)
+
+    def poll(self):
+        """检查所有被监视进程是否仍在运行。
+
+        Returns:
+            list: 已结束的进程 PID 列表。
+        """
+        self._previous_poll_time, self._last_poll_time = self._last_poll_time, time.perf_counter()
+        ended_pids = []
+        for pid, handle in self._handles.items():
+            # is_running() 会比对创建时间，PID 被复用时返回 False
+            try:
+                if (handle is None or not handle.is_running() or
+                        handle.status() == psutil.STATUS_ZOMBIE):
+                    ended_pids.append(pid)
+            except psutil.NoSuchProcess:
+                ended_pids.append(pid)
+            except psutil.AccessDenied:
+                continue
+        return ended_pids
+
+    async def wait(self, timeout):
+        """等待到下一次检查。
+
+        Args:
+            timeout (float): 等待时间，单位为秒。
+        """
+        await asyncio.sleep(timeout)
+
+    def exit_time(self, pid):
+        """获取进程结束时间的下界。
+
+        轮询只能确定进程在上一次检查之后结束，返回上一次检查的时间。
+
+        Args:
+            pid (int): 已结束的进程 PID。
+
+        Returns:
+            float: perf_counter 秒，首次检查即发现结束时返回 None。
+        """
+        return self._previous_poll_time
+
+    def close(self):
+        """释放检查器持有的资源。"""
+        self._handles.clear()
+
+
+class PidfdLivenessChecker:
+    """基于 pidfd 的事件驱动进程结束检测（仅 Linux 5.3+）。
+
+    为每个被监视的 PID 打开一个 pidfd 并注册到 asyncio 事件循环，
+    进程退出时 pidfd 变为可读，监视循环会被立即唤醒，无需轮询。
+    """
+
+    # 进程结束时 wait() 会被立即唤醒，无需定期检查
+    requires_polling = False
+
+    def __init__(self):
+        self._loop = asyncio.get_running_loop()
+        self._fds = {}
+        self._ended_pids = []
+        # 各进程收到退出通知的时间（perf_counter 秒）
+        self._exit_times = {}
+        self._exit_event = asyncio.Event()
+
+    @staticmethod
+    def is_supported():
+        """检查当前平台与内核是否支持 pidfd。
+
+        Returns:
+            bool: 支持时返回 True。
+        """
+        if not hasattr(os, 'pidfd_open'):
+            return False
+        try:
+            fd = os.pidfd_open(os.getpid())
+        except OSError:
+            return False
+        os.close(fd)
+        return True
+
+    def add(self, pid, create_time):
+        """添加需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+            create_time (float): 检测到进程时记录的创建时间。
+        """
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            self._mark_ended(pid)
+            return
+
+        # pidfd 指向打开时的进程，打开后再核对创建时间以排除 PID 复用
+        try:
+            if (create_time is not None and
+                    psutil.Process(pid).create_time() != create_time):
+                LOGGER.warning(f"进程 PID {pid} 已被复用，原进程已结束")
+                os.close(fd)
+                self._mark_ended(pid)
+                return
+        except psutil.NoSuchProcess:
+            os.close(fd)
+            self._mark_ended(pid)
+            return
+        except psutil.AccessDenied:
+            LOGGER.debug(f"无权限读取进程 PID {pid} 的创建时间，跳过身份核对")
+
+        self._fds[pid] = fd
+        self._loop.add_reader(fd, self._on_exit, pid)
+        LOGGER.debug(f"已为进程 PID {pid} 注册 pidfd: {fd}")
+
+    def remove(self, pid):
+        """移除不再需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            self._loop.remove_reader(fd)
+            os.close(fd)
+        if pid in self._ended_pids:
+            self._ended_pids.remove(pid)
+        self._exit_times.pop(pid, None)
+
+    def poll(self):
+        """取出自上次检查以来已结束的进程。
+
+        Returns:
+            list: 已结束的进程 PID 列表。
+        """
+        ended_pids, self._ended_pids = self._ended_pids, []
+        return ended_pids
+
+    async def wait(self, timeout):
+        """等待到下一次检查，或有进程结束时提前返回。
+
+        Args:
+            timeout (float): 最长等待时间，单位为秒。
+        """
+        if self._ended_pids:
+            return
+        self._exit_event.clear()
+        try:
+            await asyncio.wait_for(self._exit_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def exit_time(self, pid):
+        """获取进程结束时间的下界。
+
+        Args:
+            pid (int): 已结束的进程 PID。
+
+        Returns:
+            float: 收到退出通知的时间（perf_counter 秒），没有记录时返回 None。
+        """
+        return self._exit_times.get(pid)
+
+    def close(self):
+        """注销并关闭所有 pidfd。"""
+        for pid in list(self._fds):
+            self.remove(pid)
+
+    def _on_exit(self, pid):
+        """pidfd 可读时的回调，表示进程已退出。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            self._loop.remove_reader(fd)
+            os.close(fd)
+        LOGGER.debug(f"pidfd 通知进程已退出: PID {pid}")
+        self._mark_ended(pid)
+
+    def _mark_ended(self, pid):
+        """记录已结束的进程并唤醒等待中的监视循环。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._ended_pids.append(pid)
+        self._exit_times[pid] = time.perf_counter()
+        self._exit_event.set()
+
+
+class ChildLivenessChecker:
+    """监视由 2RPM 自己启动的子进程。
+
+    直接等待子进程退出，进程结束时监视循环会被立即唤醒，无需轮询，
+    并且可以取得子进程的退出码。
+    """
+
+    name = 'child'
+    # 子进程退出时 wait() 会被立即唤醒，无需定期检查
+    requires_polling = False
+
+    def __init__(self, process):
+        """初始化检查器。
+
+        Args:
+            process (asyncio.subprocess.Process): 被监视的子进程。
+        """
+        self._process = process
+        self._ended_pids = []
+        # 收到退出通知的时间（perf_counter 秒）
+        self._exit_time = None
+        self._exit_event = asyncio.Event()
+        self._task = asyncio.ensure_future(self._wait_exit())
+
+    async def _wait_exit(self):
+        """等待子进程退出并唤醒等待中的监视循环。"""
+        await self._process.wait()
+        self._exit_time = time.perf_counter()
+        LOGGER.debug(f"子进程已退出: PID {self._process.pid}，退出码: {self._process.returncode}")
+        self._ended_pids.append(self._process.pid)
+        self._exit_event.set()
+
+    def add(self, pid, create_time):
+        """添加需要检查的进程，只支持检查器所属的子进程。
+
+        Args:
+            pid (int): 进程 PID。
+            create_time (float): 检测到进程时记录的创建时间。
+        """
+        if pid != self._process.pid:
+            LOGGER.warning(f"进程 PID {pid} 不是被监视的子进程，忽略")
+
+    def remove(self, pid):
+        """移除不再需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        if pid in self._ended_pids:
+            self._ended_pids.remove(pid)
+
+    def poll(self):
+        """取出自上次检查以来已结束的进程。
+
+        Returns:
+            list: 已结束的进程 PID 列表。
+        """
+        ended_pids, self._ended_pids = self._ended_pids, []
+        return ended_pids
+
+    async def wait(self, timeout):
+        """等待到下一次检查，或子进程结束时提前返回。
+
+        Args:
+            timeout (float): 最长等待时间，单位为秒。
+        """
+        if self._ended_pids:
+            return
+        self._exit_event.clear()
+        try:
+            await asyncio.wait_for(self._exit_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def exit_time(self, pid):
+        """获取进程结束时间的下界。
+
+        Args:
+            pid (int): 已结束的进程 PID。
+
+        Returns:
+            float: 收到退出通知的时间（perf_counter 秒），没有记录时返回 None。
+        """
+        return self._exit_time if pid == self._process.pid else None
+
+    def exit_code(self, pid):
+        """获取子进程的退出码。
+
+        Args:
+            pid (int): 已结束的进程 PID。
+
+        Returns:
+            int: 退出码，进程未结束或不是该子进程时返回 None。
+        """
+        return self._process.returncode if pid == self._process.pid else None
+
+    def close(self):
+        """停止等待子进程，不会结束子进程。"""
+        self._task.cancel()
+
 
-async def monitor_processes(config):
+class ScanLivenessChecker:
+    """基于进程表扫描的存活检查。
+
+    每次检查刷新进程表后，按 (pid, create_time) 核对被监视的进程是否仍在表中，
+    不依赖刷新返回的差异，因此与等待阶段的事件源共用进程表时不会漏掉进程结束。
+    被监视的进程登记到进程表，刷新时重新读取其创建时间以识别 PID 复用。
+
+    Args:
+        process_table (ProcessTableView): 用于扫描的进程表视图。
+    """
+
+    requires_polling = True
+
+    def __init__(self, process_table):
+        self._process_table = process_table
+        self._create_times = {}
+        self._last_poll_time = None
+        self._previous_poll_time = None
+
+    def add(self, pid, create_time):
+        """添加需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+            create_time (float): 检测到进程时记录的创建时间。
+        """
+        self._create_times[pid] = create_time
+        self._process_table.watch(pid)
+
+    def remove(self, pid):
+        """移除不再需要检查的进程。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._create_times.pop(pid, None)
+        self._process_table.unwatch(pid)
+
+    def poll(self):
+        """刷新进程表并找出已结束的被监视进程。
+
+        Returns:
+            list: 已结束的进程 PID 列表。
+        """
+        self._previous_poll_time, self._last_poll_time = self._last_poll_time, time.perf_counter()
+        self._process_table.refresh()
+        ended_pids = []
+        for pid, create_time in self._create_times.items():
+            info = self._process_table.get(pid)
+            if info is None or (
+                    create_time is not None and info['create_time'] != create_time):
+                ended_pids.append(pid)
+        return ended_pids
+
+    async def wait(self, timeout):
+        """等待到下一次检查。
+
+        Args:
+            timeout (float): 等待时间，单位为秒。
+        """
+        await asyncio.sleep(timeout)
+
+    def exit_time(self, pid):
+        """获取进程结束时间的下界，即上一次扫描的时间。
+
+        Args:
+            pid (int): 已结束的进程 PID。
+
+        Returns:
+            float: perf_counter 秒，首次扫描即发现结束时返回 None。
+        """
+        return self._previous_poll_time
+
+    def close(self):
+        """释放检查器持有的资源。"""
+        for pid in self._create_times:
+            self._process_table.unwatch(pid)
+        self._create_times.clear()
+
+
+def create_liveness_checker(mode, process_table):
+    """根据配置创建进程存活检查器。
+
+    'auto' 在支持 pidfd 的 Linux 上使用 pidfd，否则回退到进程句柄轮询。
+    必须在事件循环中调用。
+
+    Args:
+        mode (str): 检查方式，'auto'、'pidfd'、'handle' 或 'scan'。
+        process_table (ProcessTableView): 'scan' 方式使用的进程表视图。
+
+    Returns:
+        PidfdLivenessChecker | HandleLivenessChecker | ScanLivenessChecker:
+            存活检查器。
+    """
+    if mode == 'scan':
+        LOGGER.info("进程存活检查方式: 扫描进程表")
+        return ScanLivenessChecker(process_table)
+    if mode in ('auto', 'pidfd'):
+        if PidfdLivenessChecker.is_supported():
+            LOGGER.info("进程存活检查方式: pidfd 事件通知")
+            return PidfdLivenessChecker()
+        if mode == 'pidfd':
+            LOGGER.warning("当前平台或内核不支持 pidfd，回退到进程句柄轮询")
+    elif mode != 'handle':
+        LOGGER.warning(f"未知的进程存活检查方式: {mode}，使用 handle")
+    LOGGER.info("进程存活检查方式: 进程句柄")
+    return HandleLivenessChecker()
+
+
+class ScanSpawnEventSource:
+    """基于增量进程表扫描的进程启动事件源。
+
+    每隔固定间隔刷新一次进程表，只报告新出现的进程。
+
+    Args:
+        process_table (ProcessTable): 增量进程表。
+        interval (float): 扫描间隔，单位为秒。
+    """
+
+    def __init__(self, process_table, interval):
+        self._process_table = process_table
+        self._interval = interval
+
+    def start(self):
+        """开始监听并返回当前已在运行的进程。
+
+        Returns:
+            dict: {pid: info} 形式的进程信息。
+        """
+        added_processes, _ = self._process_table.refresh()
+        return added_processes
+
+    async def wait(self, timeout):
+        """等待新进程出现。
+
+        Args:
+            timeout (float): 最长等待时间，单位为秒。
+
+        Returns:
+            dict: 新出现或改名的进程 {pid: info}。
+        """
+        await asyncio.sleep(min(timeout, self._interval))
+        added_processes, _ = self._process_table.refresh()
+        return added_processes
+
+    def close(self):
+        """停止监听。"""
+        pass
+
+
+class NetlinkSpawnEventSource:
+    """基于 Linux netlink 进程连接器（proc connector）的进程启动事件源。
+
+    内核在进程 exec 或修改名称时推送事件，只需读取这些进程的属性，
+    启动可在毫秒级内被发现，空闲时不消耗 CPU。需要 CAP_NET_ADMIN 权限。
+
+    Args:
+        process_table (ProcessTable): 增量进程表。
+    """
+
+    NETLINK_CONNECTOR = 11
+    CN_IDX_PROC = 1
+    CN_VAL_PROC = 1
+    NLMSG_DONE = 3
+    PROC_CN_MCAST_LISTEN = 1
+    PROC_EVENT_EXEC = 0x00000002
+    PROC_EVENT_COMM = 0x00000200
+
+    NLMSG_HEADER = struct.Struct('=IHHII')
+    CN_MSG_HEADER = struct.Struct('=IIIIHH')
+    PROC_EVENT_HEADER = struct.Struct('=IIQ')
+    PROC_EVENT_PID = struct.Struct('=ii')
+
+    def __init__(self, process_table):
+        self._process_table = process_table
+        self._loop = asyncio.get_running_loop()
+        self._socket = None
+        self._pending_pids = set()
+        self._resync = False
+        self._event = asyncio.Event()
+
+    @staticmethod
+    def is_supported():
+        """检查当前平台是否可能支持 netlink 进程连接器。
+
+        Returns:
+            bool: Linux 且 socket 模块支持 AF_NETLINK 时返回 True。
+        """
+        return sys.platform.startswith('linux') and hasattr(socket, 'AF_NETLINK')
+
+    def start(self):
+        """订阅进程事件并返回当前已在运行的进程。
+
+        先订阅再扫描，保证订阅前后启动的进程都不会遗漏。
+
+        Returns:
+            dict: {pid: info} 形式的进程信息。
+
+        Raises:
+            OSError: 无法创建或订阅 netlink 套接字（通常是权限不足）。
+        """
+        sock = socket.socket(
+            socket.AF_NETLINK, socket.SOCK_DGRAM, self.NETLINK_CONNECTOR)
+        try:
+            # 端口号为 0 时由内核分配，同一进程中的多个配置可以各自订阅
+            sock.bind((0, self.CN_IDX_PROC))
+            port_id = sock.getsockname()[0]
+            payload = struct.pack('=I', self.PROC_CN_MCAST_LISTEN)
+            cn_msg = self.CN_MSG_HEADER.pack(
+                self.CN_IDX_PROC, self.CN_VAL_PROC, 0, 0, len(payload), 0)
+            nlmsg_len = self.NLMSG_HEADER.size + len(cn_msg) + len(payload)
+            sock.send(self.NLMSG_HEADER.pack(
+                nlmsg_len, self.NLMSG_DONE, 0, 0, port_id) + cn_msg + payload)
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+        LOGGER.debug("已订阅 netlink 进程事件")
+
+        added_processes, _ = self._process_table.refresh()
+        return added_processes
+
+    async def wait(self, timeout):
+        """等待内核推送的进程事件。
+
+        Args:
+            timeout (float): 最长等待时间，单位为秒。
+
+        Returns:
+            dict: exec 或改名的进程 {pid: info}。
+        """
+        if not self._pending_pids and not self._resync:
+            self._event.clear()
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return {}
+
+        if self._resync:
+            # 接收缓冲区溢出导致事件丢失，通过一次扫描补齐
+            LOGGER.warning("netlink 进程事件丢失，正在扫描进程表补齐")
+            self._resync = False
+            self._pending_pids.clear()
+            added_processes, _ = self._process_table.refresh()
+            return added_processes
+
+        pending_pids, self._pending_pids = self._pending_pids, set()
+        changed_processes = {}
+        for pid in pending_pids:
+            info = self._process_table.update(pid)
+            if info is not None:
+                changed_processes[pid] = info
+        return changed_processes
+
+    def close(self):
+        """取消订阅并关闭套接字。"""
+        if self._socket is not None:
+            self._loop.remove_reader(self._socket.fileno())
+            self._socket.close()
+            self._socket = None
+
+    def _on_readable(self):
+        """套接字可读时的回调，读取所有已到达的事件。"""
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                # ENOBUFS: 事件过多导致内核丢弃消息
+                LOGGER.debug(f"读取 netlink 事件失败: {e}")
+                self._resync = True
+                break
+            self._pending_pids.update(self.parse_events(data))
+        if self._pending_pids or self._resync:
+            self._event.set()
+
+    @classmethod
+    def parse_events(cls, data):
+        """从 netlink 数据报中解析 exec 与改名事件。
+
+        Args:
+            data (bytes): 接收到的数据报。
+
+        Returns:
+            set: 事件涉及的进程 PID（线程组 ID）集合。
+        """
+        pids = set()
+        offset = 0
+        event_offset = cls.NLMSG_HEADER.size + cls.CN_MSG_HEADER.size
+        while offset + cls.NLMSG_HEADER.size <= len(data):
+            nlmsg_len = cls.NLMSG_HEADER.unpack_from(data, offset)[0]
+            if nlmsg_len < cls.NLMSG_HEADER.size:
+                break
+            start = offset + event_offset
+            end = start + cls.PROC_EVENT_HEADER.size + cls.PROC_EVENT_PID.size
+            if end <= offset + nlmsg_len:
+                what = cls.PROC_EVENT_HEADER.unpack_from(data, start)[0]
+                if what in (cls.PROC_EVENT_EXEC, cls.PROC_EVENT_COMM):
+                    _, tgid = cls.PROC_EVENT_PID.unpack_from(
+                        data, start + cls.PROC_EVENT_HEADER.size)
+                    pids.add(tgid)
+            offset += (nlmsg_len + 3) & ~3
+        return pids
+
+
+def create_spawn_event_source(mode, process_table, interval):
+    """根据配置创建等待阶段的进程启动事件源并开始监听。
+
+    'auto' 在 Linux 上优先尝试 netlink 进程连接器，权限不足或平台不支持时
+    回退到增量扫描。必须在事件循环中调用。
+
+    Args:
+        mode (str): 事件源类型，'auto'、'netlink' 或 'scan'。
+        process_table (ProcessTable): 增量进程表。
+        interval (float): 扫描回退时的扫描间隔，单位为秒。
+
+    Returns:
+        tuple: (事件源, 当前已在运行的进程 {pid: info})。
+    """
+    if mode in ('auto', 'netlink'):
+        if NetlinkSpawnEventSource.is_supported():
+            source = NetlinkSpawnEventSource(process_table)
+            try:
+                running_processes = source.start()
+                LOGGER.info("进程启动检测方式: netlink 进程事件")
+                return source, running_processes
+            except OSError as e:
+                LOGGER.warning(f"无法订阅 netlink 进程事件（需要 CAP_NET_ADMIN 权限）: {e}，回退到扫描")
+        elif mode == 'netlink':
+            LOGGER.warning("当前平台不支持 netlink 进程事件，回退到扫描")
+    elif mode != 'scan':
+        LOGGER.warning(f"未知的进程启动检测方式: {mode}，使用 scan")
+    source = ScanSpawnEventSource(process_table, interval)
+    LOGGER.info("进程启动检测方式: 扫描进程表")
+    return source, source.start()
+
+
+class ProcessNameMatcher:
+    """多目标进程名称匹配器。
+
+    监视目标支持三种写法：
+    - 普通名称: 精确匹配，例如 notepad.exe
+    - 通配符: 包含 * ? [ 时按 glob 匹配，例如 worker-*.exe
+    - 正则表达式: 以 re: 开头，例如 re:job_\\d+
+
+    所有通配符与正则表达式编译为一个正则，每个进程名只需匹配一次。
+
+    Args:
+        targets (list): 监视目标列表。
+    """
+
+    GLOB_CHARS = ('*', '?', '[')
+    REGEX_PREFIX = 're:'
+
+    def __init__(self, targets):
+        self._exact = {}
+        self._group_targets = {}
+        patterns = []
+        for index, target in enumerate(targets):
+            if target.startswith(self.REGEX_PREFIX):
+                pattern = target[len(self.REGEX_PREFIX):]
+                re.compile(pattern)
+            elif any(char in target for char in self.GLOB_CHARS):
+                pattern = fnmatch.translate(target)
+            else:
+                self._exact.setdefault(target, target)
+                continue
+            group = f"_target{index}"
+            self._group_targets[group] = target
+            patterns.append(f"(?P<{group}>{pattern})")
+        self._regex = re.compile('|'.join(patterns)) if patterns else None
+
+    def match(self, name):
+        """查找进程名称对应的监视目标。
+
+        Args:
+            name (str): 进程名称。
+
+        Returns:
+            str: 匹配的监视目标，未匹配时返回 None。
+        """
+        if name is None:
+            return None
+        target = self._exact.get(name)
+        if target is not None or self._regex is None:
+            return target
+        match = self._regex.fullmatch(name)
+        if match is None:
+            return None
+        for group, target in self._group_targets.items():
+            if match.group(group) is not None:
+                return target
+        return None
+
+
+def parse_monitor_targets(process_name, default_max_wait_time_ms,
+                          default_escalation_thresholds_ms=()):
+    """解析 process_name 配置为监视目标列表。
+
+    process_name 可以是单个字符串，也可以是列表；列表项可以是字符串，
+    或包含 name 与可选 max_wait_time、timeout_escalation_thresholds 的字典。
+
+    Args:
+        process_name (str | list): process_name 配置值。
+        default_max_wait_time_ms (int): 默认的最长等待时间（毫秒）。
+        default_escalation_thresholds_ms (list): 默认的超时升级阈值（毫秒）。
+
+    Returns:
+        dict: {目标: {'max_wait_time_ms': int, 'escalation_thresholds_ms': list}}，
+            保持配置顺序。
+
+    Raises:
+        ValueError: 配置项格式无效。
+    """
+    entries = process_name if isinstance(process_name, list) else [process_name]
+    targets = {}
+    for entry in entries:
+        max_wait_time_ms = default_max_wait_time_ms
+        escalation_thresholds_ms = list(default_escalation_thresholds_ms)
+        if isinstance(entry, dict):
+            name = entry.get('name')
+            if entry.get('max_wait_time'):
+                max_wait_time_ms = parse_time_string(entry['max_wait_time'])
+            if entry.get('timeout_escalation_thresholds') is not None:
+                escalation_thresholds_ms = parse_escalation_thresholds(
+                    entry['timeout_escalation_thresholds'])
+        else:
+            name = entry
+        if not isinstance(name, str) or not name:
+            raise ValueError(f"无效的监视目标: {entry}")
+        targets[name] = {
+            'max_wait_time_ms': max_wait_time_ms,
+            'escalation_thresholds_ms': escalation_thresholds_ms,
+        }
+    return targets
+
+
+def parse_escalation_thresholds(thresholds):
+    """解析超时升级阈值列表。
+
+    Args:
+        thresholds (list): 时间字符串列表，例如 ['1h', '4h']。
+
+    Returns:
+        list: 升序排列的阈值（毫秒）。
+
+    Raises:
+        ValueError: 配置项格式无效。
+    """
+    if not isinstance(thresholds, list):
+        raise ValueError(f"超时升级阈值必须是列表: {thresholds}")
+    return sorted(parse_time_string(str(threshold)) for threshold in thresholds)
+
+
+async def wait_for_events(spawn_source, liveness_checker, timeout):
+    """同时等待进程启动事件与进程结束事件，任一到达即返回。
+
+    Args:
+        spawn_source (ScanSpawnEventSource | NetlinkSpawnEventSource):
+            进程启动事件源，为 None 时只等待进程结束。
+        liveness_checker: 进程存活检查器。
+        timeout (float): 最长等待时间，单位为秒。
+
+    Returns:
+        dict: 新出现或改名的进程 {pid: info}。
+    """
+    if spawn_source is None:
+        await liveness_checker.wait(timeout)
+        return {}
+    spawn_task = asyncio.ensure_future(spawn_source.wait(timeout))
+    exit_task = asyncio.ensure_future(liveness_checker.wait(timeout))
+    try:
+        _, pending = await asyncio.wait(
+            [spawn_task, exit_task], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (spawn_task, exit_task):
+            task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+    if spawn_task.cancelled():
+        return {}
+    return spawn_task.result()
+
+
+async def monitor_processes(config, process_table=None, child=None, child_name=None):
     """监视进程列表。
 
     等待指定的进程启动，监视其运行状态，并在进程结束或超时时发送通知。
+    每个监视目标各自维护等待期限，已启动的目标在其他目标等待期间即开始监视。
 
     Args:
         config (dict): 配置信息。
+        process_table (SharedProcessTable, optional): 多个配置共享的进程表。
+            默认为 None，此时按配置创建独立的进程表。等待阶段的事件源与
+            scan 方式的存活检查各自使用一个视图，每次扫描的差异同时交给两者。
+        child (asyncio.subprocess.Process, optional): 由 supervisor 启动的子进程。
+            指定时只监视该子进程，忽略 process_name，子进程结束时可取得退出码；
+            推送分发器与外部程序运行器由调用方创建与关闭。
+        child_name (str, optional): 子进程的名称，用于通知与日志。
     """
     monitor_settings = config.get('monitor_settings', {})
     wait_settings = config.get('wait_process_settings', {})
     external_settings = config.get('external_program_settings', {})
     push_settings = config.get('push_settings', {})
+    telemetry_settings = config.get('telemetry_settings', {})
 
     process_name = monitor_settings.get('process_name', DEFAULT_VALUES['monitor_settings']['process_name'])
     timeout_warning_interval_ms = parse_time_string(monitor_settings.get(
         'timeout_warning_interval', DEFAULT_VALUES['monitor_settings']['timeout_warning_interval']))
     monitor_loop_interval_ms = parse_time_string(monitor_settings.get(
         'monitor_loop_interval', DEFAULT_VALUES['monitor_settings']['monitor_loop_interval']))
+    liveness_check_mode = monitor_settings.get(
+        'liveness_check_mode', DEFAULT_VALUES['monitor_settings']['liveness_check_mode'])
+    process_scanner_mode = monitor_settings.get(
+        'process_scanner', DEFAULT_VALUES['monitor_settings']['process_scanner'])
+    timeout_escalation_thresholds = monitor_settings.get(
+        'timeout_escalation_thresholds',
+        DEFAULT_VALUES['monitor_settings']['timeout_escalation_thresholds'])
 
     max_wait_time_ms = parse_time_string(wait_settings.get('max_wait_time', DEFAULT_VALUES['wait_process_settings']['max_wait_time']))
     wait_process_check_interval_ms = parse_time_string(wait_settings.get(
         'wait_process_check_interval', DEFAULT_VALUES['wait_process_settings']['wait_process_check_interval']))
+    spawn_event_source_mode = wait_settings.get(
+        'spawn_event_source', DEFAULT_VALUES['wait_process_settings']['spawn_event_source'])
+
+    # 资源采样设置
+    telemetry_enabled = telemetry_settings.get(
+        'enable', DEFAULT_VALUES['telemetry_settings']['enable'])
+    telemetry_sample_interval_ms = parse_time_string(telemetry_settings.get(
+        'sample_interval', DEFAULT_VALUES['telemetry_settings']['sample_interval']))
 
-    # 外部程序调用设置
-    external_program_path = external_settings.get('external_program_path', '')
-    another_external_program_path = external_settings.get(
-        'another_external_program_path', '')
+    # 外部程序动作设置，动作在加载配置时已解析，无效的程序与动作已被跳过
+    actions = get_resolved_config(config)['actions']
     timeout_count_threshold = external_settings.get(
-        'timeout_count_threshold', 3)
-    external_program_on_wait_timeout_path = external_settings.get(
-        'external_program_on_wait_timeout_path', '')
+        'timeout_count_threshold', DEFAULT_VALUES['external_program_settings']['timeout_count_threshold'])
+    exit_on_threshold = external_settings.get(
+        'exit_on_threshold', DEFAULT_VALUES['external_program_settings']['exit_on_threshold'])
+    program_runner = get_program_runner(config)
+    notify = functools.partial(send_notification, config)
 
     LOGGER.debug("初始化监视参数")
-    processes = {}
+    if child is not None:
+        process_name = child_name
 
     # 检查 process_name 是否有效
     if not process_name:
         LOGGER.critical("未设置要监视的进程，请检查配置文件！")
         sys.exit(1)
+    try:
+        target_settings = parse_monitor_targets(
+            process_name, max_wait_time_ms,
+            parse_escalation_thresholds(timeout_escalation_thresholds))
+        # 子进程按 PID 直接登记，名称中的通配符与 re: 前缀不按匹配规则解释
+        matcher = ProcessNameMatcher(list(target_settings)) if child is None else None
+    except (ValueError, re.error) as e:
+        LOGGER.critical(f"监视目标配置无效: {e}")
+        sys.exit(1)
 
+    processes = {}
+    standalone = process_table is None and child is None
+    if standalone:
+        process_table = SharedProcessTable(create_process_scanner(process_scanner_mode))
+
+    LOGGER.info(f"监视目标: {', '.join(target_settings)}")
     LOGGER.info(
         f"等待监视进程启动，每 {wait_process_check_interval_ms} ms 检查一次"
     )
     start_time_ms = time.perf_counter() * 1000
+    # 监视开始的系统时间，此后启动的进程才统计启动检测延迟
+    monitor_start_wall_time = time.time()
+    # 每个目标的等待状态: waiting（等待中）/ found（已启动）/ timed_out（等待超时）
+    targets = {
+        target: {
+            'state': 'waiting',
+            'wait_deadline_ms': start_time_ms + settings['max_wait_time_ms'],
+            'escalation_thresholds_ms': settings['escalation_thresholds_ms'],
+        }
+        for target, settings in target_settings.items()
+    }
+
+    # 所有定时事件（等待期限、等待进度报告、存活检查、超时警告与升级、资源采样）由截止时间堆驱动，
+    # 监视循环只在最近的截止时间或进程事件到达时醒来，且只处理已到期的条目
+    scheduler = DeadlineScheduler()
+    for target, target_state in targets.items():
+        scheduler.schedule(('wait_deadline', target), target_state['wait_deadline_ms'])
+    scheduler.schedule(('report',), start_time_ms)
 
+    if standalone:
+        start_notifications(config)
+    # 进程表视图，事件源与存活检查各用一个，互不取走对方的差异
+    table_views = []
+    if child is None:
+        spawn_view = process_table.view()
+        table_views.append(spawn_view)
+        spawn_source, candidate_processes = create_spawn_event_source(
+            spawn_event_source_mode, spawn_view,
+            wait_process_check_interval_ms / 1000)
+        liveness_view = None
+        if liveness_check_mode == 'scan':
+            liveness_view = process_table.view()
+            table_views.append(liveness_view)
+        liveness_checker = create_liveness_checker(liveness_check_mode, liveness_view)
+    else:
+        # 子进程已由调用方启动，第一次循环即开始监视
+        try:
+            child_create_time = psutil.Process(child.pid).create_time()
+        except psutil.Error:
+            child_create_time = time.time()
+        spawn_source = None
+        candidate_processes = {child.pid: {
+            'name': process_name, 'create_time': child_create_time, 'target': process_name}}
+        liveness_checker = ChildLivenessChecker(child)
+        LOGGER.info("进程存活检查方式: 等待子进程退出")
+    telemetry_sampler = None
+    if telemetry_enabled:
+        telemetry_sampler = TelemetrySampler(
+            buffer_size=telemetry_settings.get(
+                'buffer_size', DEFAULT_VALUES['telemetry_settings']['buffer_size']),
+            thresholds=parse_telemetry_thresholds(telemetry_settings),
+            threshold_samples=telemetry_settings.get(
+                'threshold_samples', DEFAULT_VALUES['telemetry_settings']['threshold_samples'])
+        )
+        LOGGER.info(f"已启用资源采样，每 {telemetry_sample_interval_ms} ms 采样一次")
     try:
-        # 等待进程启动
         while True:
-            LOGGER.debug("执行等待进程启动循环")
-            waited_time_ms = time.perf_counter() * 1000 - start_time_ms
-            if waited_time_ms > max_wait_time_ms:
-                LOGGER.debug("已等待超时，正在尝试发送通知")
-                break
+            LOGGER.debug("执行监视循环")
+            current_time_ms = time.perf_counter() * 1000
+            liveness_deadline_ms = scheduler.get(('liveness',))
+            due_keys = scheduler.pop_due(current_time_ms)
+            waiting_targets = [
+                target for target, state in targets.items()
+                if state['state'] == 'waiting'
+            ]
 
-            current_processes = {
-                p.pid: p.info for p in psutil.process_iter(
-                    ['pid', 'name', 'create_time'])
-            }
-            found_processes = {
-                pid: info for pid, info in current_processes.items()
-                if info['name'] == process_name
-            }
-
-            for pid, info in found_processes.items():
-                if pid not in processes:
-                    start_time_offset_ms = time.perf_counter() * 1000 - int(
-                        (time.time() - info['create_time']) * 1000
-                    )
+            # 一次遍历新出现的进程，匹配所有仍在等待的目标
+            if waiting_targets:
+                found_targets = set()
+                for pid, info in candidate_processes.items():
+                    target = info['target'] if 'target' in info else matcher.match(info['name'])
+                    if (target is None or pid in processes or
+                            targets[target]['state'] != 'waiting'):
+                        continue
+                    start_lag = time.time() - info['create_time']
+                    start_time_offset_ms = time.perf_counter() * 1000 - int(start_lag * 1000)
+                    if info['create_time'] >= monitor_start_wall_time:
+                        record_latency('detect', start_lag)
                     processes[pid] = {
                         'name': info['name'],
+                        'target': target,
+                        'create_time': info['create_time'],
+                        'detected_at': time.perf_counter(),
                         'start_time_ms': start_time_offset_ms,
                         'last_warning_time_ms': start_time_offset_ms,
                         'timeout_count': 0,
+                        'escalation_level': 0,
                     }
+                    liveness_checker.add(pid, info['create_time'])
+                    scheduler.schedule(
+                        ('warning', pid),
+                        start_time_offset_ms + timeout_warning_interval_ms)
+                    for level, threshold_ms in enumerate(
+                            targets[target]['escalation_thresholds_ms'], 1):
+                        scheduler.schedule(
+                            ('escalation', pid, level),
+                            start_time_offset_ms + threshold_ms)
+                    if telemetry_sampler is not None:
+                        telemetry_sampler.add(pid, info['create_time'])
+                    found_targets.add(target)
                     LOGGER.info(f"检测到进程启动: {info['name']} (PID: {pid})")
+                    actions.trigger(
+                        'start', program_runner, notify,
+                        process_name=info['name'], process_pid=pid)
+                for target in found_targets:
+                    targets[target]['state'] = 'found'
+                    scheduler.cancel(('wait_deadline', target))
+                    LOGGER.info(f"目标监视进程已启动: {target}")
+                if (found_targets and liveness_checker.requires_polling and
+                        ('liveness',) not in scheduler):
+                    scheduler.schedule(
+                        ('liveness',), current_time_ms + monitor_loop_interval_ms)
+                if (found_targets and telemetry_sampler is not None and
+                        ('telemetry',) not in scheduler):
+                    scheduler.schedule(
+                        ('telemetry',), current_time_ms + telemetry_sample_interval_ms)
 
-            # 检查是否进程已启动
-            if processes:
-                LOGGER.info("目标监视进程已启动")
-                break
-            else:
-                LOGGER.info(
-                    f"正在等待目标进程运行，已等待时间: "
-                    f"{format_time_ms(waited_time_ms)}"
+            # 检查各目标的等待期限
+            for key in due_keys:
+                if key[0] != 'wait_deadline':
+                    continue
+                target = key[1]
+                LOGGER.debug("执行等待进程启动超时报告与推送")
+                targets[target]['state'] = 'timed_out'
+                waited_time_ms = current_time_ms - start_time_ms
+                formatted_waited_time = format_time_ms(waited_time_ms)
+                await send_notification(
+                    config,
+                    'process_wait_timeout_warning',
+                    process_name=target,
+                    process_wait_time=formatted_waited_time,
+                    other_running_processes=get_other_running_processes(
+                        processes),
+                    process_list=[target]
                 )
-                await asyncio.sleep(wait_process_check_interval_ms / 1000)
-    except asyncio.CancelledError:
-        LOGGER.critical("任务被取消，退出等待进程启动循环")
-        return
+                LOGGER.error(f"等待超时，进程未运行: {target}")
 
-    # 超过等待时间或进程已启动
-    if not processes:
-        # 超过等待时间且进程未启动
-        LOGGER.debug("执行等待进程启动超时报告与推送")
-        waited_time_ms = time.perf_counter() * 1000 - start_time_ms
-        formatted_waited_time = format_time_ms(waited_time_ms)
-        await send_notification(
-            config,
-            'process_wait_timeout_warning',
-            process_name=process_name,
-            process_wait_time=formatted_waited_time,
-            other_running_processes=get_other_running_processes(
-                processes),
-            process_list=[process_name]
-        )
-        LOGGER.error(f"等待超时，进程未运行: {process_name}")
+                # 执行外部程序
+                actions.trigger(
+                    'wait_timeout', program_runner, notify,
+                    process_name=target, process_wait_time=formatted_waited_time,
+                    process_list=[target])
 
-        # 执行外部程序
-        if external_program_on_wait_timeout_path:
-            LOGGER.info("等待进程启动超时，正在执行外部程序...")
-            try:
-                run_external_program(external_program_on_wait_timeout_path)
-                LOGGER.info(
-                    f"外部程序 {external_program_on_wait_timeout_path} 执行成功")
-            except Exception as e:
-                LOGGER.error(
-                    f"执行外部程序 {external_program_on_wait_timeout_path} "
-                    f"时发生错误: {e}",
-                    exc_info=True
-                )
-    else:
-        LOGGER.info("所有监视进程均已启动")
-
-    # 如果没有任何进程需要监视，退出程序
-    if not processes:
-        LOGGER.critical("未检测到任意目标进程，程序终止运行。")
-        sys.exit(1)
+            waiting_targets = [
+                target for target, state in targets.items()
+                if state['state'] == 'waiting'
+            ]
+            if spawn_source is not None and not waiting_targets:
+                spawn_source.close()
+                spawn_source = None
+                spawn_view.close()
+                scheduler.cancel(('report',))
+                if processes:
+                    LOGGER.info("所有监视目标均已启动或等待超时")
+                    if liveness_checker.requires_polling:
+                        LOGGER.info(
+                            f"已进入监视循环，每 {monitor_loop_interval_ms} ms 检查一次进程状态"
+                        )
+                    else:
+                        LOGGER.info("已进入监视循环，进程结束由事件通知")
 
-    # 监视已启动的进程
-    LOGGER.info(
-        f"已进入监视循环，每 {monitor_loop_interval_ms} ms 循环一次"
-    )
-    next_loop_time_ms = time.perf_counter() * 1000
-    try:
-        while processes:
-            LOGGER.debug("执行监视循环")
-            current_time_ms = time.perf_counter() * 1000
-            current_processes = {
-                p.pid: p.info for p in psutil.process_iter(
-                    ['pid', 'name', 'create_time'])
-            }
-            current_pids = set(current_processes.keys())
-            monitored_pids = set(processes.keys())
-
-            # 检查进程结束
-            ended_pids = monitored_pids - current_pids
+            # 检查进程结束；轮询式检查器只在存活检查到期时扫描
+            if liveness_checker.requires_polling:
+                if ('liveness',) in due_keys:
+                    ended_pids = liveness_checker.poll()
+                    # 计算下一次检查的时间点，确保检查间隔精确
+                    next_check_time_ms = liveness_deadline_ms + monitor_loop_interval_ms
+                    if next_check_time_ms < current_time_ms:
+                        next_check_time_ms = current_time_ms
+                    scheduler.schedule(('liveness',), next_check_time_ms)
+                else:
+                    ended_pids = []
+            else:
+                ended_pids = liveness_checker.poll()
             for pid in ended_pids:
                 process_info = processes[pid]
                 process_name = process_info['name']
                 run_time_ms = current_time_ms - process_info['start_time_ms']
                 formatted_run_time = format_time_ms(run_time_ms)
+                # 进程结束时间的下界：轮询时为上一次检查的时间，pidfd 时为收到通知的时间
+                exited_at = max(
+                    liveness_checker.exit_time(pid) or 0, process_info['detected_at'])
+                record_latency('detect', time.perf_counter() - exited_at)
+                # 只有自己启动的子进程能取得退出码
+                exit_code = child.returncode if child is not None else None
 
                 await send_notification(
                     config,
                     'process_end_notification',
+                    event_time=exited_at,
                     process_name=process_name,
                     process_pid=pid,
                     process_run_time=formatted_run_time,
+                    process_exit_code=UNKNOWN_EXIT_CODE if exit_code is None else exit_code,
                     other_running_processes=get_other_running_processes(
                         processes, exclude_pid=pid),
                     process_list=[]
@@ -184,94 +1734,227 @@ async def monitor_processes(config):
                 LOGGER.info(
                     f"进程结束: {process_name} (PID: {pid}) "
                     f"运行时间: {formatted_run_time}"
+                    + ("" if exit_code is None else f" 退出码: {exit_code}")
                 )
+                if telemetry_sampler is not None:
+                    telemetry_summary = telemetry_sampler.summary(pid)
+                    if telemetry_summary:
+                        LOGGER.info(f"进程 {process_name} (PID: {pid}) 资源统计: {telemetry_summary}")
+                    telemetry_sampler.remove(pid)
 
                 # 进程结束时调用外部程序
-                if external_program_path:
-                    LOGGER.info(
-                        f"检测到进程 {process_name} 结束，正在调用外部程序..."
-                    )
-                    try:
-                        run_external_program(external_program_path)
-                        LOGGER.info(f"成功调用外部程序 {external_program_path}")
-                    except Exception as e:
-                        LOGGER.error(
-                            f"调用外部程序 {external_program_path} 时发生错误: {e}",
-                            exc_info=True
-                        )
+                actions.trigger(
+                    'end', program_runner, notify,
+                    process_name=process_name, process_pid=pid,
+                    process_run_time=formatted_run_time,
+                    process_exit_code=UNKNOWN_EXIT_CODE if exit_code is None else exit_code)
 
                 # 从监视列表中移除
                 del processes[pid]
+                liveness_checker.remove(pid)
+                scheduler.cancel(('warning', pid))
+                for level in range(1, len(
+                        targets[process_info['target']]['escalation_thresholds_ms']) + 1):
+                    scheduler.cancel(('escalation', pid, level))
                 LOGGER.info(f"已删除进程记录: {pid}")
+            if not processes:
+                scheduler.cancel(('liveness',))
+                scheduler.cancel(('telemetry',))
 
-            # 更新运行时间，检查超时警告
-            for pid, process_info in processes.items():
+            # 资源采样，超过或回落到阈值时推送通知
+            if ('telemetry',) in due_keys and processes:
+                for pid, event, metric, value, threshold in telemetry_sampler.sample_all():
+                    process_info = processes[pid]
+                    resource_name = METRIC_LABELS[metric]
+                    resource_value = format_metric_value(metric, value)
+                    resource_threshold = format_metric_value(metric, threshold)
+                    if event == 'exceeded':
+                        template_key = 'process_resource_warning'
+                        LOGGER.warning(
+                            f"进程 {process_info['name']} (PID: {pid}) "
+                            f"{resource_name} {resource_value} 持续超过阈值 {resource_threshold}"
+                        )
+                    else:
+                        template_key = 'process_resource_recovered'
+                        LOGGER.info(
+                            f"进程 {process_info['name']} (PID: {pid}) "
+                            f"{resource_name} 已回落至 {resource_value}"
+                        )
+                    await send_notification(
+                        config,
+                        template_key,
+                        process_name=process_info['name'],
+                        process_pid=pid,
+                        process_run_time=format_time_ms(
+                            current_time_ms - process_info['start_time_ms']),
+                        resource_name=resource_name,
+                        resource_value=resource_value,
+                        resource_threshold=resource_threshold,
+                        other_running_processes=get_other_running_processes(
+                            processes, exclude_pid=pid),
+                        process_list=[]
+                    )
+                scheduler.schedule(
+                    ('telemetry',), current_time_ms + telemetry_sample_interval_ms)
+
+            # 处理到期的超时警告与升级，只访问已到期的进程
+            for key in due_keys:
+                if key[0] not in ('warning', 'escalation') or key[1] not in processes:
+                    continue
+                pid = key[1]
+                process_info = processes[pid]
                 run_time_ms = current_time_ms - process_info['start_time_ms']
-                last_warning_time_ms = process_info.get(
-                    'last_warning_time_ms', process_info['start_time_ms'])
-                time_since_last_warning_ms = (
-                    current_time_ms - last_warning_time_ms
-                )
+                formatted_run_time = format_time_ms(run_time_ms)
 
-                if time_since_last_warning_ms >= timeout_warning_interval_ms:
-                    formatted_run_time = format_time_ms(run_time_ms)
+                if key[0] == 'escalation':
+                    level = key[2]
+                    threshold_ms = targets[process_info['target']][
+                        'escalation_thresholds_ms'][level - 1]
                     await send_notification(
                         config,
-                        'process_timeout_warning',
+                        'process_timeout_escalation',
                         process_name=process_info['name'],
                         process_pid=pid,
                         process_run_time=formatted_run_time,
+                        escalation_level=level,
+                        escalation_threshold=format_time_ms(threshold_ms),
                         other_running_processes=get_other_running_processes(
                             processes, exclude_pid=pid),
                         process_list=[]
                     )
                     LOGGER.warning(
                         f"进程 {process_info['name']} (PID: {pid}) "
-                        f"已运行超时 {formatted_run_time}"
+                        f"运行时间 {formatted_run_time} 已超过第 {level} 级升级阈值"
                     )
-                    process_info['last_warning_time_ms'] = current_time_ms
-                    process_info['timeout_count'] += 1
+                    process_info['escalation_level'] = level
+                    continue
 
-                    # 检查是否需要执行外部程序
-                    if (another_external_program_path and
-                            process_info['timeout_count'] %
-                            timeout_count_threshold == 0):
-                        LOGGER.info(
-                            f"进程 {process_info['name']} (PID: {pid})，\r\n"
-                            f"超时次数达到阈值 {timeout_count_threshold}，"
-                            f"正在调用外部程序..."
+                await send_notification(
+                    config,
+                    'process_timeout_warning',
+                    process_name=process_info['name'],
+                    process_pid=pid,
+                    process_run_time=formatted_run_time,
+                    other_running_processes=get_other_running_processes(
+                        processes, exclude_pid=pid),
+                    process_list=[]
+                )
+                LOGGER.warning(
+                    f"进程 {process_info['name']} (PID: {pid}) "
+                    f"已运行超时 {formatted_run_time}"
+                )
+                process_info['last_warning_time_ms'] = current_time_ms
+                process_info['timeout_count'] += 1
+                scheduler.schedule(
+                    ('warning', pid),
+                    current_time_ms + timeout_warning_interval_ms)
+                action_context = {
+                    'process_name': process_info['name'],
+                    'process_pid': pid,
+                    'process_run_time': formatted_run_time,
+                }
+                actions.trigger('warning', program_runner, notify, **action_context)
+
+                # 检查是否需要执行外部程序
+                if (actions.has('threshold') and timeout_count_threshold > 0 and
+                        process_info['timeout_count'] %
+                        timeout_count_threshold == 0):
+                    LOGGER.info(
+                        f"进程 {process_info['name']} (PID: {pid})，\r\n"
+                        f"超时次数达到阈值 {timeout_count_threshold}，"
+                        f"正在调用外部程序..."
+                    )
+                    # 动作在后台运行，不阻塞监视循环与其他配置；
+                    # 退出时关闭外部程序运行器会等待动作执行完成，退出码写入日志
+                    actions.trigger('threshold', program_runner, notify, **action_context)
+                    if exit_on_threshold:
+                        LOGGER.critical(
+                            "已调用外部程序，等待其执行完成后结束运行"
                         )
-                        try:
-                            run_external_program(
-                                another_external_program_path)
-                            LOGGER.info(
-                                f"外部程序 {another_external_program_path} "
-                                f"执行成功"
-                            )
-                            # 默认退出程序
-                            LOGGER.critical(
-                                "外部程序执行完成，正在结束运行"
-                            )
-                            sys.exit(0)
-                        except Exception as e:
-                            LOGGER.error(
-                                f"调用外部程序 {another_external_program_path} "
-                                f"时发生错误: {e}",
-                                exc_info=True
-                            )
+                        sys.exit(0)
 
-            if not processes:
-                LOGGER.info("所有被监视进程已结束运行。")
-                break
+            if not processes and not waiting_targets:
+                if any(state['state'] == 'found' for state in targets.values()):
+                    LOGGER.info("所有被监视进程已结束运行。")
+                    break
+                # 如果没有任何进程需要监视，退出程序
+                LOGGER.critical("未检测到任意目标进程，程序终止运行。")
+                sys.exit(1)
 
-            # 计算下一次循环的时间点，确保循环间隔精确
-            now_ms = time.perf_counter() * 1000
-            sleep_time_ms = next_loop_time_ms - now_ms
-            if sleep_time_ms < 0:
-                sleep_time_ms = 0
-                next_loop_time_ms = now_ms
-            await asyncio.sleep(sleep_time_ms / 1000)
-            next_loop_time_ms += monitor_loop_interval_ms
+            # 等待阶段：每个检查间隔报告一次等待进度
+            if waiting_targets and ('report',) in due_keys:
+                LOGGER.info(
+                    f"正在等待目标进程运行: {', '.join(waiting_targets)}，"
+                    f"已等待时间: {format_time_ms(current_time_ms - start_time_ms)}"
+                )
+                scheduler.schedule(
+                    ('report',), current_time_ms + wait_process_check_interval_ms)
+
+            # 休眠到最近的截止时间，进程启动或结束事件会提前唤醒
+            next_deadline_ms = scheduler.next_deadline()
+            if next_deadline_ms is None:
+                timeout_ms = IDLE_WAKEUP_INTERVAL_MS
+            else:
+                timeout_ms = max(next_deadline_ms - time.perf_counter() * 1000, 0)
+            LOGGER.debug(f"下一次唤醒: {timeout_ms:.0f} ms 后")
+            candidate_processes = await wait_for_events(
+                spawn_source, liveness_checker, timeout_ms / 1000)
     except asyncio.CancelledError:
         LOGGER.critical("任务被取消，正在结束监视循环")
-        return
\ No newline at end of file
+        return
+    finally:
+        if spawn_source is not None:
+            spawn_source.close()
+        liveness_checker.close()
+        for view in table_views:
+            view.close()
+        # 退出前发送队列中剩余的通知；共享进程表时由 monitor_profiles 统一关闭分发器
+        if standalone:
+            await close_program_runner(PROGRAM_SHUTDOWN_TIMEOUT)
+            await close_notifications(NOTIFICATION_FLUSH_TIMEOUT)
+        else:
+            await flush_notifications(NOTIFICATION_FLUSH_TIMEOUT)
+
+
+async def monitor_profiles(profiles):
+    """在同一个事件循环中并发运行多个配置。
+
+    每个配置作为独立的 asyncio 任务运行，所有配置共享同一个进程表，
+    同一时刻的扫描只执行一次。某个配置结束或出错不会影响其他配置。
+
+    Args:
+        profiles (list): (配置名称, 配置信息) 元组列表。
+    """
+    first_config = profiles[0][1]
+    process_scanner_mode = first_config.get('monitor_settings', {}).get(
+        'process_scanner', DEFAULT_VALUES['monitor_settings']['process_scanner'])
+    shared_table = SharedProcessTable(create_process_scanner(process_scanner_mode))
+
+    async def run_profile(profile_name, config):
+        PROFILE_CONTEXT.set(profile_name)
+        LOGGER.info(f"配置 {profile_name} 开始运行")
+        try:
+            await monitor_processes(config, shared_table)
+        except SystemExit as e:
+            # 单个配置的退出只结束该配置的任务
+            LOGGER.warning(f"配置 {profile_name} 已退出，退出码: {e.code}")
+            return
+        except Exception as e:
+            LOGGER.critical(f"配置 {profile_name} 出现异常: {e}", exc_info=True)
+            return
+        LOGGER.info(f"配置 {profile_name} 已结束运行")
+
+    LOGGER.info(f"共 {len(profiles)} 个配置并发运行，共享进程表")
+    for profile_name, config in profiles:
+        token = PROFILE_CONTEXT.set(profile_name)
+        try:
+            start_notifications(config)
+        finally:
+            PROFILE_CONTEXT.reset(token)
+    try:
+        await asyncio.gather(*(
+            run_profile(profile_name, config) for profile_name, config in profiles
+        ))
+    finally:
+        await close_program_runner(PROGRAM_SHUTDOWN_TIMEOUT)
+        await close_notifications(NOTIFICATION_FLUSH_TIMEOUT)
@@ -1,98 +1,542 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import socket
-import datetime
 import asyncio
 import logging
-import sys
+import os
+import time
 
-from serverchan_sdk import sc_send
-from onepush import get_notifier
-from modules.config import DEFAULT_VALUES
+from modules.config import DEFAULT_VALUES, get_resolved_config
+from modules.utils import parse_time_string, get_program_directory
+from modules.logger import PROFILE_CONTEXT
+from modules.ratelimit import PushLimiter, get_dedup_key
+from modules.outbox import NotificationOutbox
+from modules.metrics import record_latency, log_latency_metrics
+from modules.templates import (
+    DIGEST_TEMPLATE_KEY,
+    CompiledTemplate,
+    get_host_fields,
+)
+from modules.channels import (
+    ChannelSender,
+    CircuitBreaker,
+    get_push_channels,
+    get_channel_key,
+    get_channel_name,
+)
 
 LOGGER = logging.getLogger(__name__)
 
+# 当前事件循环使用的推送分发器
+_DISPATCHER = None
 
-async def send_notification(config, template_key, **kwargs):
-    """发送通知。
+# 由推送分发器统一使用的设置，多个配置同时运行时只使用第一个配置的值：
+# {配置节: 配置项，None 表示整个配置节}
+DISPATCHER_SETTINGS = {
+    'push_dispatch': None,
+    'push_outbox': None,
+    'push_circuit_breaker': None,
+    'push_rate_limit': ('channel_burst', 'channel_refill_interval'),
+}
+
+
+# 配置中没有摘要模板或摘要条目格式时使用的默认摘要模板
+_DEFAULT_DIGEST_TEMPLATE = CompiledTemplate(
+    DIGEST_TEMPLATE_KEY, DEFAULT_VALUES['push_settings']['push_templates'][DIGEST_TEMPLATE_KEY])
+
+
+class NotificationDispatcher:
+    """推送分发器。
+
+    监视循环只把渲染好的通知交给分发器，分发器将其同时发往所有配置的推送通道。
+    每个通道有独立的队列、工作任务与有界线程池，阻塞的推送 SDK 调用在线程池中执行，
+    推送服务缓慢或无响应时不会阻塞事件循环，也不会延迟其他通道。
+
+    重试耗尽仍未送达的通知保存到发件箱，由后台任务按指数退避继续重试，
+    监视不会因推送服务故障而中断。
+    """
+
+    def __init__(self, worker_count=2, queue_size=1000, outbox=None,
+                 outbox_retry_interval=30, outbox_max_retry_interval=600,
+                 breaker_failure_threshold=3, breaker_reset_timeout=300,
+                 metrics_log_interval=0):
+        """初始化分发器。
+
+        Args:
+            worker_count (int): 每个通道的工作任务数，同时也是线程池大小。
+            queue_size (int): 每个通道的队列容量，队列已满时新的通知会被丢弃。
+            outbox (NotificationOutbox, optional): 发件箱，默认为 None，
+                此时重试耗尽的通知会被丢弃。
+            outbox_retry_interval (float): 发件箱首次重试间隔，单位为秒。
+            outbox_max_retry_interval (float): 发件箱最长重试间隔，单位为秒。
+            breaker_failure_threshold (int): 通道熔断前允许的连续失败次数。
+            breaker_reset_timeout (float): 通道熔断持续时间，单位为秒。
+            metrics_log_interval (float): 事件延迟统计的日志输出间隔，单位为秒，0 表示不定期输出。
+        """
+        self.worker_count = max(int(worker_count), 1)
+        self.queue_size = queue_size
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self._loop = asyncio.get_running_loop()
+        # 各推送通道的发送器: {通道标识: ChannelSender}
+        self._senders = {}
+        self._limiter = PushLimiter()
+        # 合并窗口内暂存的通知: {(配置名称, 模板键): {'push_settings', 'templates', 'template_key', 'events', 'timer'}}
+        self._pending_digests = {}
+        self._outbox = outbox
+        self._outbox_retry_interval = outbox_retry_interval
+        self._outbox_max_retry_interval = outbox_max_retry_interval
+        self._outbox_wakeup = asyncio.Event()
+        # 发件箱中各通知的下一次重试时间与失败次数，仅保存在内存中，
+        # 上次运行遗留的通知没有记录，启动后立即重试
+        self._outbox_next_attempts = {}
+        self._outbox_task = None
+        if outbox is not None:
+            self._outbox_task = asyncio.create_task(self._retry_outbox())
+        # 创建分发器的配置中由分发器统一使用的设置，见 DISPATCHER_SETTINGS
+        self.settings = None
+        self._metrics_task = None
+        if metrics_log_interval > 0:
+            self._metrics_task = asyncio.create_task(self._log_metrics(metrics_log_interval))
+        LOGGER.debug(f"推送分发器已启动，每个通道工作任务数: {self.worker_count}")
+
+    @property
+    def loop(self):
+        """分发器所属的事件循环。"""
+        return self._loop
+
+    def _get_sender(self, channel_settings):
+        """获取推送通道的发送器，不存在时创建。
+
+        Args:
+            channel_settings (dict): 推送通道设置。
+
+        Returns:
+            ChannelSender: 发送器。
+        """
+        channel_key = get_channel_key(channel_settings)
+        sender = self._senders.get(channel_key)
+        if sender is None:
+            sender = ChannelSender(
+                channel_settings, self.worker_count, self.queue_size,
+                CircuitBreaker(
+                    self.breaker_failure_threshold, self.breaker_reset_timeout,
+                    name=get_channel_name(channel_settings)),
+                self._store_undelivered)
+            self._senders[channel_key] = sender
+        return sender
+
+    def warm(self, push_settings):
+        """为配置的全部推送通道创建发送器，并在后台预先建立连接。
+
+        Args:
+            push_settings (dict): push_settings 配置节。
+        """
+        for channel_settings in get_push_channels(push_settings):
+            self._get_sender(channel_settings).warm()
+
+    def submit(self, push_settings, template_key, title, content, event_time=None, profile=None,
+               dedup_key=None):
+        """把通知提交到所有推送通道，立即返回。
+
+        每个通道分别经过限流与去重检查，被抑制的通知不会进入该通道的队列。
+
+        Args:
+            push_settings (dict): push_settings 配置节。
+            template_key (str): 模板键。
+            title (str): 通知标题。
+            content (str): 通知内容。
+            event_time (float, optional): 事件发生的时间（perf_counter 秒），用于统计端到端延迟。
+            profile (str, optional): 配置名称，默认为 None，此时使用当前任务的配置名称。
+            dedup_key (str, optional): 去重键，默认为 None，此时按标题与内容去重。
+
+        Returns:
+            bool: 是否至少有一个通道接受了该通知。
+        """
+        accepted = False
+        if profile is None:
+            profile = PROFILE_CONTEXT.get()
+        for channel_settings in get_push_channels(push_settings):
+            channel_content = self._limiter.admit(
+                push_settings, channel_settings, template_key, title, content, profile,
+                dedup_key)
+            if channel_content is None:
+                continue
+            sender = self._get_sender(channel_settings)
+            if sender.submit(push_settings, template_key, title, channel_content, event_time):
+                accepted = True
+                LOGGER.debug(f"通知已加入推送通道 {sender.name} 的队列: {template_key}")
+        return accepted
+
+    def coalesce(self, push_settings, templates, template_key, window, values, event_time=None):
+        """把通知暂存到模板的合并窗口中，窗口结束时合并发送。
+
+        同一进程的重复通知只保留最新的参数并累计次数。
+        摘要的端到端延迟从窗口内最早的事件开始计算，包含合并窗口本身。
+
+        Args:
+            push_settings (dict): push_settings 配置节。
+            templates (dict): 加载配置时编译的模板，{模板键: CompiledTemplate}。
+            template_key (str): 模板键。
+            window (float): 合并窗口，单位为秒。
+            values (dict): 已填充主机与时间字段的模板参数。
+            event_time (float, optional): 事件发生的时间（perf_counter 秒）。
+        """
+        if event_time is None:
+            event_time = time.perf_counter()
+        # 多个配置共享分发器时，各配置的同名模板分别合并
+        digest_key = (PROFILE_CONTEXT.get(), template_key)
+        pending = self._pending_digests.get(digest_key)
+        if pending is None:
+            pending = {
+                'push_settings': push_settings,
+                'templates': templates,
+                'template_key': template_key,
+                'events': {},
+                'event_time': event_time,
+                'timer': self._loop.call_later(
+                    window, self._flush_digest, digest_key),
+            }
+            self._pending_digests[digest_key] = pending
+        pending['event_time'] = min(pending['event_time'], event_time)
+        events = pending['events']
+        event_key = values.get('process_pid', ('event', len(events)))
+        repeat = events[event_key][1] + 1 if event_key in events else 1
+        # 重新插入，使摘要按最近一次出现的顺序排列
+        events.pop(event_key, None)
+        events[event_key] = (values, repeat)
+        LOGGER.debug(f"通知已加入合并窗口: {template_key}，当前 {len(events)} 条")
+
+    def _flush_digest(self, digest_key):
+        """结束一个合并窗口，发送摘要或单条通知。
+
+        Args:
+            digest_key (tuple): 合并窗口的键。
+        """
+        pending = self._pending_digests.pop(digest_key, None)
+        if pending is None:
+            return
+        pending['timer'].cancel()
+        push_settings = pending['push_settings']
+        template_key = pending['template_key']
+        event_time = pending['event_time']
+        events = list(pending['events'].values())
+        templates = pending['templates']
+        template = templates[template_key]
+        digest_template = templates.get(DIGEST_TEMPLATE_KEY, _DEFAULT_DIGEST_TEMPLATE)
+
+        if len(events) == 1 or not digest_template.enable:
+            for values, _ in events:
+                title, content = template.render(values)
+                self.submit(
+                    push_settings, template_key, title, content, event_time, digest_key[0],
+                    get_dedup_key(values))
+            return
+
+        item_template = digest_template if digest_template.item else _DEFAULT_DIGEST_TEMPLATE
+        digest_items = '\n\n'.join(
+            '- ' + item_template.render_item({**values, 'digest_repeat': repeat})
+            for values, repeat in events
+        )
+        digest_title, _ = template.render(events[-1][0])
+        title, content = digest_template.render({
+            **events[-1][0],
+            'digest_title': digest_title,
+            'digest_count': len(events),
+            'digest_items': digest_items,
+        })
+        LOGGER.info(f"合并 {len(events)} 条 {template_key} 通知为摘要")
+        dedup_key = '\n'.join(
+            get_dedup_key({**values, 'digest_repeat': repeat}) for values, repeat in events)
+        self.submit(
+            push_settings, template_key, title, content, event_time, digest_key[0], dedup_key)
+
+    def flush_digests(self):
+        """立即结束所有合并窗口。"""
+        for digest_key in list(self._pending_digests):
+            self._flush_digest(digest_key)
+
+    def _store_undelivered(self, channel_settings, template_key, title, content):
+        """保存重试耗尽或通道熔断时未发送的通知到发件箱。
+
+        Args:
+            channel_settings (dict): 推送通道设置。
+            template_key (str): 模板键。
+            title (str): 通知标题。
+            content (str): 通知内容。
+        """
+        if self._outbox is None:
+            LOGGER.critical(f"通知未能送达，已丢弃: {template_key}")
+            return
+        LOGGER.critical(f"通知未能送达，转入发件箱稍后重试: {template_key}")
+        try:
+            # 只保存发送所需的通道设置，发件箱中的通知不受模板与限流设置变化影响
+            record_id = self._outbox.add(template_key, title, content, channel_settings)
+        except OSError as e:
+            LOGGER.error(f"无法写入发件箱 {self._outbox.path}: {e}")
+            return
+        # 刚刚重试耗尽，等待一个重试间隔后再发送
+        self._outbox_next_attempts[record_id] = (
+            time.monotonic() + self._outbox_retry_interval, 1)
+        self._outbox_wakeup.set()
+
+    async def _retry_outbox(self):
+        """后台重试发件箱中的通知，每条通知的重试间隔按指数增长。"""
+        next_attempts = self._outbox_next_attempts
+        while True:
+            now = time.monotonic()
+            for record_id, record in self._outbox.pending():
+                next_attempt, failures = next_attempts.get(record_id, (now, 0))
+                if next_attempt > now:
+                    continue
+                sender = self._get_sender(record['channel'])
+                if not sender.breaker.allow():
+                    # 通道熔断期间不重试，等熔断结束后再试
+                    next_attempts[record_id] = (now + self._outbox_retry_interval, failures)
+                    continue
+                try:
+                    sent = await sender.send(record['title'], record['content'])
+                except Exception as e:
+                    failures += 1
+                    delay = min(
+                        self._outbox_retry_interval * 2 ** (failures - 1),
+                        self._outbox_max_retry_interval)
+                    next_attempts[record_id] = (time.monotonic() + delay, failures)
+                    LOGGER.error(
+                        f"发件箱通知 {record['template_key']} 重试失败 "
+                        f"(第 {failures} 次): {e}，{delay:.0f} 秒后重试"
+                    )
+                    continue
+                next_attempts.pop(record_id, None)
+                try:
+                    self._outbox.complete(record_id)
+                except OSError as e:
+                    LOGGER.error(f"无法更新发件箱 {self._outbox.path}: {e}")
+                if sent:
+                    LOGGER.info(f"发件箱通知已送达: {record['template_key']}")
+                else:
+                    LOGGER.error(f"推送通道未正确配置，发件箱通知已丢弃: {record['template_key']}")
+
+            self._outbox_wakeup.clear()
+            pending_ids = {record_id for record_id, _ in self._outbox.pending()}
+            timeout = None
+            if pending_ids:
+                timeout = max(min(
+                    next_attempts.get(record_id, (now, 0))[0] for record_id in pending_ids
+                ) - time.monotonic(), 0)
+            try:
+                await asyncio.wait_for(self._outbox_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _log_metrics(self, interval):
+        """定期把事件延迟统计写入日志。
+
+        Args:
+            interval (float): 输出间隔，单位为秒。
+        """
+        while True:
+            await asyncio.sleep(interval)
+            log_latency_metrics()
+
+    async def flush(self, timeout=None):
+        """等待队列中的通知全部发送完毕。
+
+        Args:
+            timeout (float, optional): 最长等待时间，单位为秒。默认为 None，一直等待。
+
+        Returns:
+            bool: 队列是否已清空。
+        """
+        self.flush_digests()
+        queued = sum(sender.qsize() for sender in self._senders.values())
+        if queued:
+            LOGGER.info(f"正在等待 {queued} 条待发送通知")
+        try:
+            await asyncio.wait_for(asyncio.gather(*(
+                sender.join() for sender in list(self._senders.values())
+            )), timeout)
+        except asyncio.TimeoutError:
+            queued = sum(sender.qsize() for sender in self._senders.values())
+            LOGGER.error(f"等待通知发送超时，仍有 {queued} 条通知未发送")
+            return False
+        return True
+
+    async def close(self, timeout=None):
+        """发送剩余通知后停止工作任务并关闭线程池。
+
+        Args:
+            timeout (float, optional): 等待剩余通知的最长时间，单位为秒。
+        """
+        await self.flush(timeout)
+        # 发件箱中仍未送达的通知保留在文件中，下次启动时重新发送
+        for task in (self._outbox_task, self._metrics_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        for sender in self._senders.values():
+            await sender.close()
+        if self._outbox is not None and len(self._outbox):
+            LOGGER.warning(f"发件箱中仍有 {len(self._outbox)} 条通知未送达，将在下次启动时重新发送")
+        log_latency_metrics()
+        LOGGER.debug("推送分发器已关闭")
+
+
+def get_dispatcher(config):
+    """获取当前事件循环的推送分发器，不存在时按配置创建。
+
+    Args:
+        config (dict): 配置信息。
+
+    Returns:
+        NotificationDispatcher: 推送分发器。
+    """
+    global _DISPATCHER
+    if _DISPATCHER is None or _DISPATCHER.loop is not asyncio.get_running_loop():
+        push_settings = config.get('push_settings', {})
+        dispatch_settings = push_settings.get('push_dispatch', {})
+        defaults = DEFAULT_VALUES['push_settings']['push_dispatch']
+        outbox_settings = push_settings.get('push_outbox', {})
+        outbox_defaults = DEFAULT_VALUES['push_settings']['push_outbox']
+        breaker_settings = push_settings.get('push_circuit_breaker', {})
+        breaker_defaults = DEFAULT_VALUES['push_settings']['push_circuit_breaker']
+        metrics_log_interval = config.get('log_settings', {}).get(
+            'latency_log_interval', DEFAULT_VALUES['log_settings']['latency_log_interval'])
+        outbox = None
+        if outbox_settings.get('enable', outbox_defaults['enable']):
+            outbox_path = os.path.join(
+                get_program_directory(),
+                outbox_settings.get('path', outbox_defaults['path']))
+            try:
+                outbox = NotificationOutbox(
+                    outbox_path,
+                    outbox_settings.get('compact_threshold', outbox_defaults['compact_threshold']))
+            except OSError as e:
+                LOGGER.error(f"无法打开发件箱 {outbox_path}: {e}")
+        _DISPATCHER = NotificationDispatcher(
+            worker_count=dispatch_settings.get('worker_count', defaults['worker_count']),
+            queue_size=dispatch_settings.get('queue_size', defaults['queue_size']),
+            outbox=outbox,
+            outbox_retry_interval=parse_time_string(str(outbox_settings.get(
+                'retry_interval', outbox_defaults['retry_interval']))) / 1000,
+            outbox_max_retry_interval=parse_time_string(str(outbox_settings.get(
+                'max_retry_interval', outbox_defaults['max_retry_interval']))) / 1000,
+            breaker_failure_threshold=breaker_settings.get(
+                'failure_threshold', breaker_defaults['failure_threshold']),
+            breaker_reset_timeout=parse_time_string(str(breaker_settings.get(
+                'reset_timeout', breaker_defaults['reset_timeout']))) / 1000,
+            metrics_log_interval=parse_time_string(str(metrics_log_interval)) / 1000
+        )
+        _DISPATCHER.settings = get_dispatcher_settings(push_settings)
+    return _DISPATCHER
+
+
+def get_dispatcher_settings(push_settings):
+    """取出由推送分发器统一使用的设置。
+
+    Args:
+        push_settings (dict): push_settings 配置节。
+
+    Returns:
+        dict: {配置节: 设置}，见 DISPATCHER_SETTINGS。
+    """
+    settings = {}
+    for section, keys in DISPATCHER_SETTINGS.items():
+        values = dict(push_settings.get(section) or {})
+        if keys is not None:
+            values = {key: values.get(key) for key in keys}
+        settings[section] = values
+    return settings
+
+
+def start_notifications(config):
+    """在监视开始时创建推送分发器，使发件箱中上次未送达的通知立即开始重发，
+    并预先建立推送通道的连接。
+
+    多个配置同时运行时共用一个分发器，DISPATCHER_SETTINGS 中的设置只使用
+    第一个配置的值，其他配置的设置不同时记录警告。
+
+    Args:
+        config (dict): 配置信息。
+    """
+    push_settings = config.get('push_settings', {})
+    dispatcher = get_dispatcher(config)
+    settings = get_dispatcher_settings(push_settings)
+    for section, values in settings.items():
+        if values != dispatcher.settings[section]:
+            LOGGER.warning(
+                f"多个配置同时运行时 push_settings.{section} 只使用第一个配置的设置，"
+                f"当前配置的设置已忽略: {values}"
+            )
+    dispatcher.warm(push_settings)
+
+
+async def flush_notifications(timeout=None):
+    """等待当前事件循环中的待发送通知全部发送完毕。
+
+    Args:
+        timeout (float, optional): 最长等待时间，单位为秒。默认为 None，一直等待。
+    """
+    if _DISPATCHER is not None and _DISPATCHER.loop is asyncio.get_running_loop():
+        await _DISPATCHER.flush(timeout)
+
+
+async def close_notifications(timeout=None):
+    """发送剩余通知并关闭当前事件循环的推送分发器。
+
+    Args:
+        timeout (float, optional): 等待剩余通知的最长时间，单位为秒。
+    """
+    global _DISPATCHER
+    if _DISPATCHER is not None and _DISPATCHER.loop is asyncio.get_running_loop():
+        dispatcher, _DISPATCHER = _DISPATCHER, None
+        await dispatcher.close(timeout)
+
+
+async def send_notification(config, template_key, event_time=None, **kwargs):
+    """渲染通知并放入推送队列，不等待推送完成。
+
+    模板设置了 coalesce_window 时，通知先暂存在合并窗口中，窗口结束时合并发送。
+    模板在加载配置时已编译并校验，之后修改配置中的模板不会生效。
 
     Args:
         config (dict): 配置信息。
         template_key (str): 模板键。
+        event_time (float, optional): 事件发生的时间（perf_counter 秒），随通知经过
+            渲染、排队与发送，用于统计端到端延迟。默认为 None，此时使用调用时间。
         **kwargs: 模板参数。
     """
+    started = time.perf_counter()
+    if event_time is None:
+        event_time = started
     LOGGER.info(f"使用模板: {template_key} 推送报告")
     push_settings = config.get('push_settings', {})
-    push_templates = push_settings.get('push_templates', {})
-    template = push_templates.get(template_key, {})
+    templates = get_resolved_config(config)['templates']
+    template = templates.get(template_key)
+    if template is None:
+        LOGGER.error(f"通知模板不存在: {template_key}")
+        return
 
     # 检查是否启用了该通知
-    if not template.get('enable', True):
+    if not template.enable:
         LOGGER.warning(f"通知推送已被禁用: {template_key}")
         return
 
-    title = template.get('title', '')
-    content = template.get('content', '')
-
     # 填充模板参数
-    current_time = datetime.datetime.now().strftime('%Y/%m/%d %H:%M:%S')
-    short_current_time = datetime.datetime.now().strftime('%H:%M:%S')
-    host_name = socket.gethostname()
-
-    kwargs.update({
-        'host_name': host_name,
-        'current_time': current_time,
-        'short_current_time': short_current_time,
-    })
-
-    title = title.format(**kwargs)
-    content = content.format(**kwargs)
+    kwargs.update(get_host_fields())
+
+    dispatcher = get_dispatcher(config)
+    if template.coalesce_window_ms > 0:
+        dispatcher.coalesce(
+            push_settings, templates, template_key,
+            template.coalesce_window_ms / 1000, kwargs, event_time)
+        return
+
+    title, content = template.render(kwargs)
+    record_latency('render', time.perf_counter() - started)
     LOGGER.info(
         f"通知标题: {title}\r\n"
         f"通知内容: {content}"
     )
-
-    # 获取推送通道
-    push_channel_settings = push_settings.get('push_channel_settings', {})
-    push_channel = push_channel_settings.get('choose', 'ServerChan')
-    serverchan_key = push_channel_settings.get('serverchan_key', '')
-    push_channel_name = push_channel_settings.get('push_channel', '')
-    push_channel_key = push_channel_settings.get('push_channel_key', '')
-
-    retry_settings = push_settings.get('push_error_retry', {})
-    retry_interval_ms = retry_settings.get('retry_interval_ms', 3000)  # 保留毫秒单位的默认值
-    max_retry_count = retry_settings.get('max_retry_count', DEFAULT_VALUES['push_settings']['push_error_retry']['max_retry_count'])
-
-    # 推送通知
-    LOGGER.info(f"推送通道: {push_channel}")
-    for attempt in range(1, max_retry_count + 1):
-        try:
-            if push_channel == 'ServerChan':
-                if not serverchan_key:
-                    LOGGER.error("ServerChan 密钥未配置，无法发送通知")
-                    return
-                options = {}  # 可根据需要添加额外的选项
-                response = sc_send(serverchan_key, title, content, options)
-                LOGGER.info(f"推送成功: {response}")
-            elif push_channel == 'OnePush':
-                if not push_channel_key:
-                    LOGGER.error("OnePush 密钥未配置，无法发送通知")
-                    return
-                notifier = get_notifier(push_channel_name)
-                notifier.notify(
-                    title=title,
-                    content=content,
-                    key=push_channel_key
-                )
-                LOGGER.info(f"通知发送成功: {title}")
-            else:
-                LOGGER.critical(f"推送通道未配置: {push_channel}")
-            break
-        except Exception as e:
-            LOGGER.error(f"通知发送失败 (尝试 {attempt}/{max_retry_count}): {e}")
-            if attempt < max_retry_count:
-                await asyncio.sleep(retry_interval_ms / 1000)
-            else:
-                LOGGER.critical("通知发送失败，已达到最大重试次数。")
-                sys.exit(1)
\ No newline at end of file
+    dispatcher.submit(
+        push_settings, template_key, title, content, event_time, dedup_key=get_dedup_key(kwargs))
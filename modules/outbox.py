@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import uuid
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+
+class NotificationOutbox:
+    """发送失败通知的持久化发件箱。
+
+    使用只追加的 JSON Lines 文件记录操作：add 记录一条待发送的通知，
+    done 标记该通知已送达。每次写入后执行 fsync，程序崩溃或被终止后
+    未送达的通知会在下次启动时重新发送。已送达的记录累积到一定数量后
+    重写文件（压缩），文件中不再有待发送通知时删除文件。
+    """
+
+    def __init__(self, path, compact_threshold=50):
+        """初始化发件箱并读取已有记录。
+
+        Args:
+            path (str): 发件箱文件路径。
+            compact_threshold (int): 已送达记录达到该数量时压缩文件。
+        """
+        self.path = path
+        self.compact_threshold = max(int(compact_threshold), 1)
+        self._records = {}
+        self._done_count = 0
+        self._load()
+
+    def _load(self):
+        """读取发件箱文件，恢复未送达的通知。"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    if entry['op'] == 'add':
+                        self._records[entry['id']] = entry['record']
+                    elif entry['op'] == 'done':
+                        self._records.pop(entry['id'], None)
+                except (ValueError, KeyError, TypeError):
+                    # 写入过程中被终止时最后一行可能不完整
+                    LOGGER.warning(f"发件箱第 {line_number} 行已损坏，已跳过")
+        if self._records:
+            LOGGER.warning(f"发件箱中有 {len(self._records)} 条上次未送达的通知，将重新发送")
+        self.compact()
+
+    def _append(self, entry):
+        """追加一条操作记录并落盘。
+
+        Args:
+            entry (dict): 操作记录。
+        """
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, template_key, title, content, channel_settings):
+        """保存一条未送达的通知。
+
+        Args:
+            template_key (str): 模板键。
+            title (str): 通知标题。
+            content (str): 通知内容。
+            channel_settings (dict): 发送所用的推送通道设置。
+
+        Returns:
+            str: 通知记录的 ID。
+        """
+        record_id = uuid.uuid4().hex
+        record = {
+            'created': time.time(),
+            'template_key': template_key,
+            'title': title,
+            'content': content,
+            'channel': dict(channel_settings),
+        }
+        self._append({'op': 'add', 'id': record_id, 'record': record})
+        self._records[record_id] = record
+        LOGGER.info(f"通知已保存到发件箱: {template_key}，待发送 {len(self._records)} 条")
+        return record_id
+
+    def complete(self, record_id):
+        """标记一条通知已送达。
+
+        Args:
+            record_id (str): 通知记录的 ID。
+        """
+        if self._records.pop(record_id, None) is None:
+            return
+        self._append({'op': 'done', 'id': record_id})
+        self._done_count += 1
+        if not self._records or self._done_count >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """用未送达的通知重写发件箱文件，没有未送达的通知时删除文件。"""
+        self._done_count = 0
+        if not self._records:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record_id, record in self._records.items():
+                f.write(json.dumps(
+                    {'op': 'add', 'id': record_id, 'record': record},
+                    ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        LOGGER.debug(f"发件箱已压缩，剩余 {len(self._records)} 条")
+
+    def pending(self):
+        """获取所有未送达的通知。
+
+        Returns:
+            list: (记录 ID, 通知记录) 元组列表，按保存顺序排列。
+        """
+        return list(self._records.items())
+
+    def __len__(self):
+        return len(self._records)
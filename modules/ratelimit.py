@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import hashlib
+import logging
+
+from modules.config import DEFAULT_VALUES
+from modules.utils import parse_time_string
+from modules.channels import get_channel_key
+from modules.templates import HOST_PLACEHOLDERS
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_dedup_key(values):
+    """由模板参数生成去重键。
+
+    主机名与时间字段每次发送都会变化，不参与去重。
+
+    Args:
+        values (dict): 模板参数。
+
+    Returns:
+        str: 去重键。
+    """
+    return repr(sorted(
+        (key, repr(value)) for key, value in values.items() if key not in HOST_PLACEHOLDERS
+    ))
+
+
+class TokenBucket:
+    """令牌桶。
+
+    桶内最多保存 capacity 个令牌，每经过 refill_interval 秒补充一个，
+    每次发送消耗一个令牌，桶空时拒绝发送。
+    """
+
+    def __init__(self, capacity, refill_interval, clock=time.monotonic):
+        """初始化令牌桶。
+
+        Args:
+            capacity (int): 令牌桶容量，即允许的突发数量。
+            refill_interval (float): 补充一个令牌所需的时间，单位为秒。
+            clock (callable): 返回当前时间（秒）的函数。
+        """
+        self.capacity = capacity
+        self.refill_interval = refill_interval
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        if self.refill_interval > 0:
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated) / self.refill_interval)
+        self._updated = now
+
+    def available(self):
+        """是否至少有一个令牌。
+
+        Returns:
+            bool: 是否可以发送。
+        """
+        self._refill()
+        return self._tokens >= 1
+
+    def consume(self):
+        """消耗一个令牌，调用前应先确认 available()。"""
+        self._tokens -= 1
+
+
+class PushLimiter:
+    """推送限流与去重。
+
+    每个推送通道，以及每个配置的每个模板在每个通道上，各有一个令牌桶，
+    去重窗口内模板与参数（不含主机与时间字段）相同的通知只发送一次，
+    未提供参数时按标题与内容去重。多个配置共用同一通道时，
+    通道令牌桶使用第一个配置的 channel_burst 与 channel_refill_interval。
+    被抑制的通知数会附加在同一通道下一条成功放行的通知末尾。
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """初始化限流器。
+
+        Args:
+            clock (callable): 返回当前时间（秒）的函数。
+        """
+        self._clock = clock
+        self._channel_buckets = {}
+        self._template_buckets = {}
+        # 去重记录: {摘要: 过期时间}，按插入顺序即过期顺序排列
+        self._recent_messages = {}
+        # 各通道被抑制的通知数: {通道标识: {'rate_limited': int, 'duplicate': int}}
+        self._suppressed = {}
+
+    def _get_settings(self, push_settings):
+        rate_settings = push_settings.get('push_rate_limit', {})
+        defaults = DEFAULT_VALUES['push_settings']['push_rate_limit']
+        return {
+            key: rate_settings.get(key, default) for key, default in defaults.items()
+        }
+
+    def _get_bucket(self, buckets, key, capacity, refill_interval):
+        if not capacity or capacity <= 0:
+            return None
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                capacity, parse_time_string(str(refill_interval)) / 1000, self._clock)
+            buckets[key] = bucket
+        return bucket
+
+    def _is_duplicate(self, message_digest, dedup_window):
+        now = self._clock()
+        while self._recent_messages:
+            oldest_digest, expires_at = next(iter(self._recent_messages.items()))
+            if expires_at > now:
+                break
+            del self._recent_messages[oldest_digest]
+        if message_digest in self._recent_messages:
+            return True
+        if dedup_window > 0:
+            self._recent_messages[message_digest] = now + dedup_window
+        return False
+
+    def admit(self, push_settings, channel_settings, template_key, title, content, profile='',
+              dedup_key=None):
+        """判断通知能否通过一个推送通道发送。
+
+        Args:
+            push_settings (dict): push_settings 配置节。
+            channel_settings (dict): 推送通道设置。
+            template_key (str): 模板键。
+            title (str): 通知标题。
+            content (str): 通知内容。
+            profile (str): 配置名称，各配置的模板令牌桶相互独立。
+            dedup_key (str, optional): 由 get_dedup_key 生成的去重键，默认为 None，
+                此时按标题与内容去重。
+
+        Returns:
+            str: 允许发送时返回内容（附带此前被抑制的通知数），被抑制时返回 None。
+        """
+        settings = self._get_settings(push_settings)
+        channel_key = get_channel_key(channel_settings)
+        suppressed = self._suppressed.setdefault(
+            channel_key, {'rate_limited': 0, 'duplicate': 0})
+
+        dedup_window = parse_time_string(str(settings['dedup_window'])) / 1000
+        if dedup_key is None:
+            message = f"{channel_key}\0{title}\0{content}"
+        else:
+            message = f"{channel_key}\0{template_key}\0{dedup_key}"
+        message_digest = hashlib.sha1(message.encode('utf-8')).hexdigest()
+        if self._is_duplicate(message_digest, dedup_window):
+            suppressed['duplicate'] += 1
+            LOGGER.warning(f"重复通知已被抑制: {template_key}")
+            return None
+
+        buckets = [
+            bucket for bucket in (
+                self._get_bucket(
+                    self._channel_buckets, channel_key,
+                    settings['channel_burst'], settings['channel_refill_interval']),
+                self._get_bucket(
+                    self._template_buckets, (profile, channel_key, template_key),
+                    settings['template_burst'], settings['template_refill_interval']),
+            ) if bucket is not None
+        ]
+        if not all(bucket.available() for bucket in buckets):
+            # 未发送的通知不占用去重记录，配额恢复后相同内容仍可发送
+            self._recent_messages.pop(message_digest, None)
+            suppressed['rate_limited'] += 1
+            LOGGER.warning(f"通知发送过于频繁，已被限流: {template_key}")
+            return None
+        for bucket in buckets:
+            bucket.consume()
+
+        if suppressed['rate_limited'] or suppressed['duplicate']:
+            content += (
+                f"\n\n此前有 {suppressed['rate_limited']} 条通知被限流、"
+                f"{suppressed['duplicate']} 条重复通知被抑制\n\n"
+            )
+            LOGGER.info(
+                f"附加被抑制的通知数: 限流 {suppressed['rate_limited']}，"
+                f"重复 {suppressed['duplicate']}"
+            )
+            suppressed['rate_limited'] = suppressed['duplicate'] = 0
+        return content
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import shutil
+import asyncio
+import locale
+import logging
+
+from modules.utils import get_program_working_directory, parse_time_string
+
+LOGGER = logging.getLogger(__name__)
+
+# external_program_settings 中的外部程序路径配置项
+PROGRAM_PATH_KEYS = (
+    'external_program_path',
+    'another_external_program_path',
+    'external_program_on_wait_timeout_path',
+)
+# 终止超时程序后等待其退出的时间（秒），超过后强制结束
+TERMINATE_GRACE_PERIOD = 5
+# 程序退出后等待剩余输出读取完毕的时间（秒），子进程可能把管道传给了仍在运行的孙进程
+OUTPUT_DRAIN_TIMEOUT = 1
+# 每次从输出管道读取的字节数
+OUTPUT_READ_SIZE = 65536
+# 单行输出的最大长度（字节），没有换行的超长输出按该长度分段写入日志
+OUTPUT_MAX_LINE_LENGTH = 65536
+# Windows 上可以直接启动的程序扩展名，其他文件经 cmd.exe /c 按文件关联打开
+WINDOWS_EXECUTABLE_EXTENSIONS = ('.exe', '.com')
+# Windows 上 .ps1 默认关联到记事本，需要经 PowerShell 执行
+POWERSHELL_ARGV = ['powershell.exe', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-File']
+
+# 同时运行的外部程序数量上限与单个程序的最长运行时间的默认值
+DEFAULT_MAX_CONCURRENT_PROGRAMS = 2
+DEFAULT_PROGRAM_TIMEOUT = '10m'
+_RUNNER = None
+
+
+class ProgramSpec:
+    """已解析并校验的外部程序。"""
+
+    __slots__ = ('path', 'name', 'argv', 'cwd')
+
+    def __init__(self, path, argv, cwd):
+        """初始化外部程序。
+
+        Args:
+            path (str): 程序的绝对路径。
+            argv (list): 启动参数，批处理文件与 Windows 上的脚本等文件经解释器执行。
+            cwd (str): 工作目录。
+        """
+        self.path = path
+        self.name = os.path.basename(path)
+        self.argv = argv
+        self.cwd = cwd
+
+    def __repr__(self):
+        return f"ProgramSpec({self.path!r})"
+
+
+def resolve_external_program(program_path):
+    """解析并校验外部程序路径。
+
+    Windows 上 .exe 与 .com 直接启动，.ps1 经 PowerShell 执行，
+    .bat、.py 等其他文件经 cmd.exe /c 按文件关联打开。
+
+    Args:
+        program_path (str): 配置中的程序路径，支持 ~ 与环境变量，
+            不含目录时在 PATH 中查找。
+
+    Returns:
+        ProgramSpec: 已解析的外部程序。
+
+    Raises:
+        ValueError: 程序不存在或没有执行权限。
+    """
+    expanded = os.path.expandvars(os.path.expanduser(program_path.strip()))
+    if os.path.isfile(expanded):
+        path = os.path.abspath(expanded)
+    else:
+        found = None if os.path.dirname(expanded) else shutil.which(expanded)
+        if found is None:
+            raise ValueError(f"外部程序不存在: {program_path}")
+        path = os.path.abspath(found)
+
+    ext = os.path.splitext(path)[1].lower()
+    if sys.platform == 'win32':
+        if ext in WINDOWS_EXECUTABLE_EXTENSIONS:
+            argv = [path]
+        elif ext == '.ps1':
+            argv = POWERSHELL_ARGV + [path]
+        else:
+            # CreateProcess 只能启动可执行文件，脚本等文件由 cmd.exe 按文件关联打开
+            argv = ['cmd.exe', '/c', path]
+    elif ext in ('.bat', '.cmd'):
+        # 批处理文件需要经 cmd.exe 执行
+        argv = ['cmd.exe', '/c', path]
+    elif not os.access(path, os.X_OK):
+        raise ValueError(f"外部程序没有执行权限: {program_path}")
+    else:
+        argv = [path]
+    return ProgramSpec(path, argv, get_program_working_directory(path))
+
+
+def get_external_programs(external_settings):
+    """解析外部程序设置中的旧式程序路径配置项。
+
+    无效的程序会记录错误并被禁用，不影响监视。
+
+    Args:
+        external_settings (dict): external_program_settings 配置节。
+
+    Returns:
+        dict: {配置项: ProgramSpec 或 None}，未配置或无效的程序为 None。
+    """
+    programs = {}
+    for key in PROGRAM_PATH_KEYS:
+        program_path = external_settings.get(key, '')
+        programs[key] = None
+        if not program_path:
+            continue
+        try:
+            programs[key] = resolve_external_program(program_path)
+        except ValueError as e:
+            LOGGER.error(f"{key} 无效，已禁用该外部程序: {e}")
+            continue
+        LOGGER.debug(f"{key} 已解析: {programs[key].path}")
+    return programs
+
+
+class ExternalProgramRunner:
+    """在事件循环中运行外部程序。
+
+    限制同时运行的程序数量，超时后结束程序，逐行把程序的标准输出与标准错误写入日志，
+    并记录程序的退出码。
+    """
+
+    def __init__(self, max_concurrency=2, timeout=None):
+        """初始化运行器。
+
+        Args:
+            max_concurrency (int): 同时运行的外部程序数量上限，小于 1 时按 1 处理。
+            timeout (float, optional): 单个程序的最长运行时间，单位为秒。
+                默认为 None，不限制。
+        """
+        self.loop = asyncio.get_running_loop()
+        self.max_concurrency = max(int(max_concurrency), 1)
+        self.timeout = timeout or None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks = set()
+        self._encoding = locale.getpreferredencoding(False)
+
+    def _log_line(self, line, name, level):
+        """把一行输出写入日志。"""
+        text = line.decode(self._encoding, errors='replace').rstrip()
+        if text:
+            LOGGER.log(level, f"[{name}] {text}")
+
+    async def _log_stream(self, stream, name, level):
+        """读取程序输出并逐行写入日志。
+
+        自行按换行分割，而不是使用 readline：超过 StreamReader 缓冲上限的行
+        会使 readline 抛出异常并停止读取，程序随后因管道写满而阻塞。
+        """
+        buffer = b''
+        while True:
+            chunk = await stream.read(OUTPUT_READ_SIZE)
+            if not chunk:
+                break
+            buffer += chunk
+            lines = buffer.split(b'\n')
+            buffer = lines.pop()
+            for line in lines:
+                self._log_line(line, name, level)
+            while len(buffer) >= OUTPUT_MAX_LINE_LENGTH:
+                self._log_line(buffer[:OUTPUT_MAX_LINE_LENGTH], name, level)
+                buffer = buffer[OUTPUT_MAX_LINE_LENGTH:]
+        self._log_line(buffer, name, level)
+
+    async def _stop(self, process, name):
+        """结束程序，不响应时强制结束。"""
+        try:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), TERMINATE_GRACE_PERIOD)
+                return
+            except asyncio.TimeoutError:
+                pass
+            LOGGER.warning(f"外部程序 {name} (PID: {process.pid}) 未响应结束请求，强制结束")
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+    async def run(self, spec, timeout=None):
+        """运行外部程序并等待其结束。
+
+        Args:
+            spec (ProgramSpec): 外部程序。
+            timeout (float, optional): 本次运行的最长时间，单位为秒。
+                默认为 None，使用运行器的超时设置。
+
+        Returns:
+            int: 程序的退出码；启动失败时返回 None，超时被结束时为负数（POSIX）或非零值。
+        """
+        timeout = timeout or self.timeout
+        if self._semaphore.locked():
+            LOGGER.info(f"同时运行的外部程序已达上限 {self.max_concurrency}，{spec.name} 排队等待")
+        async with self._semaphore:
+            LOGGER.info(f"正在调用外部程序: {spec.path}")
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *spec.argv, cwd=spec.cwd, stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            except OSError as e:
+                LOGGER.error(f"调用外部程序 {spec.path} 失败: {e}")
+                return None
+            LOGGER.debug(f"外部程序 {spec.name} 已启动 (PID: {process.pid})")
+            readers = asyncio.gather(
+                self._log_stream(process.stdout, spec.name, logging.INFO),
+                self._log_stream(process.stderr, spec.name, logging.WARNING))
+            timed_out = False
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                LOGGER.warning(f"外部程序 {spec.name} (PID: {process.pid}) 运行超时，正在结束")
+                await self._stop(process, spec.name)
+            except asyncio.CancelledError:
+                await self._stop(process, spec.name)
+                readers.cancel()
+                raise
+            try:
+                await asyncio.wait_for(readers, OUTPUT_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                LOGGER.debug(f"外部程序 {spec.name} 的输出管道仍被占用，停止读取")
+
+        exit_code = process.returncode
+        if timed_out:
+            LOGGER.error(f"外部程序 {spec.name} 运行超过 {timeout:g} 秒被结束，退出码: {exit_code}")
+        elif exit_code == 0:
+            LOGGER.info(f"外部程序 {spec.name} 执行成功，退出码: 0")
+        else:
+            LOGGER.error(f"外部程序 {spec.name} 执行失败，退出码: {exit_code}")
+        return exit_code
+
+    def start(self, spec, timeout=None):
+        """在后台运行外部程序，不等待其结束。
+
+        Args:
+            spec (ProgramSpec): 外部程序。
+            timeout (float, optional): 本次运行的最长时间，单位为秒。
+
+        Returns:
+            asyncio.Task: 运行任务，结果为程序的退出码。
+        """
+        return self.track(self.run(spec, timeout))
+
+    def track(self, coro):
+        """在后台运行调用外部程序的协程，关闭运行器时一并等待。
+
+        Args:
+            coro (coroutine): 协程，例如依次运行多个外部程序的动作流水线。
+
+        Returns:
+            asyncio.Task: 运行任务。
+        """
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @property
+    def running(self):
+        """后台运行与排队中的任务数量。"""
+        return len(self._tasks)
+
+    async def close(self, timeout=None):
+        """等待后台运行的外部程序结束，超时后结束剩余的程序。
+
+        Args:
+            timeout (float, optional): 最长等待时间，单位为秒。默认为 None，一直等待。
+        """
+        if not self._tasks:
+            return
+        LOGGER.info(f"正在等待 {len(self._tasks)} 个外部程序任务结束")
+        _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+        if pending:
+            LOGGER.warning(f"{len(pending)} 个外部程序任务未在 {timeout:g} 秒内结束，正在结束")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def get_program_runner(config):
+    """获取当前事件循环的外部程序运行器，不存在时按配置创建。
+
+    Args:
+        config (dict): 配置信息。
+
+    Returns:
+        ExternalProgramRunner: 外部程序运行器。
+    """
+    global _RUNNER
+    if _RUNNER is None or _RUNNER.loop is not asyncio.get_running_loop():
+        external_settings = config.get('external_program_settings', {})
+        timeout_ms = parse_time_string(str(external_settings.get(
+            'program_timeout', DEFAULT_PROGRAM_TIMEOUT)))
+        _RUNNER = ExternalProgramRunner(
+            max_concurrency=external_settings.get(
+                'max_concurrent_programs', DEFAULT_MAX_CONCURRENT_PROGRAMS),
+            timeout=timeout_ms / 1000 if timeout_ms else None,
+        )
+    return _RUNNER
+
+
+async def close_program_runner(timeout=None):
+    """等待并关闭当前事件循环的外部程序运行器。
+
+    每个外部程序已受 program_timeout 限制，因此等待时间至少为 program_timeout，
+    使退出前触发的动作（例如超时次数达到阈值时的外部程序）能够正常执行完成。
+
+    Args:
+        timeout (float, optional): 等待外部程序结束的最长时间，单位为秒。
+    """
+    global _RUNNER
+    if _RUNNER is not None and _RUNNER.loop is asyncio.get_running_loop():
+        runner, _RUNNER = _RUNNER, None
+        if timeout is not None and runner.timeout is not None:
+            timeout = max(timeout, runner.timeout)
+        await runner.close(timeout)
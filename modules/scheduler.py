@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """基于最小堆的截止时间调度器。
+
+    每个键只保留最近一次设置的截止时间；重新设置或取消时旧条目留在堆中，
+    在到达堆顶时被丢弃（惰性删除），堆中失效条目过多时整体重建。
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}
+        self._counter = itertools.count()
+
+    def schedule(self, key, deadline_ms):
+        """设置或更新一个截止时间。
+
+        Args:
+            key (hashable): 截止时间的键。
+            deadline_ms (float): 截止时间点（毫秒）。
+        """
+        self._deadlines[key] = deadline_ms
+        heapq.heappush(self._heap, (deadline_ms, next(self._counter), key))
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._rebuild()
+
+    def cancel(self, key):
+        """取消一个截止时间，键不存在时忽略。
+
+        Args:
+            key (hashable): 截止时间的键。
+        """
+        self._deadlines.pop(key, None)
+
+    def get(self, key):
+        """获取键当前的截止时间。
+
+        Args:
+            key (hashable): 截止时间的键。
+
+        Returns:
+            float: 截止时间点（毫秒），不存在时返回 None。
+        """
+        return self._deadlines.get(key)
+
+    def next_deadline(self):
+        """获取最近的截止时间。
+
+        Returns:
+            float: 最近的截止时间点（毫秒），没有待处理的截止时间时返回 None。
+        """
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now_ms):
+        """取出所有已到期的键。
+
+        Args:
+            now_ms (float): 当前时间点（毫秒）。
+
+        Returns:
+            list: 按截止时间排序的已到期键。
+        """
+        due_keys = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now_ms:
+                return due_keys
+            _, _, key = heapq.heappop(self._heap)
+            del self._deadlines[key]
+            due_keys.append(key)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _discard_stale(self):
+        """丢弃堆顶已被取消或已被重新设置的条目。"""
+        while self._heap:
+            deadline_ms, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline_ms:
+                return
+            heapq.heappop(self._heap)
+
+    def _rebuild(self):
+        """用当前有效的截止时间重建堆。"""
+        LOGGER.debug(f"重建截止时间堆: {len(self._heap)} -> {len(self._deadlines)}")
+        self._heap = [
+            (deadline_ms, next(self._counter), key)
+            for key, deadline_ms in self._deadlines.items()
+        ]
+        heapq.heapify(self._heap)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import logging
+from collections import deque
+
+from modules.utils import format_time_ms, parse_time_string
+from modules.config import DEFAULT_VALUES
+from modules.monitor import monitor_processes, PROGRAM_SHUTDOWN_TIMEOUT, NOTIFICATION_FLUSH_TIMEOUT
+from modules.notification import send_notification, start_notifications, close_notifications
+from modules.runner import resolve_external_program, close_program_runner
+
+LOGGER = logging.getLogger(__name__)
+
+RESTART_POLICIES = ('never', 'on-failure', 'always')
+
+
+class RestartBackoff:
+    """计算重启前的等待时间并检测崩溃循环。
+
+    每次重启的等待时间按 2 倍递增直到上限，进程持续运行足够长时间后恢复为初始值；
+    检测窗口内的重启次数达到阈值后，进程再次退出即判定为崩溃循环。
+    """
+
+    def __init__(self, restart_delay, max_restart_delay, reset_after=0,
+                 crash_loop_threshold=0, crash_loop_window=0):
+        """初始化退避计算器。
+
+        Args:
+            restart_delay (float): 首次重启前的等待时间，单位为秒。
+            max_restart_delay (float): 等待时间上限，单位为秒。
+            reset_after (float): 进程运行超过该时间后等待时间恢复为初始值，单位为秒，0 表示不恢复。
+            crash_loop_threshold (int): 窗口内允许的重启次数，0 表示不检测。
+            crash_loop_window (float): 崩溃循环检测窗口，单位为秒。
+        """
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max(max_restart_delay, restart_delay)
+        self.reset_after = reset_after
+        self.crash_loop_threshold = crash_loop_threshold
+        self.crash_loop_window = crash_loop_window
+        self.restart_count = 0
+        self._attempt = 0
+        self._restart_times = deque()
+
+    def next_delay(self, run_time, now=None):
+        """记录一次退出并计算重启前的等待时间。
+
+        Args:
+            run_time (float): 本次运行的时间，单位为秒。
+            now (float, optional): 当前时间（monotonic 秒），默认为调用时间。
+
+        Returns:
+            float: 重启前的等待时间，单位为秒；判定为崩溃循环时返回 None。
+        """
+        if now is None:
+            now = time.monotonic()
+        if self.reset_after and run_time >= self.reset_after:
+            self._attempt = 0
+        while self._restart_times and now - self._restart_times[0] > self.crash_loop_window:
+            self._restart_times.popleft()
+        if self.crash_loop_threshold and len(self._restart_times) >= self.crash_loop_threshold:
+            return None
+        delay = min(self.restart_delay * 2 ** self._attempt, self.max_restart_delay)
+        self._attempt += 1
+        self.restart_count += 1
+        self._restart_times.append(now)
+        return delay
+
+
+def should_restart(policy, exit_code):
+    """根据重启策略判断进程退出后是否重启。
+
+    Args:
+        policy (str): 重启策略，见 RESTART_POLICIES。
+        exit_code (int): 进程的退出码。
+
+    Returns:
+        bool: 需要重启时返回 True。
+    """
+    if policy == 'always':
+        return True
+    if policy == 'on-failure':
+        return exit_code != 0
+    return False
+
+
+async def stop_child(process, timeout):
+    """结束子进程，超时未退出时强制结束。
+
+    Args:
+        process (asyncio.subprocess.Process): 子进程。
+        timeout (float): 等待子进程退出的时间，单位为秒。
+    """
+    if process.returncode is not None:
+        return
+    LOGGER.info(f"正在结束子进程 (PID: {process.pid})")
+    try:
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+            return
+        except asyncio.TimeoutError:
+            pass
+        LOGGER.warning(f"子进程 (PID: {process.pid}) 未在 {timeout:g} 秒内退出，强制结束")
+        process.kill()
+    except ProcessLookupError:
+        pass
+    await process.wait()
+
+
+async def supervise(config, command):
+    """启动命令作为子进程并监视，按重启策略在退出后重启。
+
+    子进程的结束由事件循环直接等待，不需要轮询；超时警告、超时升级、资源采样与
+    timeout_count_threshold 外部程序调用与普通监视模式相同。
+
+    Args:
+        config (dict): 配置信息。
+        command (list): 要启动的命令与参数。
+
+    Returns:
+        int: 子进程最后一次的退出码；无法启动时为 None。
+    """
+    settings = config.get('supervisor_settings', {})
+    defaults = DEFAULT_VALUES['supervisor_settings']
+    policy = settings.get('restart_policy', defaults['restart_policy'])
+    if policy not in RESTART_POLICIES:
+        LOGGER.warning(f"未知的重启策略: {policy}，使用 never")
+        policy = 'never'
+
+    def get_seconds(key):
+        return parse_time_string(str(settings.get(key, defaults[key]))) / 1000
+
+    backoff = RestartBackoff(
+        restart_delay=get_seconds('restart_delay'),
+        max_restart_delay=get_seconds('max_restart_delay'),
+        reset_after=get_seconds('reset_after'),
+        crash_loop_threshold=settings.get(
+            'crash_loop_threshold', defaults['crash_loop_threshold']),
+        crash_loop_window=get_seconds('crash_loop_window'),
+    )
+    stop_timeout = get_seconds('stop_timeout')
+
+    try:
+        program = resolve_external_program(command[0])
+    except ValueError as e:
+        LOGGER.critical(f"无法启动被监视的命令: {e}")
+        return None
+    argv = program.argv + list(command[1:])
+    child_name = program.name
+    LOGGER.info(f"supervisor 模式，重启策略: {policy}")
+
+    exit_code = None
+    start_notifications(config)
+    try:
+        while True:
+            LOGGER.info(f"正在启动: {' '.join(argv)}")
+            try:
+                process = await asyncio.create_subprocess_exec(*argv)
+            except OSError as e:
+                LOGGER.critical(f"启动 {child_name} 失败: {e}")
+                return exit_code
+            started = time.perf_counter()
+            LOGGER.info(f"已启动 {child_name} (PID: {process.pid})")
+            try:
+                await monitor_processes(config, child=process, child_name=child_name)
+            finally:
+                # 监视循环提前结束（被取消或达到超时阈值退出）时一并结束子进程
+                exited = process.returncode is not None
+                await stop_child(process, stop_timeout)
+            run_time = time.perf_counter() - started
+            exit_code = process.returncode
+            if not exited:
+                LOGGER.info(f"监视已停止，{child_name} 已被结束，不再重启")
+                break
+            if not should_restart(policy, exit_code):
+                break
+
+            delay = backoff.next_delay(run_time)
+            if delay is None:
+                LOGGER.critical(
+                    f"{child_name} 在 {format_time_ms(backoff.crash_loop_window * 1000)} 内"
+                    f"已重启 {backoff.restart_count} 次仍反复退出，停止重启"
+                )
+                await send_notification(
+                    config,
+                    'process_crash_loop_notification',
+                    process_name=child_name,
+                    process_pid=process.pid,
+                    process_run_time=format_time_ms(run_time * 1000),
+                    process_exit_code=exit_code,
+                    restart_count=backoff.restart_count,
+                    process_list=[]
+                )
+                break
+            formatted_delay = format_time_ms(delay * 1000)
+            LOGGER.warning(
+                f"{child_name} 以退出码 {exit_code} 结束，"
+                f"{formatted_delay} 后第 {backoff.restart_count} 次重启"
+            )
+            await send_notification(
+                config,
+                'process_restart_notification',
+                process_name=child_name,
+                process_pid=process.pid,
+                process_run_time=format_time_ms(run_time * 1000),
+                process_exit_code=exit_code,
+                restart_count=backoff.restart_count,
+                restart_delay=formatted_delay,
+                process_list=[]
+            )
+            await asyncio.sleep(delay)
+    finally:
+        await close_program_runner(PROGRAM_SHUTDOWN_TIMEOUT)
+        await close_notifications(NOTIFICATION_FLUSH_TIMEOUT)
+    LOGGER.info(f"{child_name} 最后一次退出码: {exit_code}")
+    return exit_code
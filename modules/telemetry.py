@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import math
+import logging
+from array import array
+
+import psutil
+
+LOGGER = logging.getLogger(__name__)
+
+# 采样指标: (指标名, 显示名称)
+METRICS = (
+    ('cpu_percent', 'CPU 使用率'),
+    ('memory_rss', '内存占用'),
+    ('num_threads', '线程数'),
+    ('io_read_bytes', '累计读取'),
+    ('io_write_bytes', '累计写入'),
+)
+METRIC_LABELS = dict(METRICS)
+
+
+class RingBuffer:
+    """基于 array 的定长环形缓冲区，写满后覆盖最旧的数据。
+
+    内存占用固定为 capacity 个双精度浮点数，与监视时长无关。
+    无法读取的数据以 NaN 记录，统计时忽略。
+    """
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError(f"环形缓冲区容量必须大于 0: {capacity}")
+        self._data = array('d', bytes(8 * capacity))
+        self._capacity = capacity
+        self._next = 0
+        self._count = 0
+
+    def append(self, value):
+        """写入一个值。
+
+        Args:
+            value (float): 数据值，None 记录为 NaN。
+        """
+        self._data[self._next] = math.nan if value is None else value
+        self._next = (self._next + 1) % self._capacity
+        if self._count < self._capacity:
+            self._count += 1
+
+    def latest(self, count=None):
+        """获取最近写入的数据。
+
+        Args:
+            count (int, optional): 数据个数，默认为 None，返回全部数据。
+
+        Returns:
+            list: 按写入顺序排列的数据。
+        """
+        if count is None or count > self._count:
+            count = self._count
+        start = self._next - count
+        if start >= 0:
+            return self._data[start:self._next].tolist()
+        return self._data[start:].tolist() + self._data[:self._next].tolist()
+
+    def last(self):
+        """获取最后写入的值，缓冲区为空时返回 None。"""
+        if not self._count:
+            return None
+        return self._data[self._next - 1]
+
+    def max(self):
+        """获取有效数据的最大值，没有有效数据时返回 None。"""
+        values = [value for value in self.latest() if not math.isnan(value)]
+        return max(values) if values else None
+
+    def mean(self):
+        """获取有效数据的平均值，没有有效数据时返回 None。"""
+        values = [value for value in self.latest() if not math.isnan(value)]
+        return sum(values) / len(values) if values else None
+
+    def __len__(self):
+        return self._count
+
+
+def format_metric_value(metric, value):
+    """格式化指标值用于通知与日志。
+
+    Args:
+        metric (str): 指标名。
+        value (float): 指标值。
+
+    Returns:
+        str: 格式化后的字符串。
+    """
+    if value is None or math.isnan(value):
+        return '未知'
+    if metric == 'cpu_percent':
+        return f"{value:.1f}%"
+    if metric in ('memory_rss', 'io_read_bytes', 'io_write_bytes'):
+        return f"{value / 1024 / 1024:.1f} MB"
+    return f"{value:.0f}"
+
+
+def parse_telemetry_thresholds(telemetry_settings):
+    """从 telemetry_settings 中读取启用的阈值。
+
+    Args:
+        telemetry_settings (dict): telemetry_settings 配置节。
+
+    Returns:
+        dict: {指标名: 阈值}，阈值为 0 的指标不检查。
+    """
+    thresholds = {
+        'cpu_percent': float(telemetry_settings.get('cpu_percent_threshold', 0) or 0),
+        'memory_rss': float(telemetry_settings.get('memory_rss_threshold_mb', 0) or 0) * 1024 * 1024,
+        'num_threads': float(telemetry_settings.get('num_threads_threshold', 0) or 0),
+    }
+    return {metric: value for metric, value in thresholds.items() if value > 0}
+
+
+class TelemetrySampler:
+    """被监视进程的资源采样器。
+
+    为每个 PID 保留一个 psutil.Process 句柄，并在 oneshot() 中一次读取
+    CPU 使用率、RSS、线程数与 IO 计数，每个指标写入独立的环形缓冲区。
+    连续 threshold_samples 次采样超过阈值时报告超限，回落到阈值以下时报告恢复。
+    """
+
+    def __init__(self, buffer_size=720, thresholds=None, threshold_samples=3):
+        """初始化采样器。
+
+        Args:
+            buffer_size (int): 每个指标保留的采样数。
+            thresholds (dict, optional): {指标名: 阈值}，默认为 None，不检查阈值。
+            threshold_samples (int): 判定超限所需的连续超限采样次数。
+        """
+        self.buffer_size = buffer_size
+        self.thresholds = thresholds or {}
+        self.threshold_samples = max(int(threshold_samples), 1)
+        self._handles = {}
+        self._buffers = {}
+        self._exceeded = {}
+
+    def add(self, pid, create_time=None):
+        """开始采样一个进程。
+
+        Args:
+            pid (int): 进程 PID。
+            create_time (float, optional): 检测到进程时记录的创建时间，用于识别 PID 复用。
+        """
+        try:
+            handle = psutil.Process(pid)
+            if create_time is not None and handle.create_time() != create_time:
+                LOGGER.debug(f"进程 PID {pid} 已被复用，跳过资源采样")
+                return
+            # 首次调用 cpu_percent 只建立基准，返回值无意义
+            handle.cpu_percent(None)
+        except psutil.NoSuchProcess:
+            return
+        except psutil.AccessDenied:
+            LOGGER.debug(f"无权限读取进程 PID {pid} 的资源信息")
+        self._handles[pid] = handle
+        self._buffers[pid] = {
+            metric: RingBuffer(self.buffer_size) for metric, _ in METRICS
+        }
+        self._exceeded[pid] = set()
+
+    def remove(self, pid):
+        """停止采样一个进程并丢弃其数据。
+
+        Args:
+            pid (int): 进程 PID。
+        """
+        self._handles.pop(pid, None)
+        self._buffers.pop(pid, None)
+        self._exceeded.pop(pid, None)
+
+    def sample(self, pid):
+        """采样一个进程并写入环形缓冲区。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            dict: 本次采样的 {指标名: 值}，进程不存在时返回 None。
+        """
+        handle = self._handles.get(pid)
+        if handle is None:
+            return None
+        values = dict.fromkeys(METRIC_LABELS)
+        try:
+            with handle.oneshot():
+                values['cpu_percent'] = handle.cpu_percent(None)
+                values['memory_rss'] = handle.memory_info().rss
+                values['num_threads'] = handle.num_threads()
+                # 部分平台（如 macOS）不提供 IO 计数
+                if hasattr(handle, 'io_counters'):
+                    io_counters = handle.io_counters()
+                    values['io_read_bytes'] = io_counters.read_bytes
+                    values['io_write_bytes'] = io_counters.write_bytes
+        except psutil.NoSuchProcess:
+            return None
+        except psutil.AccessDenied:
+            LOGGER.debug(f"无权限读取进程 PID {pid} 的部分资源信息")
+        buffers = self._buffers[pid]
+        for metric, value in values.items():
+            buffers[metric].append(value)
+        return values
+
+    def sample_all(self):
+        """采样所有进程并检查阈值。
+
+        Returns:
+            list: 阈值状态变化事件 (pid, 事件类型, 指标名, 当前值, 阈值)，
+                事件类型为 'exceeded' 或 'recovered'。
+        """
+        events = []
+        for pid in list(self._handles):
+            if self.sample(pid) is not None:
+                events.extend(self.check_thresholds(pid))
+        return events
+
+    def check_thresholds(self, pid):
+        """检查进程最近的采样是否越过阈值。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            list: 阈值状态变化事件，格式同 sample_all()。
+        """
+        events = []
+        exceeded = self._exceeded[pid]
+        for metric, threshold in self.thresholds.items():
+            buffer = self._buffers[pid][metric]
+            current = buffer.last()
+            if current is None or math.isnan(current):
+                continue
+            if metric in exceeded:
+                if current < threshold:
+                    exceeded.discard(metric)
+                    events.append((pid, 'recovered', metric, current, threshold))
+                continue
+            recent = buffer.latest(self.threshold_samples)
+            if (len(recent) == self.threshold_samples and
+                    all(value >= threshold for value in recent)):
+                exceeded.add(metric)
+                events.append((pid, 'exceeded', metric, current, threshold))
+        return events
+
+    def history(self, pid, metric):
+        """获取进程某个指标的历史采样。
+
+        Args:
+            pid (int): 进程 PID。
+            metric (str): 指标名。
+
+        Returns:
+            list: 按时间顺序排列的采样值，进程未被采样时返回空列表。
+        """
+        buffers = self._buffers.get(pid)
+        return buffers[metric].latest() if buffers else []
+
+    def summary(self, pid):
+        """汇总进程的资源使用情况。
+
+        Args:
+            pid (int): 进程 PID。
+
+        Returns:
+            str: 汇总文本，进程未被采样或没有采样数据时返回空字符串。
+        """
+        buffers = self._buffers.get(pid)
+        if not buffers or not len(buffers['cpu_percent']):
+            return ''
+        return (
+            f"CPU 平均 {format_metric_value('cpu_percent', buffers['cpu_percent'].mean())}，"
+            f"峰值 {format_metric_value('cpu_percent', buffers['cpu_percent'].max())}；"
+            f"内存峰值 {format_metric_value('memory_rss', buffers['memory_rss'].max())}；"
+            f"线程数峰值 {format_metric_value('num_threads', buffers['num_threads'].max())}；"
+            f"累计读取 {format_metric_value('io_read_bytes', buffers['io_read_bytes'].last())}，"
+            f"累计写入 {format_metric_value('io_write_bytes', buffers['io_write_bytes'].last())}"
+        )
+
+    def __len__(self):
+        return len(self._handles)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import time
+import socket
+import logging
+from string import Formatter
+
+from modules.utils import parse_time_string
+
+LOGGER = logging.getLogger(__name__)
+
+# 所有通知模板可使用的变量
+TEMPLATE_PLACEHOLDERS = frozenset({
+    'host_name',
+    'current_time',
+    'short_current_time',
+    'process_name',
+    'process_pid',
+    'process_run_time',
+    'process_wait_time',
+    'process_exit_code',
+    'other_running_processes',
+    'process_list',
+    'external_program_name',
+    'external_program_path',
+    'external_program_exit_code',
+    'escalation_level',
+    'escalation_threshold',
+    'resource_name',
+    'resource_value',
+    'resource_threshold',
+    'restart_count',
+    'restart_delay',
+})
+# 主机与时间字段，发送任何通知时都会填充
+HOST_PLACEHOLDERS = frozenset({'host_name', 'current_time', 'short_current_time'})
+# 发送各通知时提供的变量，模板只能使用其中的变量与主机字段
+TEMPLATE_VARIABLES = {
+    'process_end_notification': frozenset({
+        'process_name', 'process_pid', 'process_run_time', 'process_exit_code',
+        'other_running_processes', 'process_list',
+    }),
+    'process_timeout_warning': frozenset({
+        'process_name', 'process_pid', 'process_run_time',
+        'other_running_processes', 'process_list',
+    }),
+    'process_timeout_escalation': frozenset({
+        'process_name', 'process_pid', 'process_run_time',
+        'escalation_level', 'escalation_threshold',
+        'other_running_processes', 'process_list',
+    }),
+    'process_resource_warning': frozenset({
+        'process_name', 'process_pid', 'process_run_time',
+        'resource_name', 'resource_value', 'resource_threshold',
+        'other_running_processes', 'process_list',
+    }),
+    'process_resource_recovered': frozenset({
+        'process_name', 'process_pid', 'process_run_time',
+        'resource_name', 'resource_value', 'resource_threshold',
+        'other_running_processes', 'process_list',
+    }),
+    'process_wait_timeout_warning': frozenset({
+        'process_name', 'process_wait_time', 'other_running_processes', 'process_list',
+    }),
+    'process_restart_notification': frozenset({
+        'process_name', 'process_pid', 'process_run_time', 'process_exit_code',
+        'restart_count', 'restart_delay', 'process_list',
+    }),
+    'process_crash_loop_notification': frozenset({
+        'process_name', 'process_pid', 'process_run_time', 'process_exit_code',
+        'restart_count', 'process_list',
+    }),
+    # 事件没有提供的进程变量由 actions.NOTIFICATION_DEFAULTS 补全
+    'external_program_execution_notification': frozenset({
+        'process_name', 'process_pid', 'process_run_time', 'process_wait_time',
+        'process_exit_code', 'other_running_processes', 'process_list',
+        'external_program_name', 'external_program_path', 'external_program_exit_code',
+    }),
+}
+# 合并摘要模板额外可使用的变量
+DIGEST_PLACEHOLDERS = frozenset({'digest_title', 'digest_count', 'digest_items'})
+# 合并摘要条目额外可使用的变量
+DIGEST_ITEM_PLACEHOLDERS = frozenset({'digest_repeat'})
+
+DIGEST_TEMPLATE_KEY = 'notification_digest'
+
+_FIELD_ROOT_PATTERN = re.compile(r'[.\[]')
+_FORMATTER = Formatter()
+
+# 主机名在运行期间不变，只获取一次
+_HOST_NAME = None
+# 时间字段按秒缓存: (秒, 当前时间, 短时间)
+_TIME_FIELDS = (None, '', '')
+
+
+class TemplateError(ValueError):
+    """通知模板无效。"""
+
+
+def get_placeholders(format_string):
+    """解析格式字符串中使用的变量名。
+
+    Args:
+        format_string (str): 格式字符串。
+
+    Returns:
+        set: 变量名集合，属性与下标访问只保留变量名本身。
+
+    Raises:
+        TemplateError: 格式字符串语法错误或使用了位置参数。
+    """
+    placeholders = set()
+    try:
+        for _, field_name, format_spec, _ in _FORMATTER.parse(format_string):
+            if field_name is None:
+                continue
+            root = _FIELD_ROOT_PATTERN.split(field_name, 1)[0]
+            if not root or root.isdigit():
+                raise TemplateError(f"不支持位置参数 '{{{field_name}}}'")
+            placeholders.add(root)
+            if format_spec:
+                placeholders |= get_placeholders(format_spec)
+    except ValueError as e:
+        if isinstance(e, TemplateError):
+            raise
+        raise TemplateError(f"格式错误: {e}") from e
+    return placeholders
+
+
+class _MissingAsEmpty(dict):
+    """缺少的变量渲染为空字符串，用于摘要条目。"""
+
+    def __missing__(self, key):
+        return ''
+
+
+class CompiledTemplate:
+    """预先校验并解析过的通知模板。"""
+
+    def __init__(self, key, template):
+        """编译模板。
+
+        Args:
+            key (str): 模板键。
+            template (dict): push_templates 中的模板配置。
+
+        Raises:
+            TemplateError: 模板中有未知变量或格式错误。
+        """
+        self.key = key
+        self.enable = bool(template.get('enable', True))
+        self.title = str(template.get('title', '') or '')
+        self.content = str(template.get('content', '') or '')
+        self.item = str(template.get('item', '') or '')
+        try:
+            self.coalesce_window_ms = parse_time_string(str(template.get('coalesce_window', '0s')))
+        except ValueError as e:
+            raise TemplateError(f"模板 {key} 的 coalesce_window 无效: {e}") from e
+
+        # 摘要可合并任意通知，缺少的变量渲染为空字符串，见 render；
+        # 代码不发送的自定义模板键只检查变量名是否存在
+        allowed = TEMPLATE_PLACEHOLDERS
+        if key == DIGEST_TEMPLATE_KEY:
+            allowed = allowed | DIGEST_PLACEHOLDERS
+        elif key in TEMPLATE_VARIABLES:
+            allowed = HOST_PLACEHOLDERS | TEMPLATE_VARIABLES[key]
+        for field, format_string, field_allowed in (
+                ('title', self.title, allowed),
+                ('content', self.content, allowed),
+                ('item', self.item, TEMPLATE_PLACEHOLDERS | DIGEST_ITEM_PLACEHOLDERS)):
+            try:
+                placeholders = get_placeholders(format_string)
+            except TemplateError as e:
+                raise TemplateError(f"模板 {key}.{field} {e}") from e
+            unknown = placeholders - field_allowed - TEMPLATE_PLACEHOLDERS
+            if unknown:
+                raise TemplateError(
+                    f"模板 {key}.{field} 使用了未知变量: "
+                    + ', '.join(f"{{{name}}}" for name in sorted(unknown)))
+            unsupported = placeholders - field_allowed
+            if unsupported:
+                raise TemplateError(
+                    f"模板 {key}.{field} 使用了该通知不提供的变量: "
+                    + ', '.join(f"{{{name}}}" for name in sorted(unsupported)))
+
+    def render(self, values):
+        """渲染标题与内容。
+
+        摘要模板合并的通知可能来自任意模板，缺少的变量渲染为空字符串。
+
+        Args:
+            values (dict): 模板参数，应已包含主机与时间字段。
+
+        Returns:
+            tuple: (标题, 内容)。
+
+        Raises:
+            KeyError: 调用方没有提供模板使用的变量。
+        """
+        if self.key == DIGEST_TEMPLATE_KEY:
+            values = _MissingAsEmpty(values)
+        return self.title.format_map(values), self.content.format_map(values)
+
+    def render_item(self, values):
+        """渲染一条摘要条目，缺少的变量渲染为空字符串。
+
+        Args:
+            values (dict): 模板参数。
+
+        Returns:
+            str: 渲染后的条目。
+        """
+        return self.item.format_map(_MissingAsEmpty(values))
+
+
+def compile_templates(push_templates):
+    """编译并校验全部通知模板。
+
+    Args:
+        push_templates (dict): push_settings.push_templates 配置节。
+
+    Returns:
+        dict: {模板键: CompiledTemplate}。
+
+    Raises:
+        TemplateError: 任一模板无效。
+    """
+    return {
+        key: CompiledTemplate(key, template)
+        for key, template in (push_templates or {}).items()
+        if isinstance(template, dict)
+    }
+
+
+def get_host_fields():
+    """获取主机与时间字段，主机名只获取一次，时间字符串按秒缓存。
+
+    Returns:
+        dict: host_name、current_time 与 short_current_time。
+    """
+    global _HOST_NAME, _TIME_FIELDS
+    if _HOST_NAME is None:
+        _HOST_NAME = socket.gethostname()
+    second = int(time.time())
+    if _TIME_FIELDS[0] != second:
+        local_time = time.localtime(second)
+        _TIME_FIELDS = (
+            second,
+            time.strftime('%Y/%m/%d %H:%M:%S', local_time),
+            time.strftime('%H:%M:%S', local_time),
+        )
+    return {
+        'host_name': _HOST_NAME,
+        'current_time': _TIME_FIELDS[1],
+        'short_current_time': _TIME_FIELDS[2],
+    }
@@ -45,17 +45,16 @@ def format_time_ms(milliseconds):
     return formatted_time
 
 
-def run_external_program(program_path):
-    """运行外部程序。
+def get_program_working_directory(program_path):
+    """获取运行外部程序时使用的工作目录。
 
     Args:
         program_path (str): 外部程序的路径。
+
+    Returns:
+        str: 程序所在目录的绝对路径；路径为目录时返回该目录，无法确定时返回当前工作目录。
     """
-    LOGGER.info(f"正在调用外部程序: {program_path}")
-    
-    # 获取程序所在目录
     try:
-        # program_dir = os.path.dirname(program_path) if os.path.dirname(program_path) else os.getcwd()
         # 检查路径是否存在
         if os.path.exists(program_path):
             # 如果是文件，获取其所在目录
@@ -67,18 +66,29 @@ def run_external_program(program_path):
         else:
             # 路径不存在，尝试从路径字符串中提取目录
             dir_name = os.path.dirname(program_path)
-        
+
         # 如果目录为空，使用当前工作目录
         if not dir_name:
             dir_name = os.getcwd()
-        
+
         # 返回绝对路径
-        program_dir = os.path.abspath(dir_name)
+        return os.path.abspath(dir_name)
     except Exception as e:
         # 处理异常情况，返回当前工作目录
         LOGGER.error(f"路径处理错误: {str(e)}")
-        program_dir = os.getcwd()
-    
+        return os.getcwd()
+
+
+def run_external_program(program_path):
+    """同步启动外部程序，不等待其结束。
+
+    监视循环中使用 modules.runner 中的异步运行器，该函数保留给同步调用方。
+
+    Args:
+        program_path (str): 外部程序的路径。
+    """
+    LOGGER.info(f"正在调用外部程序: {program_path}")
+    program_dir = get_program_working_directory(program_path)
     LOGGER.debug(f"使用工作目录: {program_dir}")
     
     try:
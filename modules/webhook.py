@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import re
+import ssl
+import json
+import time
+import asyncio
+import logging
+from urllib.parse import urlsplit
+
+from modules.utils import parse_time_string
+
+LOGGER = logging.getLogger(__name__)
+
+# 默认的 Webhook 请求体（JSON），字符串值中的 {title} 与 {content} 会被替换为通知标题与内容
+DEFAULT_WEBHOOK_BODY = '{"title": "{title}", "content": "{content}"}'
+# 请求体中只替换这两个占位符，其余花括号原样保留
+_BODY_PLACEHOLDER_PATTERN = re.compile(r'\{(title|content)\}')
+
+
+class WebhookError(Exception):
+    """Webhook 请求失败或返回了错误状态码。"""
+
+
+class _Connection:
+    """连接池中的一条 HTTP 连接。"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.reused = False
+
+    def is_usable(self, idle_timeout):
+        """判断空闲连接能否继续使用。
+
+        Args:
+            idle_timeout (float): 空闲连接的最长保留时间，单位为秒。
+
+        Returns:
+            bool: 连接未关闭且未超过空闲时间时返回 True。
+        """
+        return (
+            not self.writer.is_closing()
+            and not self.reader.at_eof()
+            and time.monotonic() - self.last_used < idle_timeout
+        )
+
+    def close(self):
+        self.writer.close()
+
+
+class WebhookClient:
+    """基于 asyncio streams 的 HTTP/1.1 客户端，按主机保持长连接。
+
+    每个主机最多同时保持 max_connections 条连接，请求完成后连接放回连接池，
+    后续请求复用已建立的 TCP 与 TLS 连接。服务端关闭了空闲连接时自动重连一次。
+    """
+
+    def __init__(self, max_connections=4, idle_timeout=60):
+        """初始化客户端。
+
+        Args:
+            max_connections (int): 每个主机的最大连接数。
+            idle_timeout (float): 空闲连接的最长保留时间，单位为秒。
+        """
+        self.max_connections = max(int(max_connections), 1)
+        self.idle_timeout = idle_timeout
+        # 空闲连接: {(scheme, host, port): [_Connection]}
+        self._idle = {}
+        self._semaphores = {}
+        self._ssl_context = None
+        self.connections_opened = 0
+
+    @staticmethod
+    def _split_url(url):
+        """解析 URL。
+
+        Returns:
+            tuple: ((scheme, host, port), netloc, 请求路径)。
+
+        Raises:
+            WebhookError: URL 无效。
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise WebhookError(f"无效的 Webhook 地址: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return (parts.scheme, parts.hostname, port), parts.netloc, path
+
+    def _get_semaphore(self, pool_key):
+        semaphore = self._semaphores.get(pool_key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections)
+            self._semaphores[pool_key] = semaphore
+        return semaphore
+
+    async def _open(self, pool_key):
+        """建立一条新连接。"""
+        scheme, host, port = pool_key
+        ssl_context = None
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context)
+        self.connections_opened += 1
+        LOGGER.debug(f"已建立 Webhook 连接: {scheme}://{host}:{port}")
+        return _Connection(reader, writer)
+
+    def _acquire_idle(self, pool_key):
+        """从连接池中取出一条可用的空闲连接。"""
+        idle = self._idle.get(pool_key)
+        while idle:
+            connection = idle.pop()
+            if connection.is_usable(self.idle_timeout):
+                connection.reused = True
+                return connection
+            connection.close()
+        return None
+
+    def _release(self, pool_key, connection):
+        """把连接放回连接池。"""
+        connection.last_used = time.monotonic()
+        self._idle.setdefault(pool_key, []).append(connection)
+
+    async def warm(self, url, count=1):
+        """预先建立连接，使首条通知不必等待 TCP 与 TLS 握手。
+
+        Args:
+            url (str): 目标地址。
+            count (int): 预先建立的连接数，不超过 max_connections。
+        """
+        pool_key, _, _ = self._split_url(url)
+        idle = self._idle.setdefault(pool_key, [])
+        while len(idle) < min(count, self.max_connections):
+            idle.append(await self._open(pool_key))
+
+    async def request(self, method, url, body=b'', headers=None, timeout=10):
+        """发送一个 HTTP 请求。
+
+        Args:
+            method (str): 请求方法。
+            url (str): 请求地址。
+            body (bytes): 请求体。
+            headers (dict, optional): 额外的请求头。
+            timeout (float): 整个请求的超时时间，单位为秒。
+
+        Returns:
+            tuple: (状态码, 响应体)。
+
+        Raises:
+            WebhookError: URL 无效或响应格式错误。
+            asyncio.TimeoutError: 请求超时。
+            OSError: 网络错误。
+        """
+        pool_key, netloc, path = self._split_url(url)
+        request_head = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {netloc}",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive",
+        ]
+        request_head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ('\r\n'.join(request_head) + '\r\n\r\n').encode('latin-1') + body
+
+        async with self._get_semaphore(pool_key):
+            return await asyncio.wait_for(self._send(pool_key, payload), timeout)
+
+    async def _send(self, pool_key, payload):
+        """在连接池的连接上发送请求，复用的连接已被服务端关闭时重连一次。"""
+        while True:
+            connection = self._acquire_idle(pool_key) or await self._open(pool_key)
+            try:
+                connection.writer.write(payload)
+                await connection.writer.drain()
+                status, response_body, keep_alive = await self._read_response(connection.reader)
+            except (OSError, asyncio.IncompleteReadError, WebhookError) as e:
+                connection.close()
+                if connection.reused:
+                    LOGGER.debug(f"复用的 Webhook 连接已失效，重新连接: {e}")
+                    continue
+                raise
+            except BaseException:
+                # 超时或被取消时连接状态未知，不能放回连接池
+                connection.close()
+                raise
+            if keep_alive:
+                self._release(pool_key, connection)
+            else:
+                connection.close()
+            return status, response_body
+
+    @staticmethod
+    async def _read_response(reader):
+        """读取 HTTP 响应。
+
+        Returns:
+            tuple: (状态码, 响应体, 连接能否复用)。
+
+        Raises:
+            WebhookError: 响应格式错误。
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise WebhookError("服务端关闭了连接")
+        try:
+            version, status = status_line.decode('latin-1').split(None, 2)[:2]
+            status = int(status)
+        except ValueError as e:
+            raise WebhookError(f"无效的响应状态行: {status_line!r}") from e
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0], 16)
+                if size == 0:
+                    # 跳过结尾的 trailer
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            response_body = b''.join(chunks)
+        elif 'content-length' in headers:
+            response_body = await reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304) or 100 <= status < 200:
+            response_body = b''
+        else:
+            response_body = await reader.read()
+            keep_alive = False
+        return status, response_body, keep_alive
+
+    async def close(self):
+        """关闭连接池中的全部连接。"""
+        idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+                try:
+                    await connection.writer.wait_closed()
+                except (OSError, ssl.SSLError):
+                    pass
+
+
+def parse_webhook_headers(headers):
+    """解析 Webhook 请求头配置。
+
+    Args:
+        headers (list | dict): "名称: 值" 格式的字符串列表，或请求头字典。
+
+    Returns:
+        dict: 请求头字典。
+
+    Raises:
+        ValueError: 请求头格式错误。
+    """
+    if isinstance(headers, dict):
+        return {str(name): str(value) for name, value in headers.items()}
+    parsed = {}
+    for header in headers or []:
+        name, separator, value = str(header).partition(':')
+        if not separator or not name.strip():
+            raise ValueError(f"无效的 Webhook 请求头: {header}")
+        parsed[name.strip()] = value.strip()
+    return parsed
+
+
+def render_webhook_body(body_template, title, content):
+    """用通知标题与内容渲染 Webhook 请求体模板。
+
+    字符串中只有 {title} 与 {content} 被替换，其他花括号原样保留，
+    请求体中可以包含任意 JSON 文本；替换进来的标题与内容不会再次被替换。
+
+    Args:
+        body_template (object): 请求体模板，字典、列表中的字符串会被递归渲染。
+        title (str): 通知标题。
+        content (str): 通知内容。
+
+    Returns:
+        object: 渲染后的请求体。
+    """
+    if isinstance(body_template, str):
+        values = {'title': title, 'content': content}
+        return _BODY_PLACEHOLDER_PATTERN.sub(lambda match: values[match.group(1)], body_template)
+    if isinstance(body_template, dict):
+        return {
+            key: render_webhook_body(value, title, content)
+            for key, value in body_template.items()
+        }
+    if isinstance(body_template, list):
+        return [render_webhook_body(value, title, content) for value in body_template]
+    return body_template
+
+
+class WebhookChannel:
+    """通用 Webhook 推送通道，把通知渲染为 JSON 请求体发送到配置的地址。"""
+
+    def __init__(self, channel_settings, client=None):
+        """初始化推送通道。
+
+        Args:
+            channel_settings (dict): 推送通道设置。
+            client (WebhookClient, optional): HTTP 客户端，默认为 None，此时创建独立的客户端。
+        """
+        self.url = channel_settings.get('webhook_url', '')
+        self.method = str(channel_settings.get('webhook_method', 'POST')).upper()
+        self.headers = {'Content-Type': 'application/json; charset=utf-8'}
+        # 请求体可以是 JSON 文本，附加通道中也可以直接写成映射
+        body_template = channel_settings.get('webhook_body') or DEFAULT_WEBHOOK_BODY
+        try:
+            self.headers.update(parse_webhook_headers(channel_settings.get('webhook_headers')))
+            if isinstance(body_template, str):
+                body_template = json.loads(body_template)
+        except ValueError as e:
+            LOGGER.error(f"Webhook 通道配置无效: {e}")
+            self.url = ''
+        self.body_template = body_template
+        self.timeout = parse_time_string(str(channel_settings.get('webhook_timeout', '10s'))) / 1000
+        self.client = client or WebhookClient(channel_settings.get('webhook_max_connections', 4))
+
+    async def warm(self):
+        """预先建立到 Webhook 地址的连接。"""
+        if not self.url:
+            return
+        try:
+            await asyncio.wait_for(self.client.warm(self.url), self.timeout)
+        except (OSError, asyncio.TimeoutError, WebhookError) as e:
+            LOGGER.warning(f"Webhook 连接预热失败: {e}")
+
+    async def push(self, title, content):
+        """发送一条通知。
+
+        Returns:
+            bool: Webhook 地址未配置时返回 False，无需重试。
+
+        Raises:
+            WebhookError: 服务端返回错误状态码。
+            asyncio.TimeoutError: 请求超时。
+            OSError: 网络错误。
+        """
+        if not self.url:
+            LOGGER.error("Webhook 地址未配置或配置无效，无法发送通知")
+            return False
+        body = json.dumps(
+            render_webhook_body(self.body_template, title, content),
+            ensure_ascii=False).encode('utf-8')
+        status, response_body = await self.client.request(
+            self.method, self.url, body, self.headers, self.timeout)
+        if status >= 400:
+            raise WebhookError(
+                f"Webhook 返回状态码 {status}: {response_body[:200].decode('utf-8', 'replace')}")
+        LOGGER.info(f"通知发送成功: {title}")
+        return True
+
+    async def close(self):
+        """关闭连接池。"""
+        await self.client.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地推送桩服务器
+
+模拟 Webhook 推送服务，用于离线测试与性能对比：
+- 支持 HTTP/1.1 长连接，记录收到的请求与建立的连接数
+- 可配置响应延迟与失败率，模拟缓慢或不稳定的推送服务
+
+用法: python stub_push_server.py [--port 8080] [--delay 0] [--fail-rate 0]
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubPushServer:
+    """在后台线程中运行的推送桩服务器。"""
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0, fail_rate=0, fail_status=500):
+        """初始化服务器。
+
+        Args:
+            host (str): 监听地址。
+            port (int): 监听端口，0 表示随机端口。
+            delay (float): 每个请求的响应延迟，单位为秒。
+            fail_rate (float): 返回错误状态码的概率，取值 0 到 1。
+            fail_status (int): 失败时返回的状态码。
+        """
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        """服务器地址。"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/push"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 响应头与响应体分两次写出，关闭 Nagle 算法避免长连接上的延迟确认等待
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                try:
+                    payload = json.loads(body or b'null')
+                except ValueError:
+                    payload = None
+                with stub._lock:
+                    stub.requests.append({
+                        'path': self.path,
+                        'headers': dict(self.headers),
+                        'body': payload,
+                        'received': time.time(),
+                    })
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status = stub.fail_status if random.random() < stub.fail_rate else 200
+                response = json.dumps({'code': 0 if status == 200 else status}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response)))
+                self.end_headers()
+                self.wfile.write(response)
+
+            do_PUT = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """在后台线程中启动服务器。
+
+        Returns:
+            StubPushServer: 服务器自身，便于链式调用。
+        """
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+            name='stub-push-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务器。"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地推送桩服务器')
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址")
+    parser.add_argument('--port', type=int, default=8080, help="监听端口")
+    parser.add_argument('--delay', type=float, default=0, help="响应延迟（秒）")
+    parser.add_argument('--fail-rate', type=float, default=0, help="返回错误状态码的概率")
+    args = parser.parse_args()
+
+    server = StubPushServer(args.host, args.port, args.delay, args.fail_rate)
+    print(f"推送桩服务器已启动: {server.url}，按 Ctrl+C 停止")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+        print(f"共收到 {len(server.requests)} 个请求，建立 {server.connections} 个连接")
+
+
+if __name__ == '__main__':
+    main()
@@ -19,7 +19,7 @@ from modules.utils import (
     get_other_running_processes,
     parse_time_string
 )
-from modules.config import load_config, merge_configs, get_default_config
+from modules.config import load_config, merge_configs, get_default_config, migrate_old_config
 
 
 class TestUtils(unittest.TestCase):
@@ -104,6 +104,18 @@ class TestConfig(unittest.TestCase):
         merged_config = merge_configs(user_config, default_config)
         self.assertEqual(merged_config['monitor_settings']['process_name'], 'custom.exe')
 
+    def test_migrate_process_name_list(self):
+        """测试旧版本进程列表完整迁移为多个监视目标"""
+        migrated = migrate_old_config({
+            'monitor_settings': {'process_name_list': ['a.exe', 'b.exe']}
+        })
+        self.assertEqual(migrated['monitor_settings']['process_name'], ['a.exe', 'b.exe'])
+
+        migrated = migrate_old_config({
+            'monitor_settings': {'process_name_list': ['a.exe']}
+        })
+        self.assertEqual(migrated['monitor_settings']['process_name'], 'a.exe')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
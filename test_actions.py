@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 外部程序动作流水线单元测试
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.actions import Action, ActionPipeline, build_action_pipeline, parse_action
+from modules.config import get_default_config
+from modules.runner import ExternalProgramRunner
+from modules.supervisor import supervise
+from test_runner import python_program
+
+
+class TestParseActions(unittest.TestCase):
+    """测试动作配置解析"""
+
+    def test_parse_action(self):
+        """测试解析事件、运行方式与超时"""
+        action = parse_action({
+            'event': 'end', 'path': sys.executable, 'mode': 'sequential', 'timeout': '30s'})
+        self.assertEqual(action.event, 'end')
+        self.assertEqual(action.mode, 'sequential')
+        self.assertEqual(action.timeout, 30)
+        action = parse_action({'event': 'start', 'path': sys.executable})
+        self.assertEqual(action.mode, 'parallel')
+        self.assertIsNone(action.timeout)
+
+    def test_invalid_actions(self):
+        """测试无效的事件、运行方式、路径"""
+        for entry in (
+                'end',
+                {'event': 'exit', 'path': sys.executable},
+                {'event': 'end', 'path': sys.executable, 'mode': 'background'},
+                {'event': 'end'},
+                {'event': 'end', 'path': '/nonexistent/program'}):
+            with self.assertRaises(ValueError):
+                parse_action(entry)
+
+    def test_legacy_paths_come_first(self):
+        """测试旧的程序路径转换为对应事件的第一个动作，无效的动作被跳过"""
+        settings = {
+            'external_program_path': sys.executable,
+            'another_external_program_path': '',
+            'external_program_on_wait_timeout_path': '',
+            'actions': [
+                {'event': 'end', 'path': sys.executable, 'mode': 'sequential'},
+                {'event': 'unknown', 'path': sys.executable},
+            ],
+        }
+        with self.assertLogs('modules.actions', level='ERROR'):
+            pipeline = build_action_pipeline(settings)
+        self.assertEqual([action.mode for action in pipeline.actions['end']],
+                         ['parallel', 'sequential'])
+        self.assertFalse(pipeline.has('threshold'))
+
+
+class TestActionPipeline(unittest.TestCase):
+    """测试动作的运行顺序与执行通知"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def record_program(self, name, duration):
+        """生成记录开始与结束时间的外部程序。"""
+        path = os.path.join(self.temp_dir.name, name)
+        return python_program(
+            f"import time; start = time.time(); time.sleep({duration}); "
+            f"open({path!r}, 'w').write(f'{{start}} {{time.time()}}')")
+
+    def read_interval(self, name):
+        with open(os.path.join(self.temp_dir.name, name)) as f:
+            return tuple(map(float, f.read().split()))
+
+    def test_parallel_and_sequential(self):
+        """测试 sequential 动作结束后才启动下一个动作，parallel 动作同时运行"""
+        pipeline = ActionPipeline([
+            Action('end', self.record_program('a', 0.3), 'parallel'),
+            Action('end', self.record_program('b', 0.3), 'sequential'),
+            Action('end', self.record_program('c', 0.1), 'parallel'),
+        ])
+        notifications = []
+
+        async def notify(template_key, **kwargs):
+            notifications.append((template_key, kwargs))
+
+        async def run():
+            runner = ExternalProgramRunner(max_concurrency=4)
+            return await pipeline.run('end', runner, notify, process_name='app', process_pid=1)
+
+        with self.assertLogs('modules', level='INFO'):
+            exit_codes = asyncio.run(run())
+        self.assertEqual(exit_codes, [0, 0, 0])
+        a, b, c = (self.read_interval(name) for name in 'abc')
+        # a 与 b 同时运行，c 在 b 结束后才开始
+        self.assertLess(b[0], a[1])
+        self.assertGreaterEqual(c[0], b[1])
+        self.assertEqual(len(notifications), 3)
+        template_key, values = notifications[0]
+        self.assertEqual(template_key, 'external_program_execution_notification')
+        self.assertEqual(values['external_program_exit_code'], 0)
+        self.assertEqual(values['process_name'], 'app')
+        self.assertEqual(values['process_run_time'], '')
+
+    def test_trigger_is_awaited_on_close(self):
+        """测试后台运行的动作在关闭运行器时等待结束"""
+        pipeline = ActionPipeline([Action('start', self.record_program('a', 0.2))])
+
+        async def run():
+            runner = ExternalProgramRunner()
+            self.assertIsNone(pipeline.trigger('end', runner))
+            task = pipeline.trigger('start', runner)
+            self.assertFalse(task.done())
+            await runner.close()
+            return task.result()
+
+        with self.assertLogs('modules', level='INFO'):
+            self.assertEqual(asyncio.run(run()), [0])
+
+
+class TestMonitorActions(unittest.TestCase):
+    """测试监视循环中的动作"""
+
+    def setUp(self):
+        self.config = get_default_config()
+        push_settings = self.config['push_settings']
+        push_settings['push_outbox']['enable'] = False
+        push_settings['push_rate_limit'].update({
+            'channel_burst': 0, 'template_burst': 0, 'dedup_window': '0s',
+        })
+        push_settings['push_templates']['external_program_execution_notification']['enable'] = True
+        self.config['monitor_settings']['timeout_warning_interval'] = '100'
+        self.config['external_program_settings'].update({
+            'external_program_path': '',
+            'another_external_program_path': '',
+            'external_program_on_wait_timeout_path': '',
+            'timeout_count_threshold': 2,
+        })
+        self.pushed = []
+
+    def run_supervise(self, command):
+        def record_push(channel_settings, title, content):
+            self.pushed.append((title, content))
+            return True
+
+        with patch('modules.channels.push_message', side_effect=record_push):
+            return asyncio.run(supervise(self.config, command))
+
+    def test_event_actions_send_notifications(self):
+        """测试启动、警告、结束事件的动作运行并发送执行通知"""
+        self.config['external_program_settings']['actions'] = [
+            {'event': event, 'path': sys.executable} for event in ('start', 'warning', 'end')]
+        with self.assertLogs('modules', level='INFO'):
+            self.run_supervise([sys.executable, '-c', 'import time; time.sleep(0.25)'])
+        titles = [title for title, _ in self.pushed]
+        warnings = titles.count('进程超时运行警告')
+        self.assertGreaterEqual(warnings, 1)
+        self.assertEqual(titles.count('外部程序执行通知'), warnings + 2)
+        self.assertTrue(all('退出码: 0' in content for title, content in self.pushed
+                            if title == '外部程序执行通知'))
+
+    def test_threshold_without_exit(self):
+        """测试默认配置达到阈值后继续监视"""
+        self.config['external_program_settings']['actions'] = [
+            {'event': 'threshold', 'path': sys.executable}]
+        started = time.perf_counter()
+        with self.assertLogs('modules', level='INFO'):
+            exit_code = self.run_supervise([sys.executable, '-c', 'import time; time.sleep(0.35)'])
+        self.assertEqual(exit_code, 0)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.35)
+        titles = [title for title, _ in self.pushed]
+        warnings = titles.count('进程超时运行警告')
+        self.assertGreaterEqual(warnings, 2)
+        self.assertEqual(titles.count('外部程序执行通知'), warnings // 2)
+        self.assertIn('进程结束通报', titles)
+
+    @unittest.skipIf(sys.platform == 'win32', "需要 POSIX 脚本")
+    def test_threshold_action_does_not_block_monitor(self):
+        """测试达到阈值后动作在后台运行，监视先结束，退出前等待动作执行完成"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        marker = os.path.join(temp_dir.name, 'done')
+        script = os.path.join(temp_dir.name, 'threshold.py')
+        with open(script, 'w') as f:
+            f.write(f"#!{sys.executable}\n"
+                    f"import time; time.sleep(0.5); open({marker!r}, 'w').close()\n")
+        os.chmod(script, 0o755)
+        self.config['external_program_settings'].update({
+            'exit_on_threshold': True,
+            'actions': [{'event': 'threshold', 'path': script}],
+        })
+        with self.assertLogs('modules', level='INFO') as logs, self.assertRaises(SystemExit):
+            self.run_supervise([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.assertTrue(os.path.exists(marker))
+        stopped = next(index for index, line in enumerate(logs.output) if '正在结束子进程' in line)
+        finished = next(index for index, line in enumerate(logs.output) if '执行成功' in line)
+        self.assertLess(stopped, finished)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 日志队列单元测试
+"""
+
+import os
+import sys
+import queue
+import logging
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.logger import (
+    PROFILE_CONTEXT,
+    BoundedQueueHandler,
+    move_log_file,
+    setup_default_logging,
+    setup_logging,
+    start_log_queue,
+    stop_log_queue,
+)
+
+
+class RecordingHandler(logging.Handler):
+    """记录收到的消息，可暂停以模拟缓慢的磁盘。"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+        self.released = threading.Event()
+        self.released.set()
+
+    def emit(self, record):
+        self.released.wait(5)
+        self.threads.add(threading.current_thread().name)
+        self.messages.append(record.getMessage())
+
+
+def make_record(message):
+    return logging.LogRecord('test', logging.INFO, __file__, 0, message, None, None)
+
+
+class TestBoundedQueueHandler(unittest.TestCase):
+    """测试队列已满时的溢出策略"""
+
+    def fill(self, policy):
+        log_queue = queue.Queue(2)
+        handler = BoundedQueueHandler(log_queue, policy)
+        for index in range(4):
+            handler.handle(make_record(f"m{index}"))
+        messages = []
+        while not log_queue.empty():
+            messages.append(log_queue.get_nowait().getMessage())
+        return handler, messages
+
+    def test_drop_new(self):
+        """测试丢弃新记录，队列恢复后写入丢弃条数"""
+        handler, messages = self.fill('drop_new')
+        self.assertEqual(messages, ['m0', 'm1'])
+        self.assertEqual(handler.dropped, 2)
+        handler.handle(make_record('m4'))
+        self.assertEqual(handler.queue.get_nowait().getMessage(), 'm4')
+        self.assertIn('丢弃了 2 条日志', handler.queue.get_nowait().getMessage())
+
+    def test_drop_oldest(self):
+        """测试丢弃最旧的记录"""
+        handler, messages = self.fill('drop_oldest')
+        self.assertEqual(messages, ['m2', 'm3'])
+        self.assertEqual(handler.dropped, 2)
+        handler.handle(make_record('m4'))
+        self.assertEqual(handler.queue.get_nowait().getMessage(), 'm4')
+        self.assertIn('丢弃了 2 条日志', handler.queue.get_nowait().getMessage())
+
+
+class TestLogQueue(unittest.TestCase):
+    """测试后台线程写日志"""
+
+    def setUp(self):
+        self.root_logger = logging.getLogger()
+        self.original_level = self.root_logger.level
+        self.root_logger.setLevel(logging.INFO)
+        self.handler = RecordingHandler()
+        self.addCleanup(self.cleanup)
+
+    def cleanup(self):
+        stop_log_queue()
+        self.root_logger.removeHandler(self.handler)
+        self.root_logger.setLevel(self.original_level)
+
+    def test_slow_handler_does_not_block_and_is_drained(self):
+        """测试处理器阻塞时记录日志不等待，停止时写完全部日志"""
+        start_log_queue([self.handler], queue_size=100)
+        self.handler.released.clear()
+        logger = logging.getLogger('test_logger')
+        token = PROFILE_CONTEXT.set('job')
+        try:
+            for index in range(50):
+                logger.info(f"line {index}")
+        finally:
+            PROFILE_CONTEXT.reset(token)
+        self.assertLess(len(self.handler.messages), 50)
+        self.handler.released.set()
+        stop_log_queue()
+        self.assertEqual(len(self.handler.messages), 50)
+        self.assertEqual(self.handler.messages[0], '[job] line 0')
+        self.assertNotIn(threading.current_thread().name, self.handler.threads)
+        # 停止后处理器重新挂到根 logger 上
+        logger.info('after stop')
+        self.assertEqual(self.handler.messages[-1], 'after stop')
+
+
+class TestMoveLogFile(unittest.TestCase):
+    """测试初始化日志的移动"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.source = os.path.join(self.temp_dir.name, 'default.log')
+        self.destination = os.path.join(self.temp_dir.name, 'logs.log')
+
+    def write(self, path, content):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def read(self, path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_rename(self):
+        """测试目标不存在时直接重命名"""
+        self.write(self.source, '初始化日志\n')
+        self.assertTrue(move_log_file(self.source, self.destination))
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(self.read(self.destination), '初始化日志\n')
+
+    def test_copy_when_rename_fails(self):
+        """测试无法重命名时流式复制后删除源文件"""
+        self.write(self.source, 'line\n' * 1000)
+        with patch('modules.logger.os.replace', side_effect=OSError('cross-device link')), \
+                patch('modules.logger.LOG_COPY_BUFFER_SIZE', 64):
+            self.assertTrue(move_log_file(self.source, self.destination))
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(self.read(self.destination), 'line\n' * 1000)
+
+    def test_append_to_existing(self):
+        """测试目标已存在时追加到末尾"""
+        self.write(self.destination, 'a\n')
+        self.write(self.source, 'b\n')
+        self.assertTrue(move_log_file(self.source, self.destination))
+        self.assertEqual(self.read(self.destination), 'a\nb\n')
+
+    def test_empty_file(self):
+        """测试空文件只删除不移动"""
+        self.write(self.source, '')
+        self.assertFalse(move_log_file(self.source, self.destination))
+        self.assertFalse(os.path.exists(self.source))
+        self.assertFalse(os.path.exists(self.destination))
+
+
+class TestBootstrapLogHandOff(unittest.TestCase):
+    """测试初始化日志交给配置的日志文件"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root_logger = logging.getLogger()
+        self.original_handlers = list(self.root_logger.handlers)
+        self.original_level = self.root_logger.level
+        self.addCleanup(self.cleanup)
+        patcher = patch('modules.logger.get_program_directory', return_value=self.temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cleanup(self):
+        stop_log_queue()
+        for handler in list(self.root_logger.handlers):
+            if handler not in self.original_handlers:
+                self.root_logger.removeHandler(handler)
+                handler.close()
+        for handler in self.original_handlers:
+            if handler not in self.root_logger.handlers:
+                self.root_logger.addHandler(handler)
+        self.root_logger.setLevel(self.original_level)
+
+    def test_stale_and_current_logs_moved_to_log_directory(self):
+        """测试上次未合并的日志转储到日志目录，本次的初始化日志成为日志文件的开头"""
+        default_log_file = os.path.join(self.temp_dir.name, 'default.log')
+        with open(default_log_file, 'w', encoding='utf-8') as f:
+            f.write('上次运行的日志\n')
+        setup_default_logging()
+        logging.getLogger('test_logger').info('本次初始化日志')
+        config = {'log_settings': {
+            'enable_log_file': True, 'log_directory': 'logs', 'log_filename': 'job',
+            'max_log_files': 15,
+        }}
+        setup_logging(config)
+        stop_log_queue()
+        self.assertFalse(os.path.exists(default_log_file))
+        self.assertEqual(
+            [name for name in os.listdir(self.temp_dir.name) if name.startswith('default.log')], [])
+        log_dir = os.path.join(self.temp_dir.name, 'logs')
+        names = sorted(os.listdir(log_dir))
+        dumps = [name for name in names if name.startswith('job_dump_')]
+        logs = [name for name in names if not name.startswith('job_dump_')]
+        self.assertEqual(len(dumps), 1)
+        self.assertEqual(len(logs), 1)
+        with open(os.path.join(log_dir, dumps[0]), encoding='utf-8') as f:
+            self.assertEqual(f.read(), '上次运行的日志\n')
+        with open(os.path.join(log_dir, logs[0]), encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('本次初始化日志', content.splitlines()[0])
+        self.assertIn('日志文件处理器已就绪', content)
+
+
+if __name__ == '__main__':
+    unittest.main()
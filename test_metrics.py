@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 事件延迟统计单元测试
+"""
+
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.config import get_default_config
+from modules.metrics import (
+    LATENCY_METRICS,
+    LatencyHistogram,
+    LatencyMetrics,
+    get_latency_metrics,
+)
+from modules.notification import send_notification, close_notifications
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """测试延迟直方图"""
+
+    def test_percentiles(self):
+        """测试分位数取所在桶的上界，且不超过最大值"""
+        histogram = LatencyHistogram()
+        for _ in range(98):
+            histogram.record(0.003)
+        histogram.record(0.5)
+        histogram.record(2.0)
+        stats = histogram.snapshot()
+        self.assertEqual(stats['count'], 100)
+        self.assertEqual(stats['p50'], 0.004)
+        self.assertEqual(stats['p99'], 0.512)
+        self.assertEqual(stats['max'], 2.0)
+        self.assertAlmostEqual(stats['mean'], (98 * 0.003 + 2.5) / 100)
+
+    def test_overflow_and_empty(self):
+        """测试超出最大桶与没有记录时的统计"""
+        histogram = LatencyHistogram(bounds=(0.1, 1))
+        self.assertEqual(histogram.snapshot()['p99'], 0.0)
+        histogram.record(-1)
+        histogram.record(30)
+        self.assertEqual(histogram.counts, [1, 0, 1])
+        self.assertEqual(histogram.percentile(99), 30)
+
+    def test_summary(self):
+        """测试只输出有记录的阶段"""
+        metrics = LatencyMetrics()
+        self.assertEqual(metrics.format_summary(), '')
+        metrics.record('send', 0.02)
+        summary = metrics.format_summary()
+        self.assertIn('单次发送 n=1', summary)
+        self.assertNotIn('端到端', summary)
+
+
+class TestPipelineLatency(unittest.TestCase):
+    """测试通知流水线记录各阶段延迟"""
+
+    def setUp(self):
+        LATENCY_METRICS.reset()
+        self.config = get_default_config()
+        self.config['push_settings']['push_outbox']['enable'] = False
+        self.config['push_settings']['push_error_retry']['retry_interval'] = '10'
+
+    def tearDown(self):
+        LATENCY_METRICS.reset()
+
+    def test_stages_recorded(self):
+        """测试渲染、排队、发送、重试与端到端延迟"""
+        attempts = []
+
+        def flaky_push(channel_settings, title, content):
+            attempts.append(title)
+            if len(attempts) < 2:
+                raise ConnectionError('boom')
+            return True
+
+        async def run():
+            await send_notification(
+                self.config, 'process_end_notification',
+                event_time=time.perf_counter() - 1,
+                process_name='a', process_pid=1, process_run_time='00:00:01')
+            await close_notifications()
+
+        with patch('modules.channels.push_message', side_effect=flaky_push):
+            asyncio.run(run())
+        metrics = get_latency_metrics()
+        self.assertEqual(metrics['render']['count'], 1)
+        self.assertEqual(metrics['queue']['count'], 2)
+        self.assertEqual(metrics['send']['count'], 2)
+        self.assertEqual(metrics['retries']['count'], 1)
+        self.assertEqual(metrics['total']['count'], 1)
+        self.assertGreaterEqual(metrics['total']['max'], 1)
+
+    def test_unconfigured_channel_is_not_recorded(self):
+        """测试推送通道未正确配置时不记录发送与端到端延迟，也不重试"""
+        async def run():
+            await send_notification(
+                self.config, 'process_end_notification',
+                process_name='a', process_pid=1, process_run_time='00:00:01')
+            await close_notifications()
+
+        with patch('modules.channels.push_message', return_value=False) as push:
+            asyncio.run(run())
+        metrics = get_latency_metrics()
+        self.assertEqual(push.call_count, 1)
+        self.assertEqual(metrics['queue']['count'], 1)
+        self.assertEqual(metrics['send']['count'], 0)
+        self.assertEqual(metrics['total']['count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 监视模块单元测试
+"""
+
+import os
+import sys
+import time
+import struct
+import shutil
+import tempfile
+import asyncio
+import subprocess
+import unittest
+from unittest.mock import patch, MagicMock
+
+import psutil
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.monitor import (
+    ProcessTable,
+    SharedProcessTable,
+    HandleLivenessChecker,
+    PidfdLivenessChecker,
+    NetlinkSpawnEventSource,
+    ScanSpawnEventSource,
+    PsutilProcessScanner,
+    ProcfsProcessScanner,
+    ProcessNameMatcher,
+    parse_monitor_targets,
+    parse_escalation_thresholds,
+    create_liveness_checker,
+    create_process_scanner,
+    monitor_processes,
+)
+from modules.config import get_default_config
+from modules.scheduler import DeadlineScheduler
+
+
+def make_process(pid, name, create_time):
+    """构造模拟的 psutil.Process 对象。"""
+    process = MagicMock()
+    process.pid = pid
+    process.name.return_value = name
+    process.create_time.return_value = create_time
+    return process
+
+
+class TestProcessTable(unittest.TestCase):
+    """测试增量进程表"""
+
+    def setUp(self):
+        self.processes = {
+            1: make_process(1, 'init', 100.0),
+            2: make_process(2, 'notepad.exe', 200.0),
+        }
+        self.process_factory = MagicMock(
+            side_effect=lambda pid: self.processes[pid])
+
+    def refresh(self, table):
+        with patch('psutil.pids', return_value=list(self.processes)), \
+                patch('psutil.Process', self.process_factory):
+            return table.refresh()
+
+    def test_first_refresh_reports_all_processes(self):
+        """测试首次刷新时所有进程均为新增"""
+        table = ProcessTable()
+        added, removed = self.refresh(table)
+        self.assertEqual(set(added), {1, 2})
+        self.assertEqual(removed, {})
+        self.assertEqual(added[2]['name'], 'notepad.exe')
+        self.assertEqual(len(table), 2)
+
+    def test_only_new_pids_are_read(self):
+        """测试只为新出现的 PID 读取进程属性"""
+        table = ProcessTable()
+        self.refresh(table)
+        self.refresh(table)
+        self.process_factory.reset_mock()
+
+        self.processes[3] = make_process(3, 'worker', 300.0)
+        added, removed = self.refresh(table)
+        self.assertEqual(set(added), {3})
+        self.assertEqual(removed, {})
+        self.process_factory.assert_called_once_with(3)
+
+    def test_reused_pid_is_removed_and_added(self):
+        """测试被监视的 PID 在两次刷新之间被复用时报告原进程结束与新进程启动"""
+        table = ProcessTable()
+        self.refresh(table)
+        table.watch(2)
+
+        self.processes[2] = make_process(2, 'notepad.exe', 250.0)
+        added, removed = self.refresh(table)
+        self.assertEqual(removed[2]['create_time'], 200.0)
+        self.assertEqual(added[2]['create_time'], 250.0)
+        self.assertEqual(table.get(2)['create_time'], 250.0)
+        self.assertEqual(len(table), 2)
+
+    def test_removed_processes_are_reported(self):
+        """测试消失的进程作为差异返回"""
+        table = ProcessTable()
+        self.refresh(table)
+
+        del self.processes[2]
+        added, removed = self.refresh(table)
+        self.assertEqual(added, {})
+        self.assertEqual(removed[2]['create_time'], 200.0)
+        self.assertIsNone(table.get(2))
+
+    def test_recent_process_name_is_rechecked(self):
+        """测试新进程 exec 后名称变化会再次作为新增报告"""
+        table = ProcessTable()
+        self.refresh(table)
+
+        self.processes[3] = make_process(3, 'bash', 300.0)
+        self.refresh(table)
+        self.processes[3].name.return_value = 'notepad.exe'
+        added, _ = self.refresh(table)
+        self.assertEqual(added[3]['name'], 'notepad.exe')
+
+        # 只核对一次，之后不再读取
+        self.processes[3].name.return_value = 'other'
+        added, _ = self.refresh(table)
+        self.assertEqual(added, {})
+
+    def test_periodic_name_recheck(self):
+        """测试全量名称核对能发现已知进程较晚的 exec"""
+        table = ProcessTable(name_recheck_interval=3)
+        self.refresh(table)
+        self.refresh(table)
+        self.processes[1].name.return_value = 'notepad.exe'
+        added, _ = self.refresh(table)
+        self.assertEqual(set(added), {1})
+
+    def test_vanished_process_is_skipped(self):
+        """测试读取属性前已退出的进程不会加入进程表"""
+        self.process_factory.side_effect = psutil.NoSuchProcess(2)
+        table = ProcessTable()
+        added, _ = self.refresh(table)
+        self.assertEqual(added, {})
+
+
+class TestSharedProcessTable(unittest.TestCase):
+    """测试多配置共享的进程表"""
+
+    def setUp(self):
+        self.scanner = MagicMock()
+        self.processes = {1: 'init', 2: 'notepad.exe'}
+        self.scanner.pids.side_effect = lambda: list(self.processes)
+        self.scanner.read.side_effect = lambda pid: {
+            'pid': pid, 'name': self.processes[pid], 'create_time': float(pid)}
+        self.scanner.read_name.side_effect = lambda pid: self.processes.get(pid)
+        self.scanner.read_create_time.side_effect = lambda pid: (
+            float(pid) if pid in self.processes else None)
+
+    def test_views_share_one_scan(self):
+        """测试同一时刻多个视图只扫描一次"""
+        shared = SharedProcessTable(self.scanner, max_age=60)
+        first, second = shared.view(), shared.view()
+        self.assertEqual(set(first.refresh()[0]), {1, 2})
+        self.assertEqual(set(second.refresh()[0]), {1, 2})
+        self.assertEqual(self.scanner.pids.call_count, 1)
+
+    def test_views_accumulate_diffs(self):
+        """测试视图各自累积尚未取走的差异"""
+        shared = SharedProcessTable(self.scanner, max_age=0)
+        first, second = shared.view(), shared.view()
+        first.refresh()
+        second.refresh()
+
+        self.processes[3] = 'worker'
+        first.refresh()
+        del self.processes[2]
+        added, removed = first.refresh()
+        self.assertEqual((set(added), set(removed)), (set(), {2}))
+
+        # 第二个视图一次取走两次刷新的差异
+        added, removed = second.refresh()
+        self.assertEqual((set(added), set(removed)), ({3}, {2}))
+
+    def test_late_view_sees_existing_processes(self):
+        """测试后创建的视图首次刷新时报告已存在的进程"""
+        shared = SharedProcessTable(self.scanner, max_age=60)
+        shared.view().refresh()
+        added, _ = shared.view().refresh()
+        self.assertEqual(set(added), {1, 2})
+
+    def test_scan_checker_detects_reused_pid(self):
+        """测试只为被监视的进程核对创建时间，PID 复用被扫描式检查发现"""
+        shared = SharedProcessTable(self.scanner, max_age=0)
+        view = shared.view()
+        checker = create_liveness_checker('scan', view)
+        view.refresh()
+        checker.add(2, 2.0)
+        self.assertEqual(checker.poll(), [])
+
+        # PID 2 被新进程复用
+        self.scanner.read.side_effect = lambda pid: {
+            'pid': pid, 'name': self.processes[pid], 'create_time': 5.0}
+        self.scanner.read_create_time.side_effect = lambda pid: 5.0
+        self.scanner.read_create_time.reset_mock()
+        self.assertEqual(checker.poll(), [2])
+        self.scanner.read_create_time.assert_called_once_with(2)
+
+        checker.remove(2)
+        self.scanner.read_create_time.reset_mock()
+        view.refresh()
+        self.scanner.read_create_time.assert_not_called()
+
+
+class TestProcfsProcessScanner(unittest.TestCase):
+    """测试直接读取 /proc 的进程扫描器"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, 'stat'), 'w') as f:
+            f.write("cpu  0 0 0 0\nbtime 1700000000\n")
+        self.write_process(10, 'my (odd) name', 250)
+        self.write_process(11, 'averyveryverylo', 500,
+                           cmdline=b'/opt/averyveryverylongname\0--flag\0')
+        os.makedirs(os.path.join(self.root, 'self'))
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def write_process(self, pid, name, start_ticks, cmdline=b''):
+        pid_dir = os.path.join(self.root, str(pid))
+        os.makedirs(pid_dir)
+        fields = ['S'] + ['0'] * 18 + [str(start_ticks)] + ['0'] * 30
+        with open(os.path.join(pid_dir, 'stat'), 'w') as f:
+            f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+        with open(os.path.join(pid_dir, 'cmdline'), 'wb') as f:
+            f.write(cmdline)
+
+    def test_read_synthetic_processes(self):
+        """测试解析名称、创建时间与截断名称补全"""
+        scanner = ProcfsProcessScanner(self.root)
+        self.assertEqual(sorted(scanner.pids()), [10, 11])
+        ticks = os.sysconf('SC_CLK_TCK')
+
+        info = scanner.read(10)
+        self.assertEqual(info['name'], 'my (odd) name')
+        self.assertEqual(info['create_time'], 250 / ticks + 1700000000)
+        self.assertEqual(scanner.read(11)['name'], 'averyveryverylongname')
+        self.assertIsNone(scanner.read(12))
+        self.assertEqual(scanner.read_create_time(10), info['create_time'])
+        self.assertIsNone(scanner.read_create_time(12))
+
+    @unittest.skipUnless(ProcfsProcessScanner.is_supported(), "需要 Linux procfs")
+    def test_matches_psutil(self):
+        """测试与 psutil 扫描器得到相同的进程身份"""
+        pid = os.getpid()
+        self.assertEqual(
+            ProcfsProcessScanner().read(pid), PsutilProcessScanner().read(pid))
+
+    def test_create_process_scanner(self):
+        """测试根据配置选择扫描器"""
+        self.assertIsInstance(create_process_scanner('psutil'), PsutilProcessScanner)
+        if ProcfsProcessScanner.is_supported():
+            self.assertIsInstance(create_process_scanner('auto'), ProcfsProcessScanner)
+
+
+class TestProcessNameMatcher(unittest.TestCase):
+    """测试多目标进程名称匹配"""
+
+    def test_exact_glob_and_regex(self):
+        """测试普通名称、通配符与正则表达式"""
+        matcher = ProcessNameMatcher(['notepad.exe', 'worker-*.exe', r're:job_\d+'])
+        self.assertEqual(matcher.match('notepad.exe'), 'notepad.exe')
+        self.assertEqual(matcher.match('worker-3.exe'), 'worker-*.exe')
+        self.assertEqual(matcher.match('job_42'), r're:job_\d+')
+        self.assertIsNone(matcher.match('job_42.tmp'))
+        self.assertIsNone(matcher.match('explorer.exe'))
+        self.assertIsNone(matcher.match(None))
+
+    def test_exact_name_takes_priority(self):
+        """测试精确名称优先于通配符"""
+        matcher = ProcessNameMatcher(['*.exe', 'notepad.exe'])
+        self.assertEqual(matcher.match('notepad.exe'), 'notepad.exe')
+        self.assertEqual(matcher.match('calc.exe'), '*.exe')
+
+    def test_parse_monitor_targets(self):
+        """测试解析单个名称、列表与带等待时间的目标"""
+        self.assertEqual(
+            parse_monitor_targets('a.exe', 1000),
+            {'a.exe': {'max_wait_time_ms': 1000, 'escalation_thresholds_ms': []}})
+        targets = parse_monitor_targets(
+            ['a.exe', {'name': 'b.exe', 'max_wait_time': '1m'}], 1000)
+        self.assertEqual(targets['a.exe']['max_wait_time_ms'], 1000)
+        self.assertEqual(targets['b.exe']['max_wait_time_ms'], 60000)
+        with self.assertRaises(ValueError):
+            parse_monitor_targets([{'max_wait_time': '1m'}], 1000)
+
+    def test_parse_escalation_thresholds(self):
+        """测试默认升级阈值与单个目标的覆盖设置"""
+        self.assertEqual(parse_escalation_thresholds(['4h', '1h']), [3600000, 14400000])
+        targets = parse_monitor_targets(
+            ['a.exe', {'name': 'b.exe', 'timeout_escalation_thresholds': ['30m']}],
+            1000, [3600000])
+        self.assertEqual(targets['a.exe']['escalation_thresholds_ms'], [3600000])
+        self.assertEqual(targets['b.exe']['escalation_thresholds_ms'], [1800000])
+        with self.assertRaises(ValueError):
+            parse_escalation_thresholds('1h')
+
+
+class TestHandleLivenessChecker(unittest.TestCase):
+    """测试基于进程句柄的存活检查"""
+
+    def add(self, checker, handle, create_time):
+        with patch('psutil.Process', return_value=handle):
+            checker.add(handle.pid, create_time)
+
+    def test_running_process_is_alive(self):
+        """测试运行中的进程不会被报告为结束"""
+        handle = make_process(10, 'worker', 100.0)
+        handle.is_running.return_value = True
+        handle.status.return_value = psutil.STATUS_RUNNING
+        checker = HandleLivenessChecker()
+        self.add(checker, handle, 100.0)
+        self.assertEqual(checker.poll(), [])
+
+    def test_ended_and_zombie_processes(self):
+        """测试已退出和僵尸进程被报告为结束"""
+        ended = make_process(10, 'worker', 100.0)
+        ended.is_running.return_value = False
+        zombie = make_process(11, 'worker', 100.0)
+        zombie.is_running.return_value = True
+        zombie.status.return_value = psutil.STATUS_ZOMBIE
+        checker = HandleLivenessChecker()
+        self.add(checker, ended, 100.0)
+        self.add(checker, zombie, 100.0)
+        self.assertEqual(sorted(checker.poll()), [10, 11])
+
+        checker.remove(10)
+        checker.remove(11)
+        self.assertEqual(checker.poll(), [])
+
+    def test_reused_pid_is_reported(self):
+        """测试 PID 被复用时原进程被视为已结束"""
+        handle = make_process(10, 'other', 999.0)
+        handle.is_running.return_value = True
+        checker = HandleLivenessChecker()
+        self.add(checker, handle, 100.0)
+        self.assertEqual(checker.poll(), [10])
+
+    def test_create_liveness_checker(self):
+        """测试根据配置选择存活检查方式"""
+        table = ProcessTable()
+        self.assertIsInstance(
+            create_liveness_checker('handle', table), HandleLivenessChecker)
+        self.assertNotIsInstance(
+            create_liveness_checker('scan', table), HandleLivenessChecker)
+
+
+@unittest.skipUnless(PidfdLivenessChecker.is_supported(), "需要支持 pidfd 的 Linux")
+class TestPidfdLivenessChecker(unittest.TestCase):
+    """测试基于 pidfd 的进程结束检测"""
+
+    def test_exit_wakes_waiter_immediately(self):
+        """测试进程退出时等待会被立即唤醒"""
+        async def run():
+            child = subprocess.Popen(['sleep', '0.2'])
+            checker = PidfdLivenessChecker()
+            checker.add(child.pid, None)
+            started = time.perf_counter()
+            await checker.wait(10)
+            elapsed = time.perf_counter() - started
+            ended_pids = checker.poll()
+            checker.close()
+            child.wait()
+            return elapsed, ended_pids, child.pid
+
+        elapsed, ended_pids, pid = asyncio.run(run())
+        self.assertLess(elapsed, 5)
+        self.assertEqual(ended_pids, [pid])
+
+    def test_missing_process_is_reported(self):
+        """测试添加时已不存在的进程直接报告为结束"""
+        async def run():
+            child = subprocess.Popen(['true'])
+            child.wait()
+            checker = PidfdLivenessChecker()
+            checker.add(child.pid, None)
+            await checker.wait(10)
+            return checker.poll(), child.pid
+
+        ended_pids, pid = asyncio.run(run())
+        self.assertEqual(ended_pids, [pid])
+
+
+def make_proc_event(what, pid, tgid):
+    """构造一条 netlink 进程连接器消息。"""
+    event = struct.pack('=IIQii', what, 0, 0, pid, tgid)
+    cn_msg = struct.pack('=IIIIHH', 1, 1, 0, 0, len(event), 0)
+    length = 16 + len(cn_msg) + len(event)
+    return struct.pack('=IHHII', length, 3, 0, 0, 0) + cn_msg + event
+
+
+class TestSpawnEventSource(unittest.TestCase):
+    """测试等待阶段的进程启动事件源"""
+
+    def test_parse_exec_and_comm_events(self):
+        """测试只解析 exec 与改名事件"""
+        data = (
+            make_proc_event(NetlinkSpawnEventSource.PROC_EVENT_EXEC, 101, 100) +
+            make_proc_event(0x00000001, 200, 200) +
+            make_proc_event(NetlinkSpawnEventSource.PROC_EVENT_COMM, 300, 300)
+        )
+        self.assertEqual(NetlinkSpawnEventSource.parse_events(data), {100, 300})
+
+    def test_scan_source_reports_new_processes(self):
+        """测试扫描事件源返回进程表的新增进程"""
+        table = MagicMock()
+        table.refresh.side_effect = [
+            ({1: {'name': 'init'}}, {}),
+            ({2: {'name': 'notepad.exe'}}, {}),
+        ]
+        source = ScanSpawnEventSource(table, 0)
+        self.assertEqual(set(source.start()), {1})
+        added = asyncio.run(source.wait(0))
+        self.assertEqual(set(added), {2})
+
+    @unittest.skipUnless(NetlinkSpawnEventSource.is_supported(), "需要 Linux")
+    def test_netlink_source_reports_exec(self):
+        """测试 netlink 事件源能报告新启动的进程"""
+        async def run():
+            source = NetlinkSpawnEventSource(ProcessTable())
+            try:
+                source.start()
+            except OSError:
+                self.skipTest("没有订阅 netlink 进程事件的权限")
+            child = subprocess.Popen(['sleep', '1'])
+            try:
+                deadline = time.perf_counter() + 5
+                while time.perf_counter() < deadline:
+                    changed = await source.wait(1)
+                    if child.pid in changed:
+                        return changed[child.pid]
+                return None
+            finally:
+                source.close()
+                child.kill()
+                child.wait()
+
+        info = asyncio.run(run())
+        self.assertIsNotNone(info)
+        self.assertEqual(info['name'], 'sleep')
+
+    @unittest.skipUnless(NetlinkSpawnEventSource.is_supported(), "需要 Linux")
+    def test_netlink_sources_in_one_process(self):
+        """测试同一进程中的多个 netlink 事件源可以同时订阅"""
+        async def run():
+            sources = [NetlinkSpawnEventSource(ProcessTable()) for _ in range(2)]
+            try:
+                sources[0].start()
+            except OSError:
+                self.skipTest("没有订阅 netlink 进程事件的权限")
+            try:
+                sources[1].start()
+            finally:
+                for source in sources:
+                    source.close()
+
+        asyncio.run(run())
+
+
+@unittest.skipUnless(ProcfsProcessScanner.is_supported() and shutil.which('sleep'), "需要 Linux 与 sleep")
+class TestMonitorProcesses(unittest.TestCase):
+    """测试完整的监视循环：一个目标运行后结束，另一个目标等待超时"""
+
+    TARGET_NAME = 'rpm_e2e_sleep'
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        # 以独特的名称运行 sleep，避免匹配到系统中的其他进程
+        self.program = os.path.join(self.temp_dir.name, self.TARGET_NAME)
+        os.symlink(shutil.which('sleep'), self.program)
+        self.config = get_default_config()
+        push_settings = self.config['push_settings']
+        push_settings['push_outbox']['enable'] = False
+        push_settings['push_rate_limit'].update({
+            'channel_burst': 0, 'template_burst': 0, 'dedup_window': '0s',
+        })
+        self.config['monitor_settings'].update({
+            'process_name': [
+                self.TARGET_NAME, {'name': 'nonexistent_xyz', 'max_wait_time': '2s'}],
+            'monitor_loop_interval': '100',
+            'timeout_warning_interval': '1h',
+        })
+        self.config['wait_process_settings'].update({
+            'wait_process_check_interval': '100', 'spawn_event_source': 'scan',
+        })
+        self.config['external_program_settings'].update({
+            'external_program_path': '',
+            'another_external_program_path': '',
+            'external_program_on_wait_timeout_path': '',
+        })
+        self.pushed = []
+
+    def run_monitor(self, liveness_check_mode):
+        self.config['monitor_settings']['liveness_check_mode'] = liveness_check_mode
+
+        def record_push(channel_settings, title, content):
+            self.pushed.append(title)
+            return True
+
+        async def run():
+            # 由事件循环回收子进程，结束后不会作为僵尸进程留在进程表中
+            child = await asyncio.create_subprocess_exec(self.program, '0.5')
+            try:
+                await asyncio.wait_for(monitor_processes(self.config), 10)
+            finally:
+                if child.returncode is None:
+                    child.kill()
+                await child.wait()
+
+        started = time.perf_counter()
+        with patch('modules.channels.push_message', side_effect=record_push), \
+                self.assertLogs('modules', level='INFO') as logs:
+            asyncio.run(run())
+        return time.perf_counter() - started, '\n'.join(logs.output)
+
+    def check_run(self, liveness_check_mode):
+        elapsed, output = self.run_monitor(liveness_check_mode)
+        self.assertIn(f"进程结束: {self.TARGET_NAME}", output)
+        self.assertIn("所有被监视进程已结束运行", output)
+        self.assertNotIn("任务被取消", output)
+        self.assertLess(elapsed, 8)
+        self.assertEqual(sorted(self.pushed), sorted(['进程结束通报', '等待超时未运行报告']))
+
+    def test_scan_liveness_with_waiting_target(self):
+        """测试 scan 存活检查与等待中的目标共用进程表时仍能报告进程结束"""
+        self.check_run('scan')
+
+    def test_handle_liveness_with_waiting_target(self):
+        """测试 handle 存活检查"""
+        self.check_run('handle')
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    """测试截止时间调度器"""
+
+    def test_next_deadline_and_pop_due(self):
+        """测试按截止时间顺序取出到期的键"""
+        scheduler = DeadlineScheduler()
+        scheduler.schedule('b', 200)
+        scheduler.schedule('a', 100)
+        scheduler.schedule('c', 300)
+        self.assertEqual(scheduler.next_deadline(), 100)
+        self.assertEqual(scheduler.pop_due(250), ['a', 'b'])
+        self.assertEqual(scheduler.next_deadline(), 300)
+        self.assertNotIn('a', scheduler)
+
+    def test_reschedule_and_cancel(self):
+        """测试重新设置与取消截止时间"""
+        scheduler = DeadlineScheduler()
+        scheduler.schedule('a', 100)
+        scheduler.schedule('a', 500)
+        scheduler.schedule('b', 200)
+        scheduler.cancel('b')
+        self.assertEqual(scheduler.next_deadline(), 500)
+        self.assertEqual(scheduler.pop_due(400), [])
+        self.assertEqual(scheduler.pop_due(500), ['a'])
+        self.assertIsNone(scheduler.next_deadline())
+        self.assertEqual(len(scheduler), 0)
+
+    def test_stale_entries_are_compacted(self):
+        """测试频繁重新设置时堆不会无限增长"""
+        scheduler = DeadlineScheduler()
+        for deadline in range(1000):
+            scheduler.schedule('a', deadline)
+        self.assertLess(len(scheduler._heap), 100)
+        self.assertEqual(scheduler.next_deadline(), 999)
+
+
+if __name__ == '__main__':
+    unittest.main()
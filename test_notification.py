@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 通知模块单元测试
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.config import get_default_config
+from modules.logger import PROFILE_CONTEXT
+from modules.ratelimit import TokenBucket, PushLimiter
+from modules.outbox import NotificationOutbox
+from modules.channels import CircuitBreaker, get_push_channels, get_retry_delay
+from modules.notification import (
+    NotificationDispatcher,
+    send_notification,
+    start_notifications,
+    get_dispatcher,
+    close_notifications,
+)
+
+
+class TestNotificationDispatcher(unittest.TestCase):
+    """测试推送分发器"""
+
+    def setUp(self):
+        self.config = get_default_config()
+        self.config['push_settings']['push_outbox']['enable'] = False
+
+    def test_slow_push_does_not_block_loop(self):
+        """测试推送缓慢时 send_notification 立即返回"""
+        sent = []
+
+        def slow_push(channel_settings, title, content):
+            time.sleep(0.3)
+            sent.append(title)
+            return True
+
+        async def run():
+            started = time.perf_counter()
+            await send_notification(
+                self.config, 'process_end_notification',
+                process_name='a', process_pid=1, process_run_time='00:00:01')
+            elapsed = time.perf_counter() - started
+            await close_notifications()
+            return elapsed
+
+        with patch('modules.channels.push_message', side_effect=slow_push):
+            elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(sent, ['进程结束通报'])
+
+    def test_retry_then_success(self):
+        """测试发送失败后重试"""
+        self.config['push_settings']['push_error_retry']['retry_interval'] = '10'
+        attempts = []
+
+        def flaky_push(channel_settings, title, content):
+            attempts.append(title)
+            if len(attempts) < 2:
+                raise ConnectionError('boom')
+            return True
+
+        async def run():
+            dispatcher = NotificationDispatcher(worker_count=1)
+            dispatcher.submit(self.config['push_settings'], 'key', 'title', 'content')
+            await dispatcher.close()
+
+        with patch('modules.channels.push_message', side_effect=flaky_push):
+            asyncio.run(run())
+        self.assertEqual(len(attempts), 2)
+
+    def test_retry_does_not_block_worker(self):
+        """测试等待重试期间工作任务继续发送其他通知"""
+        self.config['push_settings']['push_error_retry']['retry_interval'] = '1s'
+        sent = []
+
+        def push(channel_settings, title, content):
+            if title == 'fail':
+                raise ConnectionError('boom')
+            sent.append(title)
+            return True
+
+        async def run():
+            dispatcher = NotificationDispatcher(worker_count=1)
+            dispatcher.submit(self.config['push_settings'], 'key', 'fail', 'content')
+            dispatcher.submit(self.config['push_settings'], 'key', 'ok', 'content')
+            for _ in range(50):
+                if sent:
+                    break
+                await asyncio.sleep(0.01)
+            await dispatcher.close(timeout=0)
+            return sent
+
+        with patch('modules.channels.push_message', side_effect=push):
+            self.assertEqual(asyncio.run(run()), ['ok'])
+
+    def test_retry_deadline(self):
+        """测试超过重试总时限后不再重试"""
+        retry_settings = self.config['push_settings']['push_error_retry']
+        retry_settings.update({'retry_interval': '1s', 'retry_deadline': '1', 'max_retry_count': 5})
+        attempts = []
+
+        def failing_push(channel_settings, title, content):
+            attempts.append(title)
+            raise ConnectionError('boom')
+
+        async def run():
+            dispatcher = NotificationDispatcher(worker_count=1)
+            dispatcher.submit(self.config['push_settings'], 'key', 'title', 'content')
+            await dispatcher.close(timeout=1)
+
+        with patch('modules.channels.push_message', side_effect=failing_push):
+            asyncio.run(run())
+        self.assertEqual(len(attempts), 1)
+
+    def test_retry_delay_backoff(self):
+        """测试重试间隔指数增长、有上限并带抖动"""
+        retry_settings = {'retry_interval': '1s', 'max_retry_interval': '5s', 'retry_jitter': 0.2}
+        for attempt, expected in ((1, 1), (2, 2), (3, 4), (4, 5), (10, 5)):
+            delay = get_retry_delay(retry_settings, attempt)
+            self.assertGreaterEqual(delay, expected * 0.8)
+            self.assertLessEqual(delay, expected * 1.2)
+        retry_settings['retry_jitter'] = 0
+        self.assertEqual(get_retry_delay(retry_settings, 3), 4)
+
+    def test_full_queue_drops(self):
+        """测试队列已满时丢弃新的通知"""
+        async def run():
+            dispatcher = NotificationDispatcher(worker_count=1, queue_size=1)
+            accepted = [
+                dispatcher.submit({}, 'key', 'title', f"content {index}") for index in range(2)
+            ]
+            await dispatcher.close()
+            return accepted
+
+        with patch('modules.channels.push_message', return_value=True):
+            self.assertEqual(asyncio.run(run()), [True, False])
+
+
+class TestPushChannels(unittest.TestCase):
+    """测试多通道并发推送与熔断"""
+
+    def setUp(self):
+        self.config = get_default_config()
+        self.config['push_settings']['push_outbox']['enable'] = False
+        self.config['push_settings']['push_error_retry']['retry_interval'] = '10'
+        self.config['push_settings']['push_channel_settings']['additional_channels'] = [
+            {'choose': 'OnePush', 'push_channel': 'bark', 'push_channel_key': 'k', 'max_retry_count': 1},
+        ]
+
+    def test_get_push_channels(self):
+        """测试主通道与附加通道"""
+        channels = get_push_channels(self.config['push_settings'])
+        self.assertEqual([channel['choose'] for channel in channels], ['ServerChan', 'OnePush'])
+        self.assertNotIn('additional_channels', channels[0])
+
+    def test_dead_channel_does_not_delay_others(self):
+        """测试某个通道无响应时其他通道照常发送"""
+        delivered = []
+
+        def push(channel_settings, title, content):
+            if channel_settings['choose'] == 'OnePush':
+                time.sleep(0.5)
+                raise ConnectionError('timeout')
+            delivered.append((time.perf_counter(), title))
+            return True
+
+        async def run():
+            dispatcher = NotificationDispatcher(worker_count=1)
+            started = time.perf_counter()
+            for index in range(3):
+                dispatcher.submit(self.config['push_settings'], 'key', f"title {index}", 'content')
+            while len(delivered) < 3:
+                await asyncio.sleep(0.01)
+            elapsed = delivered[-1][0] - started
+            await dispatcher.close()
+            return elapsed
+
+        with patch('modules.channels.push_message', side_effect=push):
+            elapsed = asyncio.run(run())
+        self.assertLess(elapsed, 0.4)
+
+    def test_circuit_breaker(self):
+        """测试连续失败后熔断，超时后放行一次试探"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+        now[0] = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+
+class TestNotificationDigest(unittest.TestCase):
+    """测试合并窗口与摘要"""
+
+    def setUp(self):
+        self.config = get_default_config()
+        self.config['push_settings']['push_outbox']['enable'] = False
+        self.sent = []
+
+    def push(self, channel_settings, title, content):
+        self.sent.append((title, content))
+        return True
+
+    def run_events(self, template_key, events):
+        async def run():
+            for values in events:
+                await send_notification(self.config, template_key, **values)
+            await close_notifications()
+
+        with patch('modules.channels.push_message', side_effect=self.push):
+            asyncio.run(run())
+
+    def test_events_in_window_become_digest(self):
+        """测试窗口内的多条通知合并为一条摘要"""
+        self.config['push_settings']['push_templates']['process_end_notification']['coalesce_window'] = '1s'
+        self.run_events('process_end_notification', [
+            {'process_name': 'worker', 'process_pid': pid, 'process_run_time': '00:00:01'}
+            for pid in (1, 2, 3)
+        ])
+        self.assertEqual(len(self.sent), 1)
+        title, content = self.sent[0]
+        self.assertEqual(title, '进程结束通报（共 3 条）')
+        for pid in (1, 2, 3):
+            self.assertIn(f"(PID: {pid})", content)
+
+    def test_repeated_pid_keeps_latest(self):
+        """测试同一进程的重复通知只保留最新一条并计数"""
+        templates = self.config['push_settings']['push_templates']
+        templates['process_timeout_warning']['coalesce_window'] = '1h'
+        templates['notification_digest']['item'] = '{process_pid} {process_run_time} x{digest_repeat}'
+        self.run_events('process_timeout_warning', [
+            {'process_name': 'a', 'process_pid': 1, 'process_run_time': '00:15:00'},
+            {'process_name': 'b', 'process_pid': 2, 'process_run_time': '00:15:00'},
+            {'process_name': 'a', 'process_pid': 1, 'process_run_time': '00:30:00'},
+        ])
+        self.assertEqual(len(self.sent), 1)
+        self.assertIn('- 2 00:15:00 x1\n\n- 1 00:30:00 x2', self.sent[0][1])
+
+    def test_single_event_uses_original_template(self):
+        """测试窗口内只有一条通知时按原模板发送"""
+        self.config['push_settings']['push_templates']['process_end_notification']['coalesce_window'] = '1s'
+        self.run_events('process_end_notification', [
+            {'process_name': 'worker', 'process_pid': 1, 'process_run_time': '00:00:01'}
+        ])
+        self.assertEqual([title for title, _ in self.sent], ['进程结束通报'])
+
+    def test_profiles_coalesce_separately(self):
+        """测试多个配置的同名模板分别合并"""
+        self.config['push_settings']['push_templates']['process_end_notification']['coalesce_window'] = '1s'
+
+        async def send(profile, pid):
+            PROFILE_CONTEXT.set(profile)
+            await send_notification(
+                self.config, 'process_end_notification',
+                process_name='worker', process_pid=pid, process_run_time='00:00:01')
+
+        async def run():
+            await asyncio.gather(send('a', 1), send('b', 2))
+            await close_notifications()
+
+        with patch('modules.channels.push_message', side_effect=self.push):
+            asyncio.run(run())
+        self.assertEqual([title for title, _ in self.sent], ['进程结束通报', '进程结束通报'])
+
+    def test_later_profile_dispatcher_settings_are_ignored(self):
+        """测试后启动的配置中不同的分发器设置被忽略并记录警告"""
+        other = get_default_config()
+        other['push_settings']['push_outbox']['enable'] = False
+        other['push_settings']['push_dispatch']['worker_count'] = 8
+
+        async def run():
+            start_notifications(self.config)
+            with self.assertLogs('modules.notification', level='WARNING') as logs:
+                start_notifications(other)
+            worker_count = get_dispatcher(other).worker_count
+            await close_notifications()
+            return worker_count, logs.output
+
+        worker_count, output = asyncio.run(run())
+        self.assertEqual(worker_count, 2)
+        self.assertEqual(len(output), 1)
+        self.assertIn('push_settings.push_dispatch', output[0])
+
+
+class TestPushLimiter(unittest.TestCase):
+    """测试推送限流与去重"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.limiter = PushLimiter(clock=lambda: self.now)
+        self.push_settings = get_default_config()['push_settings']
+        self.channel = {'choose': 'ServerChan', 'serverchan_key': 'key'}
+
+    def test_token_bucket_refill(self):
+        """测试令牌耗尽后按间隔恢复"""
+        bucket = TokenBucket(2, 10, clock=lambda: self.now)
+        for _ in range(2):
+            self.assertTrue(bucket.available())
+            bucket.consume()
+        self.assertFalse(bucket.available())
+        self.now = 10
+        self.assertTrue(bucket.available())
+
+    def test_template_limit_and_suppressed_count(self):
+        """测试模板限流，被抑制的数量附加在下一条通知中"""
+        self.push_settings['push_rate_limit']['template_burst'] = 1
+        self.assertEqual(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c1'), 'c1')
+        self.assertIsNone(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c2'))
+        # 其他模板不受影响，并带上此前被抑制的数量
+        content = self.limiter.admit(self.push_settings, self.channel, 'b', 't', 'c3')
+        self.assertIn('此前有 1 条通知被限流', content)
+        self.assertEqual(self.limiter.admit(self.push_settings, self.channel, 'b', 't', 'c4'), None)
+
+    def test_duplicate_within_window(self):
+        """测试去重窗口内相同的通知只发送一次"""
+        self.assertEqual(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c'), 'c')
+        self.assertIsNone(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c'))
+        self.now = 301
+        content = self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c')
+        self.assertIn('1 条重复通知被抑制', content)
+
+    def test_duplicate_with_default_templates(self):
+        """测试默认模板中的时间字段不同时，相同事件仍被去重"""
+        sent = []
+
+        def push(channel_settings, title, content):
+            sent.append((title, content))
+            return True
+
+        async def run():
+            for current_time in ('2026-01-01 00:00:00', '2026-01-01 00:00:01'):
+                host_fields = {
+                    'host_name': 'host', 'current_time': current_time,
+                    'short_current_time': current_time[-8:],
+                }
+                with patch('modules.notification.get_host_fields', return_value=host_fields):
+                    await send_notification(
+                        config, 'process_end_notification',
+                        process_name='a', process_pid=1, process_run_time='00:00:01')
+            await close_notifications()
+
+        config = get_default_config()
+        config['push_settings']['push_outbox']['enable'] = False
+        with patch('modules.channels.push_message', side_effect=push), \
+                self.assertLogs('modules.ratelimit', level='WARNING'):
+            asyncio.run(run())
+        self.assertEqual(len(sent), 1)
+        self.assertIn('2026-01-01 00:00:00', sent[0][1])
+
+    def test_integer_settings(self):
+        """测试 YAML 中写成整数的时间设置，dedup_window: 0 关闭去重"""
+        self.push_settings['push_rate_limit'].update({
+            'dedup_window': 0, 'template_burst': 1, 'template_refill_interval': 1000,
+        })
+        self.assertEqual(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c'), 'c')
+        self.now = 1
+        self.assertEqual(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c'), 'c')
+        self.assertIsNone(self.limiter.admit(self.push_settings, self.channel, 'a', 't', 'c'))
+
+
+
+class TestNotificationOutbox(unittest.TestCase):
+    """测试发件箱"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'outbox.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_pending_records_survive_restart(self):
+        """测试未送达的通知在重新打开后恢复，已送达的不会恢复"""
+        outbox = NotificationOutbox(self.path)
+        first = outbox.add('a', 't1', 'c1', {})
+        outbox.add('b', 't2', 'c2', {})
+        outbox.complete(first)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"op": "add", "id"')
+        reopened = NotificationOutbox(self.path)
+        self.assertEqual([record['title'] for _, record in reopened.pending()], ['t2'])
+
+    def test_compaction_removes_empty_file(self):
+        """测试全部送达后删除发件箱文件"""
+        outbox = NotificationOutbox(self.path, compact_threshold=1)
+        record_id = outbox.add('a', 't', 'c', {})
+        self.assertTrue(os.path.exists(self.path))
+        outbox.complete(record_id)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_failed_push_is_retried_from_outbox(self):
+        """测试重试耗尽的通知转入发件箱，后台重试成功后移除"""
+        push_settings = get_default_config()['push_settings']
+        push_settings['push_error_retry']['max_retry_count'] = 1
+        attempts = []
+
+        def flaky_push(channel_settings, title, content):
+            attempts.append(title)
+            if len(attempts) < 3:
+                raise ConnectionError('boom')
+            return True
+
+        async def run():
+            outbox = NotificationOutbox(self.path)
+            dispatcher = NotificationDispatcher(
+                worker_count=1, outbox=outbox,
+                outbox_retry_interval=0.05, outbox_max_retry_interval=0.05)
+            dispatcher.submit(push_settings, 'key', 'title', 'content')
+            await dispatcher.flush()
+            self.assertEqual(len(outbox), 1)
+            for _ in range(50):
+                if not len(outbox):
+                    break
+                await asyncio.sleep(0.02)
+            await dispatcher.close()
+            return outbox
+
+        with patch('modules.channels.push_message', side_effect=flaky_push):
+            outbox = asyncio.run(run())
+        self.assertEqual(len(outbox), 0)
+        self.assertEqual(len(attempts), 3)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_unsent_notifications_are_kept_on_close(self):
+        """测试关闭时正在发送与仍在队列中的通知转入发件箱"""
+        push_settings = get_default_config()['push_settings']
+        released = threading.Event()
+
+        def blocked_push(channel_settings, title, content):
+            released.wait(5)
+            return True
+
+        async def run():
+            outbox = NotificationOutbox(self.path)
+            dispatcher = NotificationDispatcher(worker_count=1, outbox=outbox)
+            for index in range(3):
+                dispatcher.submit(push_settings, 'key', f"title {index}", 'content')
+            await asyncio.sleep(0.05)
+            await dispatcher.close(timeout=0)
+            return outbox
+
+        with patch('modules.channels.push_message', side_effect=blocked_push):
+            try:
+                outbox = asyncio.run(run())
+            finally:
+                released.set()
+        titles = sorted(record['title'] for _, record in NotificationOutbox(self.path).pending())
+        self.assertEqual(titles, ['title 0', 'title 1', 'title 2'])
+        self.assertEqual(len(outbox), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
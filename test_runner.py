@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 外部程序运行器单元测试
+"""
+
+import os
+import sys
+import time
+import stat
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.runner import (
+    POWERSHELL_ARGV,
+    ExternalProgramRunner,
+    ProgramSpec,
+    get_external_programs,
+    resolve_external_program,
+)
+
+
+def python_program(code):
+    """生成运行一段 Python 代码的外部程序。"""
+    return ProgramSpec(sys.executable, [sys.executable, '-c', code], os.getcwd())
+
+
+class TestResolveExternalProgram(unittest.TestCase):
+    """测试外部程序路径解析"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resolve_file(self):
+        """测试解析为绝对路径，工作目录为程序所在目录"""
+        spec = resolve_external_program(sys.executable)
+        self.assertEqual(spec.path, os.path.abspath(sys.executable))
+        self.assertEqual(spec.argv, [spec.path])
+        self.assertEqual(spec.cwd, os.path.dirname(spec.path))
+
+    def test_resolve_batch_file(self):
+        """测试批处理文件经 cmd.exe 执行"""
+        path = os.path.join(self.temp_dir.name, 'end.bat')
+        with open(path, 'w') as f:
+            f.write('@echo off\n')
+        spec = resolve_external_program(path)
+        self.assertEqual(spec.argv, ['cmd.exe', '/c', path])
+        self.assertEqual(spec.cwd, self.temp_dir.name)
+
+    def test_resolve_windows_scripts(self):
+        """测试 Windows 上脚本经 PowerShell 或 cmd.exe 按文件关联执行"""
+        expected = {
+            'job.exe': lambda path: [path],
+            'job.ps1': lambda path: POWERSHELL_ARGV + [path],
+            'job.py': lambda path: ['cmd.exe', '/c', path],
+            'job.bat': lambda path: ['cmd.exe', '/c', path],
+        }
+        with patch('modules.runner.sys.platform', 'win32'):
+            for name, argv in expected.items():
+                path = os.path.join(self.temp_dir.name, name)
+                with open(path, 'w') as f:
+                    f.write('')
+                self.assertEqual(resolve_external_program(path).argv, argv(path))
+
+    def test_resolve_errors(self):
+        """测试程序不存在与没有执行权限"""
+        with self.assertRaises(ValueError):
+            resolve_external_program(os.path.join(self.temp_dir.name, 'missing.exe'))
+        if sys.platform != 'win32':
+            path = os.path.join(self.temp_dir.name, 'script.sh')
+            with open(path, 'w') as f:
+                f.write('#!/bin/sh\n')
+            os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+            with self.assertRaises(ValueError):
+                resolve_external_program(path)
+
+    def test_invalid_programs_disabled(self):
+        """测试无效的程序被禁用"""
+        settings = {
+            'external_program_path': sys.executable,
+            'another_external_program_path': os.path.join(self.temp_dir.name, 'missing.exe'),
+            'external_program_on_wait_timeout_path': '',
+        }
+        with self.assertLogs('modules.runner', level='ERROR'):
+            programs = get_external_programs(settings)
+        self.assertEqual(programs['external_program_path'].path, os.path.abspath(sys.executable))
+        self.assertIsNone(programs['another_external_program_path'])
+        self.assertIsNone(programs['external_program_on_wait_timeout_path'])
+
+
+class TestExternalProgramRunner(unittest.TestCase):
+    """测试外部程序运行器"""
+
+    def test_exit_code_and_output(self):
+        """测试记录退出码，标准输出与标准错误逐行写入日志"""
+        code = "import sys; print('hello'); print('oops', file=sys.stderr); sys.exit(3)"
+
+        async def run():
+            runner = ExternalProgramRunner()
+            return await runner.run(python_program(code))
+
+        with self.assertLogs('modules.runner', level='INFO') as logs:
+            exit_code = asyncio.run(run())
+        self.assertEqual(exit_code, 3)
+        output = '\n'.join(logs.output)
+        self.assertIn('INFO:modules.runner:[', output)
+        self.assertIn('] hello', output)
+        self.assertIn('WARNING:modules.runner:[', output)
+        self.assertIn('] oops', output)
+        self.assertIn('退出码: 3', output)
+
+    def test_long_output_without_newline(self):
+        """测试没有换行的超长输出被分段写入日志，程序不会因管道写满而阻塞"""
+        code = "import sys; sys.stdout.write('x' * 2000000); sys.stdout.flush()"
+
+        async def run():
+            runner = ExternalProgramRunner(timeout=10)
+            return await runner.run(python_program(code))
+
+        with self.assertLogs('modules.runner', level='INFO') as logs:
+            exit_code = asyncio.run(run())
+        self.assertEqual(exit_code, 0)
+        logged = sum(
+            len(record.getMessage().split('] ', 1)[1]) for record in logs.records
+            if record.getMessage().startswith('['))
+        self.assertEqual(logged, 2000000)
+
+    def test_timeout_terminates(self):
+        """测试超时后结束程序"""
+
+        async def run():
+            runner = ExternalProgramRunner(timeout=0.2)
+            started = time.perf_counter()
+            exit_code = await runner.run(python_program('import time; time.sleep(30)'))
+            return exit_code, time.perf_counter() - started
+
+        with self.assertLogs('modules.runner', level='ERROR'):
+            exit_code, elapsed = asyncio.run(run())
+        self.assertNotEqual(exit_code, 0)
+        self.assertLess(elapsed, 5)
+
+    def test_concurrency_limit(self):
+        """测试同时运行的程序数量不超过上限，后台任务在关闭时等待结束"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        # 每个程序记录开始与结束时间
+        code = (
+            "import os, sys, time; start = time.time(); time.sleep(0.3); "
+            f"open(os.path.join({temp_dir.name!r}, str(os.getpid())), 'w')"
+            ".write(f'{start} {time.time()}')"
+        )
+
+        async def run():
+            runner = ExternalProgramRunner(max_concurrency=2)
+            tasks = [runner.start(python_program(code)) for _ in range(4)]
+            self.assertEqual(runner.running, 4)
+            await runner.close()
+            return [task.result() for task in tasks]
+
+        with self.assertLogs('modules.runner', level='INFO'):
+            exit_codes = asyncio.run(run())
+        self.assertEqual(exit_codes, [0, 0, 0, 0])
+        intervals = []
+        for name in os.listdir(temp_dir.name):
+            with open(os.path.join(temp_dir.name, name)) as f:
+                intervals.append(tuple(map(float, f.read().split())))
+        self.assertEqual(len(intervals), 4)
+        for start, _ in intervals:
+            overlapping = sum(1 for other_start, other_end in intervals
+                              if other_start <= start < other_end)
+            self.assertLessEqual(overlapping, 2)
+
+    def test_close_cancels_pending(self):
+        """测试关闭超时后结束仍在运行的程序"""
+
+        async def run():
+            runner = ExternalProgramRunner()
+            task = runner.start(python_program('import time; time.sleep(30)'))
+            await asyncio.sleep(0.2)
+            started = time.perf_counter()
+            await runner.close(timeout=0.2)
+            return task, time.perf_counter() - started
+
+        with self.assertLogs('modules.runner', level='WARNING'):
+            task, elapsed = asyncio.run(run())
+        self.assertTrue(task.cancelled())
+        self.assertLess(elapsed, 5)
+
+    def test_spawn_failure(self):
+        """测试启动失败时返回 None"""
+        spec = ProgramSpec('/nonexistent/program', ['/nonexistent/program'], os.getcwd())
+
+        async def run():
+            return await ExternalProgramRunner().run(spec)
+
+        with self.assertLogs('modules.runner', level='ERROR'):
+            self.assertIsNone(asyncio.run(run()))
+
+
+if __name__ == '__main__':
+    unittest.main()
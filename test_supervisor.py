@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 supervisor 模式单元测试
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+import importlib
+from unittest.mock import patch
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.config import get_default_config
+from modules.monitor import ChildLivenessChecker
+from modules.supervisor import RestartBackoff, should_restart, supervise
+
+
+class TestRestartBackoff(unittest.TestCase):
+    """测试重启退避与崩溃循环检测"""
+
+    def test_exponential_backoff(self):
+        """测试等待时间翻倍直到上限，长时间运行后恢复"""
+        backoff = RestartBackoff(1, 5, reset_after=60)
+        delays = [backoff.next_delay(run_time=0.1, now=index) for index in range(4)]
+        self.assertEqual(delays, [1, 2, 4, 5])
+        self.assertEqual(backoff.next_delay(run_time=120, now=10), 1)
+        self.assertEqual(backoff.restart_count, 5)
+
+    def test_crash_loop(self):
+        """测试窗口内重启次数达到阈值后判定为崩溃循环，窗口外的重启不计入"""
+        backoff = RestartBackoff(1, 1, crash_loop_threshold=2, crash_loop_window=10)
+        self.assertEqual(backoff.next_delay(0, now=0), 1)
+        self.assertEqual(backoff.next_delay(0, now=11), 1)
+        self.assertEqual(backoff.next_delay(0, now=12), 1)
+        self.assertIsNone(backoff.next_delay(0, now=13))
+        self.assertEqual(backoff.restart_count, 3)
+
+    def test_should_restart(self):
+        """测试重启策略"""
+        self.assertFalse(should_restart('never', 1))
+        self.assertTrue(should_restart('on-failure', 1))
+        self.assertFalse(should_restart('on-failure', 0))
+        self.assertTrue(should_restart('always', 0))
+
+
+class TestChildLivenessChecker(unittest.TestCase):
+    """测试子进程存活检查器"""
+
+    def test_exit_wakes_waiter_with_exit_code(self):
+        """测试子进程退出时立即唤醒并取得退出码"""
+
+        async def run():
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, '-c', 'import time, sys; time.sleep(0.2); sys.exit(7)')
+            checker = ChildLivenessChecker(process)
+            checker.add(process.pid, None)
+            self.assertEqual(checker.poll(), [])
+            started = time.perf_counter()
+            await checker.wait(10)
+            elapsed = time.perf_counter() - started
+            ended = checker.poll()
+            result = (ended, checker.exit_code(process.pid), checker.exit_time(process.pid), elapsed)
+            checker.close()
+            return process.pid, result
+
+        pid, (ended, exit_code, exit_time, elapsed) = asyncio.run(run())
+        self.assertEqual(ended, [pid])
+        self.assertEqual(exit_code, 7)
+        self.assertIsNotNone(exit_time)
+        self.assertLess(elapsed, 5)
+
+
+class TestSupervise(unittest.TestCase):
+    """测试启动并监视子进程"""
+
+    def setUp(self):
+        self.config = get_default_config()
+        push_settings = self.config['push_settings']
+        push_settings['push_outbox']['enable'] = False
+        push_settings['push_rate_limit'].update({
+            'channel_burst': 0, 'template_burst': 0, 'dedup_window': '0s',
+        })
+        self.config['external_program_settings'].update({
+            'external_program_path': '',
+            'another_external_program_path': '',
+            'external_program_on_wait_timeout_path': '',
+        })
+        self.config['supervisor_settings'].update({
+            'restart_delay': '10', 'max_restart_delay': '20', 'stop_timeout': '2s',
+        })
+        self.pushed = []
+
+    def run_supervise(self, command):
+        def record_push(channel_settings, title, content):
+            self.pushed.append((title, content))
+            return True
+
+        with patch('modules.channels.push_message', side_effect=record_push):
+            return asyncio.run(supervise(self.config, command))
+
+    def test_exit_code_in_notification(self):
+        """测试进程结束通知包含子进程的退出码"""
+        end_template = self.config['push_settings']['push_templates']['process_end_notification']
+        end_template['content'] += '退出码: {process_exit_code}'
+        with self.assertLogs('modules', level='INFO'):
+            exit_code = self.run_supervise([sys.executable, '-c', 'import sys; sys.exit(3)'])
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(len(self.pushed), 1)
+        title, content = self.pushed[0]
+        self.assertEqual(title, '进程结束通报')
+        self.assertIn('退出码: 3', content)
+
+    @unittest.skipIf(os.name == 'nt', '需要符号链接')
+    def test_glob_characters_in_program_name(self):
+        """测试程序名含通配符时仍按 PID 监视子进程"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            program = os.path.join(temp_dir, 'job[1]')
+            os.symlink(sys.executable, program)
+            with self.assertLogs('modules', level='INFO'):
+                exit_code = self.run_supervise([program, '-c', 'import sys; sys.exit(3)'])
+        self.assertEqual(exit_code, 3)
+        self.assertEqual(len(self.pushed), 1)
+        self.assertEqual(self.pushed[0][0], '进程结束通报')
+
+    def test_restart_until_crash_loop(self):
+        """测试失败时按退避重启，达到崩溃循环阈值后停止"""
+        self.config['supervisor_settings'].update({
+            'restart_policy': 'on-failure', 'crash_loop_threshold': 2,
+        })
+        with self.assertLogs('modules', level='INFO'):
+            exit_code = self.run_supervise([sys.executable, '-c', 'import sys; sys.exit(1)'])
+        self.assertEqual(exit_code, 1)
+        titles = [title for title, _ in self.pushed]
+        self.assertEqual(titles.count('进程结束通报'), 3)
+        self.assertEqual(titles.count('进程重启通报'), 2)
+        self.assertEqual(titles[-1], '进程崩溃循环报告')
+
+    def test_success_is_not_restarted(self):
+        """测试 on-failure 策略下正常退出不重启"""
+        self.config['supervisor_settings']['restart_policy'] = 'on-failure'
+        with self.assertLogs('modules', level='INFO'):
+            exit_code = self.run_supervise([sys.executable, '-c', 'pass'])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual([title for title, _ in self.pushed], ['进程结束通报'])
+
+    def test_timeout_warning(self):
+        """测试 supervisor 模式下超时警告照常发送"""
+        self.config['monitor_settings']['timeout_warning_interval'] = '200'
+        with self.assertLogs('modules', level='INFO'):
+            self.run_supervise([sys.executable, '-c', 'import time; time.sleep(0.5)'])
+        titles = [title for title, _ in self.pushed]
+        self.assertIn('进程超时运行警告', titles)
+        self.assertEqual(titles[-1], '进程结束通报')
+
+    def test_timeout_threshold_program(self):
+        """测试超时次数达到阈值时调用外部程序，退出前结束子进程"""
+        self.config['monitor_settings']['timeout_warning_interval'] = '100'
+        self.config['external_program_settings'].update({
+            'another_external_program_path': sys.executable,
+            'timeout_count_threshold': 2,
+            'exit_on_threshold': True,
+        })
+        started = time.perf_counter()
+        with self.assertLogs('modules', level='INFO') as logs, self.assertRaises(SystemExit):
+            self.run_supervise([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.assertLess(time.perf_counter() - started, 10)
+        self.assertIn('正在结束子进程', '\n'.join(logs.output))
+        titles = [title for title, _ in self.pushed]
+        self.assertEqual(titles.count('进程超时运行警告'), 2)
+
+    def test_missing_command(self):
+        """测试命令不存在时不启动"""
+        with self.assertLogs('modules.supervisor', level='CRITICAL'):
+            self.assertIsNone(self.run_supervise(['/nonexistent/command']))
+
+
+class TestParseArgs(unittest.TestCase):
+    """测试命令行中 -- 之后的命令"""
+
+    def test_command_after_separator(self):
+        """测试 -- 之后的参数原样作为命令"""
+        main_module = importlib.import_module('2RPM')
+        args = main_module.parse_args(['-c', 'job', '--', 'app', '-c', 'x'])
+        self.assertEqual(args.config, ['job'])
+        self.assertEqual(args.command, ['app', '-c', 'x'])
+        args = main_module.parse_args([])
+        self.assertIsNone(args.command)
+
+
+if __name__ == '__main__':
+    unittest.main()
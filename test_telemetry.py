@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 资源采样模块单元测试
+"""
+
+import os
+import sys
+import math
+import unittest
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.telemetry import (
+    RingBuffer,
+    TelemetrySampler,
+    parse_telemetry_thresholds,
+)
+
+
+class TestRingBuffer(unittest.TestCase):
+    """测试环形缓冲区"""
+
+    def test_overwrites_oldest(self):
+        """测试写满后覆盖最旧的数据且保持写入顺序"""
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.latest(), [2.0, 3.0, 4.0])
+        self.assertEqual(buffer.latest(2), [3.0, 4.0])
+        self.assertEqual(buffer.last(), 4.0)
+
+    def test_statistics_skip_missing_values(self):
+        """测试统计时忽略无法读取的数据"""
+        buffer = RingBuffer(4)
+        self.assertIsNone(buffer.last())
+        self.assertIsNone(buffer.mean())
+        buffer.append(1)
+        buffer.append(None)
+        buffer.append(3)
+        self.assertTrue(math.isnan(buffer.latest()[1]))
+        self.assertEqual(buffer.max(), 3.0)
+        self.assertEqual(buffer.mean(), 2.0)
+
+
+class TestTelemetrySampler(unittest.TestCase):
+    """测试资源采样器"""
+
+    def test_samples_current_process(self):
+        """测试采样当前进程并记录历史"""
+        sampler = TelemetrySampler(buffer_size=2)
+        sampler.add(os.getpid())
+        for _ in range(3):
+            values = sampler.sample(os.getpid())
+        self.assertGreater(values['memory_rss'], 0)
+        self.assertGreaterEqual(values['num_threads'], 1)
+        self.assertEqual(len(sampler.history(os.getpid(), 'memory_rss')), 2)
+        self.assertIn('内存峰值', sampler.summary(os.getpid()))
+        sampler.remove(os.getpid())
+        self.assertEqual(sampler.history(os.getpid(), 'memory_rss'), [])
+
+    def test_threshold_requires_consecutive_samples(self):
+        """测试连续超限才报告，回落后报告恢复"""
+        sampler = TelemetrySampler(
+            thresholds=parse_telemetry_thresholds({'num_threads_threshold': 10}),
+            threshold_samples=2)
+        sampler.add(os.getpid())
+        buffer = sampler._buffers[os.getpid()]['num_threads']
+        events = []
+        for value in (20, 5, 20, 20, 20, 5):
+            buffer.append(value)
+            events.extend(sampler.check_thresholds(os.getpid()))
+        self.assertEqual(
+            [(event, value) for _, event, _, value, _ in events],
+            [('exceeded', 20.0), ('recovered', 5.0)])
+
+    def test_parse_thresholds(self):
+        """测试阈值为 0 的指标不检查"""
+        thresholds = parse_telemetry_thresholds(
+            {'cpu_percent_threshold': 0, 'memory_rss_threshold_mb': 1})
+        self.assertEqual(thresholds, {'memory_rss': 1024 * 1024})
+
+
+if __name__ == '__main__':
+    unittest.main()
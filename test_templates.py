@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 通知模板单元测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ruamel.yaml import YAML
+
+from modules.config import get_default_config, get_resolved_config, load_config, RESOLVED_CONFIG_KEY
+from modules.templates import (
+    HOST_PLACEHOLDERS,
+    TEMPLATE_VARIABLES,
+    TemplateError,
+    CompiledTemplate,
+    compile_templates,
+    get_host_fields,
+)
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    """测试模板编译与校验"""
+
+    def test_default_templates_compile(self):
+        """测试默认模板全部可以编译"""
+        push_templates = get_default_config()['push_settings']['push_templates']
+        templates = compile_templates(push_templates)
+        self.assertEqual(set(templates), set(push_templates))
+        self.assertEqual(templates['process_end_notification'].coalesce_window_ms, 0)
+
+    def test_unknown_placeholder_rejected(self):
+        """测试未知变量在编译时报错"""
+        with self.assertRaises(TemplateError) as context:
+            CompiledTemplate('process_end_notification', {'title': '{proces_name} 已结束'})
+        self.assertIn('{proces_name}', str(context.exception))
+
+    def test_invalid_format_rejected(self):
+        """测试格式错误与位置参数在编译时报错"""
+        for title in ('{process_name', '{} 已结束', '{0}'):
+            with self.assertRaises(TemplateError):
+                CompiledTemplate('process_end_notification', {'title': title})
+
+    def test_digest_placeholders(self):
+        """测试摘要变量只能用于摘要模板"""
+        CompiledTemplate('notification_digest', {
+            'title': '{digest_title} {digest_count}',
+            'content': '{digest_items}',
+            'item': '{process_pid} x{digest_repeat}',
+        })
+        with self.assertRaises(TemplateError):
+            CompiledTemplate('process_end_notification', {'content': '{digest_items}'})
+
+    def test_placeholders_checked_per_template(self):
+        """测试模板只能使用发送该通知时提供的变量"""
+        with self.assertRaises(TemplateError) as context:
+            CompiledTemplate('process_end_notification', {'content': '{process_wait_time}'})
+        self.assertIn('该通知不提供', str(context.exception))
+        CompiledTemplate('process_wait_timeout_warning', {'content': '{process_wait_time}'})
+        CompiledTemplate('custom_notification', {'content': '{process_wait_time}'})
+
+    def test_default_templates_render_with_caller_variables(self):
+        """测试默认模板只用各自调用方提供的变量即可渲染"""
+        templates = compile_templates(get_default_config()['push_settings']['push_templates'])
+        for key, variables in TEMPLATE_VARIABLES.items():
+            values = dict.fromkeys(variables | HOST_PLACEHOLDERS, '')
+            templates[key].render(values)
+
+    def test_digest_renders_missing_variables_as_empty(self):
+        """测试摘要模板中事件没有提供的变量渲染为空字符串"""
+        template = CompiledTemplate('notification_digest', {
+            'title': '{digest_title}', 'content': '{process_wait_time}{digest_items}',
+        })
+        self.assertEqual(
+            template.render({'digest_title': 't', 'digest_items': 'items'}), ('t', 'items'))
+
+    def test_render(self):
+        """测试渲染结果与格式说明"""
+        template = CompiledTemplate('process_end_notification', {
+            'title': '{process_name} 已结束', 'content': 'PID:{process_pid:>5}',
+        })
+        self.assertEqual(
+            template.render({'process_name': 'a', 'process_pid': 42}),
+            ('a 已结束', 'PID:   42'))
+
+    def test_compiled_once(self):
+        """测试同一份配置只编译一次，之后修改模板不生效"""
+        config = get_default_config()
+        templates = get_resolved_config(config)['templates']
+        config['push_settings']['push_templates']['process_end_notification']['title'] = '{pid}'
+        self.assertIs(get_resolved_config(config)['templates'], templates)
+
+    def test_host_fields(self):
+        """测试主机与时间字段"""
+        fields = get_host_fields()
+        self.assertEqual(set(fields), {'host_name', 'current_time', 'short_current_time'})
+        self.assertTrue(fields['current_time'].endswith(fields['short_current_time']))
+
+
+class TestTemplateValidationOnLoad(unittest.TestCase):
+    """测试加载配置时校验模板"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'config.yaml')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_config_rejects_unknown_placeholder(self):
+        """测试配置文件中的模板使用未知变量时拒绝加载"""
+        config = get_default_config()
+        config['push_settings']['push_templates']['process_end_notification']['content'] = '{pid}'
+        yaml = YAML()
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            yaml.dump(config, f)
+        with self.assertRaises(TemplateError):
+            load_config(self.config_file)
+
+    def test_load_config_resolves_templates_and_actions(self):
+        """测试加载配置时编译模板并解析动作，结果保存在配置中"""
+        yaml = YAML()
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            yaml.dump(get_default_config(), f)
+        config = load_config(self.config_file)
+        resolved = config[RESOLVED_CONFIG_KEY]
+        self.assertIn('process_end_notification', resolved['templates'])
+        self.assertFalse(resolved['actions'].has('end'))
+        self.assertIs(get_resolved_config(config), resolved)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+2RPM V3 Webhook 推送通道单元测试
+"""
+
+import os
+import sys
+import asyncio
+import unittest
+
+# 添加模块路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_push_server import StubPushServer
+from modules.config import get_default_config
+from modules.webhook import (
+    WebhookClient,
+    WebhookChannel,
+    WebhookError,
+    parse_webhook_headers,
+    render_webhook_body,
+)
+from modules.notification import NotificationDispatcher
+
+
+class TestWebhookChannel(unittest.TestCase):
+    """测试 Webhook 推送通道"""
+
+    def setUp(self):
+        self.server = StubPushServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_connections_are_reused(self):
+        """测试多次推送复用同一条连接"""
+        async def run():
+            channel = WebhookChannel({'webhook_url': self.server.url})
+            await channel.warm()
+            for index in range(5):
+                await channel.push(f"title {index}", 'content')
+            await channel.close()
+            return channel.client.connections_opened
+
+        self.assertEqual(asyncio.run(run()), 1)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(
+            [request['body']['title'] for request in self.server.requests],
+            [f"title {index}" for index in range(5)])
+
+    def test_custom_body_and_headers(self):
+        """测试自定义 JSON 请求体与请求头"""
+        async def run():
+            channel = WebhookChannel({
+                'webhook_url': self.server.url,
+                'webhook_headers': ['Authorization: Bearer token'],
+                'webhook_body': '{"msgtype": "text", "text": {"content": "{title}\\n{content}"}}',
+            })
+            await channel.push('标题 "引号"', '内容')
+            await channel.close()
+
+        asyncio.run(run())
+        request = self.server.requests[0]
+        self.assertEqual(request['headers']['Authorization'], 'Bearer token')
+        self.assertEqual(request['body'], {'msgtype': 'text', 'text': {'content': '标题 "引号"\n内容'}})
+
+    def test_error_status_raises(self):
+        """测试服务端返回错误状态码时抛出异常"""
+        self.server.fail_rate = 1
+
+        async def run():
+            channel = WebhookChannel({'webhook_url': self.server.url})
+            try:
+                await channel.push('title', 'content')
+            finally:
+                await channel.close()
+
+        with self.assertRaises(WebhookError):
+            asyncio.run(run())
+
+    def test_reconnect_after_server_closed_connection(self):
+        """测试复用的连接被服务端关闭后自动重连"""
+        async def run():
+            client = WebhookClient()
+            await client.request('POST', self.server.url, b'{}')
+            for connections in client._idle.values():
+                for connection in connections:
+                    # 模拟服务端关闭了空闲连接
+                    connection.reader.feed_eof()
+            status, _ = await client.request('POST', self.server.url, b'{}')
+            await client.close()
+            return status, client.connections_opened
+
+        self.assertEqual(asyncio.run(run()), (200, 2))
+
+    def test_dispatcher_sends_through_webhook(self):
+        """测试分发器通过 Webhook 通道发送通知"""
+        push_settings = get_default_config()['push_settings']
+        push_settings['push_outbox']['enable'] = False
+        push_settings['push_channel_settings'].update({
+            'choose': 'Webhook', 'webhook_url': self.server.url,
+        })
+
+        async def run():
+            dispatcher = NotificationDispatcher(worker_count=1)
+            dispatcher.warm(push_settings)
+            for index in range(3):
+                dispatcher.submit(push_settings, 'key', f"title {index}", 'content')
+            await dispatcher.close()
+
+        asyncio.run(run())
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.connections, 1)
+
+
+class TestWebhookHelpers(unittest.TestCase):
+    """测试请求头与请求体解析"""
+
+    def test_parse_headers(self):
+        """测试请求头列表与字典"""
+        self.assertEqual(parse_webhook_headers(['A: 1', 'B:2']), {'A': '1', 'B': '2'})
+        self.assertEqual(parse_webhook_headers({'A': 1}), {'A': '1'})
+        with self.assertRaises(ValueError):
+            parse_webhook_headers(['invalid'])
+
+    def test_render_body(self):
+        """测试递归渲染请求体"""
+        body = render_webhook_body({'a': ['{title}', 1], 'b': '{content}'}, 't', 'c')
+        self.assertEqual(body, {'a': ['t', 1], 'b': 'c'})
+
+    def test_render_body_keeps_other_braces(self):
+        """测试请求体中的其他花括号原样保留，标题与内容中的占位符不再替换"""
+        body = render_webhook_body(
+            {'text': '{"msg": "{title}"} {0} {name}', 'raw': '{content}'}, '{content}', '{x}')
+        self.assertEqual(body, {'text': '{"msg": "{content}"} {0} {name}', 'raw': '{x}'})
+
+
+if __name__ == '__main__':
+    unittest.main()